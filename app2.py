@@ -1,21 +1,48 @@
 # app2.py con integración Supabase
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, session
-import pandas as pd
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, send_from_directory, session, \
+    Response, stream_with_context
 import os
 import json
+import base64
+import bisect
+import gzip
+import hashlib
+import hmac
+import random
+import time
 from datetime import datetime
-from io import BytesIO
-import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
+from email.utils import getaddresses
 from dotenv import load_dotenv
 from functools import wraps
+from markupsafe import Markup
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 import logging
-
-# NUEVA IMPORTACIÓN PARA SUPABASE
-from supabase import create_client, Client
+import threading
+
+from email_outbox import EmailOutbox
+from smtp_pool import SMTPConnectionPool
+from email_attachments import AttachmentCache
+from email_templates import EmailTemplateRegistry
+from db_cache import TableCache
+from exports import iter_table_rows, stream_csv, stream_xlsx, save_xlsx
+import responsive_images
+from responsive_images import responsive_img
+from video_delivery import send_video, OFFLOAD_MODES
+from page_cache import PageCache
+from product_index import ProductIndex
+from catalog_products import STATIC_PRODUCTS
+from request_timing import RequestTimer
+from metrics import Metrics
+from insert_batcher import InsertBatcher
+from lead_spool import LeadSpool
+from lead_dedup import LeadDeduplicator
+import static_assets
+
+# NUEVA IMPORTACIÓN PARA SUPABASE (solo la API REST; ver supabase_client.py)
+from postgrest import SyncPostgrestClient
+from supabase_client import create_supabase_client, is_missing_column, is_row_rejection
 
 # Cargar variables de entorno
 load_dotenv()
@@ -23,61 +50,293 @@ load_dotenv()
 app = Flask(__name__)
 app.secret_key = "clave-secreta-para-flash"
 
+# Helper de plantillas para imágenes responsive (variantes de responsive_images.py)
+app.jinja_env.globals['responsive_img'] = responsive_img
+
+# Tiempos por ruta y por dependencia (Supabase, SMTP, plantillas) y cabecera Server-Timing.
+# Se registra antes que los demás hooks para que el total de cada petición lo incluya todo
+REQUEST_TIMING_ENABLED = os.getenv('REQUEST_TIMING_ENABLED', 'true').lower() == 'true'
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'true').lower() == 'true'
+request_timer = RequestTimer(app, enabled=REQUEST_TIMING_ENABLED, server_timing=SERVER_TIMING_HEADER)
+
+# Métricas Prometheus en /metrics, sumadas entre workers (metrics.py); las latencias
+# llegan desde request_timer. METRICS_TOKEN exige "Authorization: Bearer <token>";
+# sin token solo las ve un administrador con sesión iniciada (nunca son públicas)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+metrics = Metrics(app, enabled=METRICS_ENABLED)
+if metrics.enabled:
+    request_timer.add_observer(metrics)
+
+# Assets con huella: url_for('static') resuelve vía static/dist/manifest.json (static_assets.py)
+static_assets.init_app(app)
+
 # Configuración de Email
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'true').lower() == 'true'
 EMAIL_USER = os.getenv('EMAIL_USER')
 EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
 
+# Directorio para datos locales (outbox de email, etc.)
+DATA_DIR = os.getenv('PROEDENT_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'var'))
+
+# Configuración del outbox de email
+EMAIL_OUTBOX_ENABLED = os.getenv('EMAIL_OUTBOX_ENABLED', 'true').lower() == 'true'
+EMAIL_OUTBOX_WORKERS = int(os.getenv('EMAIL_OUTBOX_WORKERS', '2'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '6'))
+
+# Pool de conexiones SMTP (sesiones persistentes por worker)
+SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', str(EMAIL_OUTBOX_WORKERS)))
+SMTP_POOL_MAX_AGE = float(os.getenv('SMTP_POOL_MAX_AGE', '300'))
+SMTP_POOL_NOOP_AFTER = float(os.getenv('SMTP_POOL_NOOP_AFTER', '30'))
+
+# Guía de vendedores: adjunto (cacheado) o enlace de descarga firmado
+SALES_GUIDE_PATH = os.path.join('static', 'pdfs', 'GUIAvendedores.pdf')
+SALES_GUIDE_AS_LINK = os.getenv('SALES_GUIDE_AS_LINK', 'false').lower() == 'true'
+SALES_GUIDE_LINK_MAX_AGE = int(os.getenv('SALES_GUIDE_LINK_MAX_AGE', str(7 * 86400)))
+ATTACHMENT_CACHE_MAX_BYTES = int(os.getenv('ATTACHMENT_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+# Videos de productos: tramos por rango y offload opcional al proxy ('x-accel' | 'x-sendfile')
+VIDEO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'videos')
+VIDEO_CHUNK_BYTES = int(os.getenv('VIDEO_CHUNK_BYTES', str(1024 * 1024)))
+VIDEO_MAX_AGE = int(os.getenv('VIDEO_MAX_AGE', str(7 * 86400)))
+VIDEO_OFFLOAD = os.getenv('VIDEO_OFFLOAD', '').lower()
+VIDEO_ACCEL_PREFIX = os.getenv('VIDEO_ACCEL_PREFIX', '/_videos')
+if VIDEO_OFFLOAD not in OFFLOAD_MODES:
+    raise ValueError(f"VIDEO_OFFLOAD inválido: {VIDEO_OFFLOAD!r} (opciones: x-accel, x-sendfile)")
+
+# Caché de páginas completas (catálogos por marca, index, /lm/*) y warmup al arrancar el worker
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+PAGE_CACHE_WARMUP = os.getenv('PAGE_CACHE_WARMUP', 'true').lower() == 'true'
+
+# Captación de leads: inserciones agrupadas en lotes (insert_batcher.py). Un lote se
+# envía al juntar LEAD_BATCH_MAX_ROWS filas o a los LEAD_BATCH_MAX_WAIT_MS de abrirse
+LEAD_BATCH_MAX_ROWS = int(os.getenv('LEAD_BATCH_MAX_ROWS', '50'))
+LEAD_BATCH_MAX_WAIT_MS = float(os.getenv('LEAD_BATCH_MAX_WAIT_MS', '20'))
+# Spool local (lead_spool.py): el formulario guarda el lead en DATA_DIR/lead_spool.db y
+# responde; un hilo por worker lo reenvía a Supabase en orden. Con 'false' se inserta
+# en lote dentro de la petición (lead_batcher). Requiere sql/lead_idempotency_keys.sql:
+# mientras no se confirme que la columna LEAD_IDEMPOTENCY_COLUMN existe se usa lead_batcher
+LEAD_SPOOL_ENABLED = os.getenv('LEAD_SPOOL_ENABLED', 'true').lower() == 'true'
+LEAD_SPOOL_MAX_DELAY = float(os.getenv('LEAD_SPOOL_MAX_DELAY', '60'))
+LEAD_SPOOL_DRAIN_SECONDS = float(os.getenv('LEAD_SPOOL_DRAIN_SECONDS', '5'))
+LEAD_IDEMPOTENCY_COLUMN = os.getenv('LEAD_IDEMPOTENCY_COLUMN', 'idempotency_key')
+# Duplicados (lead_dedup.py): el mismo email en el mismo formulario dentro de la ventana
+# recibe la respuesta normal sin guardar ni enviar emails
+LEAD_DEDUP_ENABLED = os.getenv('LEAD_DEDUP_ENABLED', 'true').lower() == 'true'
+LEAD_DEDUP_WINDOW_SECONDS = int(os.getenv('LEAD_DEDUP_WINDOW_SECONDS', '86400'))
+
 # CONFIGURACIÓN SUPABASE
 SUPABASE_URL = os.getenv('SUPABASE_URL')  # Tu Project URL
 SUPABASE_KEY = os.getenv('SUPABASE_KEY')  # Tu API Key
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Pool HTTP por proceso, compartido por los hilos (gthread) o greenlets (gevent) del worker
+SUPABASE_MAX_CONNECTIONS = int(os.getenv('SUPABASE_MAX_CONNECTIONS', '20'))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv('SUPABASE_MAX_KEEPALIVE', '10'))
+SUPABASE_TIMEOUT = float(os.getenv('SUPABASE_TIMEOUT', '10'))
+
+
+def build_supabase_client():
+    """Cliente Supabase con su propio pool httpx; se crea uno por proceso"""
+    return create_supabase_client(SUPABASE_URL, SUPABASE_KEY,
+                                  max_connections=SUPABASE_MAX_CONNECTIONS,
+                                  max_keepalive=SUPABASE_MAX_KEEPALIVE,
+                                  timeout=SUPABASE_TIMEOUT,
+                                  on_error=metrics.supabase_error)
+
+
+# Cliente del proceso que importa el módulo; bajo gunicorn cada worker lo
+# reemplaza por uno propio en init_worker() (hook post_fork)
+supabase: SyncPostgrestClient = build_supabase_client()
+
+# Caché de lecturas de Supabase: TTL (segundos) por tabla
+DB_CACHE_TTLS = {
+    'products': float(os.getenv('DB_CACHE_TTL_PRODUCTS', '300')),
+    'courses': float(os.getenv('DB_CACHE_TTL_COURSES', '60')),
+    'leads': float(os.getenv('DB_CACHE_TTL_LEADS', '30')),
+    'appointments': float(os.getenv('DB_CACHE_TTL_APPOINTMENTS', '30')),
+    'sales_candidates': float(os.getenv('DB_CACHE_TTL_SALES_CANDIDATES', '30')),
+    'patients': float(os.getenv('DB_CACHE_TTL_PATIENTS', '30')),
+}
+DB_CACHE_MAX_ENTRIES = int(os.getenv('DB_CACHE_MAX_ENTRIES', '256'))
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Tipos de lead magnet que se contabilizan en el panel de administración
+LEAD_MAGNET_TYPES = ('secretos', 'errores', 'guia_rx', 'webinar_dmg')
+
+
+# Columnas que muestra el panel de administración (proyección en lugar de select('*'))
+ADMIN_TABLE_COLUMNS = {
+    'leads': ('id', 'nombre', 'email', 'telefono', 'magnet_type', 'intereses', 'created_at'),
+    'appointments': ('id', 'nombre', 'correo', 'telefono', 'fecha', 'representante', 'mensaje', 'status', 'created_at'),
+    'sales_candidates': ('id', 'nombre', 'email', 'telefono', 'ciudad', 'experiencia_sector', 'status', 'created_at'),
+}
+ADMIN_PAGE_SIZE = int(os.getenv('ADMIN_PAGE_SIZE', '50'))
+EXPORT_PAGE_SIZE = int(os.getenv('EXPORT_PAGE_SIZE', '1000'))
+
+
+def encode_cursor(created_at, row_id):
+    """Cursor opaco para la paginación por keyset"""
+    return base64.urlsafe_b64encode(json.dumps([created_at, row_id]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decodificar un cursor; lanza ValueError si no es válido"""
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if not isinstance(created_at, str) or not isinstance(row_id, int) or '"' in created_at:
+        raise ValueError("Cursor inválido")
+    return created_at, row_id
+
+
+class EnrollmentBusyError(Exception):
+    """La inscripción no ganó el UPDATE condicional a tiempo: aún quedan cupos, reintentar"""
+
+
 # CLASE PARA MANEJAR OPERACIONES DE BASE DE DATOS
+@request_timer.instrument('db')
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.supabase = supabase
+        self.cache = cache
+        self._stats_rpc_available = True
+        self._enroll_rpc_available = True
+
+    def _cached(self, table, key, loader):
+        """Leer a través de la caché (si está configurada)"""
+        if self.cache is None:
+            return loader()
+        return self.cache.get_or_load(table, key, loader)
+
+    def _invalidate(self, table):
+        if self.cache is not None:
+            self.cache.invalidate(table)
+
+    def has_column(self, table, column):
+        """True/False según exista la columna en la tabla; None si Supabase no respondió"""
+        try:
+            self.supabase.table(table).select(column).limit(1).execute()
+            return True
+        except Exception as e:
+            if is_missing_column(e):
+                return False
+            logger.warning(f"No se pudo comprobar la columna {table}.{column}: {e}")
+            return None
+
+    def insert_rows(self, table, rows, on_conflict=None):
+        """Inserción masiva: un solo insert([...]) para todas las filas (lanza si falla)
+
+        Con on_conflict (columna con índice único) las filas que ya existen se
+        ignoran y solo se devuelven las creadas: reintentos idempotentes.
+        """
+        if on_conflict:
+            query = self.supabase.table(table).upsert(rows, on_conflict=on_conflict, ignore_duplicates=True)
+        else:
+            query = self.supabase.table(table).insert(rows)
+        created = query.execute().data or []
+        self._invalidate(table)
+        if table == 'leads':
+            for row in created:
+                metrics.lead_created(row.get('magnet_type'))
+        return created
 
     # LEADS OPERATIONS
     def create_lead(self, lead_data):
         try:
-            result = self.supabase.table('leads').insert(lead_data).execute()
-            return result.data[0] if result.data else None
+            created = self.insert_rows('leads', [lead_data])
+            return created[0] if created else None
         except Exception as e:
             logger.error(f"Error creating lead: {e}")
             return None
 
     def get_all_leads(self):
         try:
-            result = self.supabase.table('leads').select('*').order('created_at', desc=True).execute()
-            return result.data
+            return self._cached('leads', 'all',
+                                lambda: self.supabase.table('leads').select('*').order('created_at', desc=True).execute().data)
         except Exception as e:
             logger.error(f"Error fetching leads: {e}")
             return []
 
+    def count_rows(self, table, **filters):
+        """Contar filas en Supabase sin descargarlas (HEAD con count=exact)"""
+        query = self.supabase.table(table).select('id', count='exact', head=True)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        return query.execute().count or 0
+
+    def _load_leads_stats(self):
+        # Preferir el conteo agrupado en Postgres (sql/lead_counts_by_magnet.sql);
+        # si la función no está instalada, un HEAD count por tipo de magnet
+        counts = None
+        if self._stats_rpc_available:
+            try:
+                rows = self.supabase.rpc('lead_counts_by_magnet', {}).execute().data
+                counts = {row['magnet_type']: row['total'] for row in rows}
+                total = sum(counts.values())
+            except Exception as e:
+                # Solo se deja de intentar si la función no existe; otro error (timeout,
+                # 5xx) usa los conteos por tipo únicamente en esta llamada
+                if 'PGRST202' in str(e):
+                    logger.warning("RPC lead_counts_by_magnet no disponible, usando conteos por tipo")
+                    self._stats_rpc_available = False
+                else:
+                    logger.warning(f"Error en RPC lead_counts_by_magnet, usando conteos por tipo: {e}")
+
+        if counts is None:
+            counts = {magnet_type: self.count_rows('leads', magnet_type=magnet_type)
+                      for magnet_type in LEAD_MAGNET_TYPES}
+            total = self.count_rows('leads')
+
+        stats = {'total_leads': total}
+        for magnet_type in LEAD_MAGNET_TYPES:
+            stats[f'leads_{magnet_type}'] = counts.get(magnet_type, 0)
+        return stats
+
     def get_leads_stats(self):
         try:
-            all_leads = self.get_all_leads()
-            return {
-                'total_leads': len(all_leads),
-                'leads_secretos': len([l for l in all_leads if l.get('magnet_type') == 'secretos']),
-                'leads_errores': len([l for l in all_leads if l.get('magnet_type') == 'errores']),
-                'leads_guia_rx': len([l for l in all_leads if l.get('magnet_type') == 'guia_rx']),
-            }
+            return dict(self._cached('leads', 'stats', self._load_leads_stats))
         except Exception as e:
             logger.error(f"Error getting leads stats: {e}")
-            return {'total_leads': 0, 'leads_secretos': 0, 'leads_errores': 0, 'leads_guia_rx': 0}
+            return {'total_leads': 0, **{f'leads_{magnet_type}': 0 for magnet_type in LEAD_MAGNET_TYPES}}
+
+    # PAGINACIÓN POR KEYSET (panel de administración)
+    def get_page(self, table, columns, cursor=None, limit=50):
+        """Página ordenada por (created_at, id) descendente; devuelve (filas, siguiente_cursor)"""
+        query = (self.supabase.table(table)
+                 .select(','.join(columns))
+                 .order('created_at', desc=True)
+                 .order('id', desc=True)
+                 .limit(limit + 1))
+        if cursor:
+            created_at, row_id = decode_cursor(cursor)
+            query = query.or_(f'created_at.lt."{created_at}",'
+                              f'and(created_at.eq."{created_at}",id.lt.{row_id})')
+
+        rows = query.execute().data
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        return rows, next_cursor
+
+    def get_table_count(self, table):
+        try:
+            return self._cached(table, 'count', lambda: self.count_rows(table))
+        except Exception as e:
+            logger.error(f"Error counting {table}: {e}")
+            return 0
 
     # APPOINTMENTS OPERATIONS
     def create_appointment(self, appointment_data):
         try:
             result = self.supabase.table('appointments').insert(appointment_data).execute()
+            self._invalidate('appointments')
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Error creating appointment: {e}")
@@ -85,8 +344,8 @@ class DatabaseManager:
 
     def get_all_appointments(self):
         try:
-            result = self.supabase.table('appointments').select('*').order('created_at', desc=True).execute()
-            return result.data
+            return self._cached('appointments', 'all',
+                                lambda: self.supabase.table('appointments').select('*').order('created_at', desc=True).execute().data)
         except Exception as e:
             logger.error(f"Error fetching appointments: {e}")
             return []
@@ -95,6 +354,7 @@ class DatabaseManager:
     def create_sales_candidate(self, candidate_data):
         try:
             result = self.supabase.table('sales_candidates').insert(candidate_data).execute()
+            self._invalidate('sales_candidates')
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Error creating sales candidate: {e}")
@@ -102,8 +362,8 @@ class DatabaseManager:
 
     def get_all_sales_candidates(self):
         try:
-            result = self.supabase.table('sales_candidates').select('*').order('created_at', desc=True).execute()
-            return result.data
+            return self._cached('sales_candidates', 'all',
+                                lambda: self.supabase.table('sales_candidates').select('*').order('created_at', desc=True).execute().data)
         except Exception as e:
             logger.error(f"Error fetching sales candidates: {e}")
             return []
@@ -112,6 +372,7 @@ class DatabaseManager:
     def create_patient(self, patient_data):
         try:
             result = self.supabase.table('patients').insert(patient_data).execute()
+            self._invalidate('patients')
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Error creating patient: {e}")
@@ -119,8 +380,8 @@ class DatabaseManager:
 
     def get_all_patients(self):
         try:
-            result = self.supabase.table('patients').select('*').order('created_at', desc=True).execute()
-            return result.data
+            return self._cached('patients', 'all',
+                                lambda: self.supabase.table('patients').select('*').order('created_at', desc=True).execute().data)
         except Exception as e:
             logger.error(f"Error fetching patients: {e}")
             return []
@@ -128,6 +389,7 @@ class DatabaseManager:
     def update_patient(self, patient_id, patient_data):
         try:
             result = self.supabase.table('patients').update(patient_data).eq('id', patient_id).execute()
+            self._invalidate('patients')
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Error updating patient: {e}")
@@ -136,6 +398,7 @@ class DatabaseManager:
     def delete_patient(self, patient_id):
         try:
             result = self.supabase.table('patients').delete().eq('id', patient_id).execute()
+            self._invalidate('patients')
             return True
         except Exception as e:
             logger.error(f"Error deleting patient: {e}")
@@ -144,8 +407,8 @@ class DatabaseManager:
     # PRODUCTS OPERATIONS
     def get_all_products(self):
         try:
-            result = self.supabase.table('products').select('*').execute()
-            return result.data
+            return self._cached('products', 'all',
+                                lambda: self.supabase.table('products').select('*').execute().data)
         except Exception as e:
             logger.error(f"Error fetching products: {e}")
             return []
@@ -153,8 +416,8 @@ class DatabaseManager:
     # COURSES OPERATIONS
     def get_all_courses(self):
         try:
-            result = self.supabase.table('courses').select('*').execute()
-            return result.data
+            return self._cached('courses', 'all',
+                                lambda: self.supabase.table('courses').select('*').execute().data)
         except Exception as e:
             logger.error(f"Error fetching courses: {e}")
             return []
@@ -162,17 +425,231 @@ class DatabaseManager:
     def update_course_spots(self, course_id, spots):
         try:
             result = self.supabase.table('courses').update({'available_spots': spots}).eq('id', course_id).execute()
+            self._invalidate('courses')
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Error updating course spots: {e}")
             return None
 
+    def get_course(self, course_id):
+        """Leer un solo curso por id (sin descargar toda la tabla)"""
+        result = (self.supabase.table('courses')
+                  .select('id', 'name', 'available_spots')
+                  .eq('id', course_id)
+                  .limit(1)
+                  .execute())
+        return result.data[0] if result.data else None
+
+    def enroll_in_course(self, course_id, max_wait=10.0):
+        """Descontar un cupo de forma atómica; devuelve el curso actualizado o None si no hay cupos.
+
+        Usa la función enroll_in_course de Postgres (sql/enroll_in_course.sql); si no está
+        instalada, un UPDATE condicional compare-and-swap sobre available_spots.
+        El UPDATE condicional se reintenta con backoff aleatorio mientras queden cupos;
+        si en max_wait segundos no gana ninguna carrera lanza EnrollmentBusyError.
+        Los errores de Supabase se propagan al llamador.
+        """
+        if self._enroll_rpc_available:
+            try:
+                rows = self.supabase.rpc('enroll_in_course', {'p_course_id': course_id}).execute().data
+                if rows:
+                    self._invalidate('courses')
+                return rows[0] if rows else None
+            except Exception as e:
+                if 'PGRST202' not in str(e):
+                    raise
+                logger.warning("RPC enroll_in_course no disponible, usando UPDATE condicional")
+                self._enroll_rpc_available = False
+
+        deadline = time.monotonic() + max_wait
+        attempt = 0
+        while True:
+            course = self.get_course(course_id)
+            if not course or course['available_spots'] <= 0:
+                return None
+            spots = course['available_spots']
+            result = (self.supabase.table('courses')
+                      .update({'available_spots': spots - 1})
+                      .eq('id', course_id)
+                      .eq('available_spots', spots)
+                      .execute())
+            if result.data:
+                self._invalidate('courses')
+                return result.data[0]
+
+            # Otro proceso ganó la carrera: esperar un poco (jitter) y volver a leer
+            attempt += 1
+            delay = random.uniform(0, min(0.5, 0.01 * 2 ** min(attempt, 6)))
+            if time.monotonic() + delay >= deadline:
+                raise EnrollmentBusyError(f"Curso {course_id}: sin cupo confirmado tras {attempt} intentos")
+            time.sleep(delay)
+
+
+# Instancia global del manejador de base de datos (con caché de lecturas)
+db_cache = TableCache(
+    DB_CACHE_TTLS,
+    max_entries=DB_CACHE_MAX_ENTRIES,
+    invalidation_dir=os.path.join(DATA_DIR, 'cache_generations')
+)
+db = DatabaseManager(cache=db_cache)
+
+# Inserciones de los formularios de captación, agrupadas por tabla
+lead_batcher = InsertBatcher(db.insert_rows, max_rows=LEAD_BATCH_MAX_ROWS,
+                             max_wait=LEAD_BATCH_MAX_WAIT_MS / 1000, is_permanent=is_row_rejection)
+
+# Spool local de leads: se reenvía con la clave de idempotencia de cada fila
+lead_spool = LeadSpool(
+    os.path.join(DATA_DIR, 'lead_spool.db'),
+    lambda table, rows: db.insert_rows(table, rows, on_conflict=LEAD_IDEMPOTENCY_COLUMN),
+    key_column=LEAD_IDEMPOTENCY_COLUMN,
+    batch_size=LEAD_BATCH_MAX_ROWS,
+    is_permanent=lambda exc: is_row_rejection(exc) or spool_column_missing(exc),
+    max_delay=LEAD_SPOOL_MAX_DELAY
+)
+_spool_tables = {}  # tabla -> tiene la columna de idempotencia (comprobado una vez por proceso)
+
+
+def use_lead_spool(table):
+    """El spool solo se usa si está confirmado que la tabla tiene la columna de idempotencia
+
+    Sin la migración todos los reenvíos fallarían: se inserta en lote dentro de la
+    petición como antes. Si Supabase no responde no se puede confirmar; ese lead
+    va por lead_batcher y se vuelve a comprobar en el siguiente.
+    """
+    if not LEAD_SPOOL_ENABLED:
+        return False
+    ready = _spool_tables.get(table)
+    if ready is None:
+        ready = db.has_column(table, LEAD_IDEMPOTENCY_COLUMN)
+        if ready is None:
+            logger.error(f"No se pudo confirmar {table}.{LEAD_IDEMPOTENCY_COLUMN}: "
+                         f"este lead de {table} se inserta sin spool")
+            return False
+        _spool_tables[table] = ready
+        if not ready:
+            logger.error(f"{table}.{LEAD_IDEMPOTENCY_COLUMN} no existe (aplicar sql/lead_idempotency_keys.sql): "
+                         f"los leads de {table} se insertan sin spool")
+    return ready
 
-# Instancia global del manejador de base de datos
-db = DatabaseManager()
 
+def spool_column_missing(exc):
+    """Un reenvío falló porque falta la columna de idempotencia (migración revertida)
 
-# [Mantener todas las funciones de email existentes sin cambios]
+    Reintentarlo bloquearía la cabeza del spool para todos los workers: la fila se
+    aparta (requeue_failed la recupera tras aplicar la migración) y se vuelve a
+    comprobar la columna antes del siguiente lead.
+    """
+    if not is_missing_column(exc):
+        return False
+    _spool_tables.clear()
+    logger.error(f"Falta {LEAD_IDEMPOTENCY_COLUMN} en Supabase (aplicar sql/lead_idempotency_keys.sql y "
+                 f"reencolar con POST /admin/lead_spool/requeue): {exc}")
+    return True
+
+
+# Envíos repetidos de los formularios, suprimidos antes de tocar Supabase o SMTP
+lead_dedup = LeadDeduplicator(
+    os.path.join(DATA_DIR, 'lead_dedup.db'),
+    window=LEAD_DEDUP_WINDOW_SECONDS,
+    on_suppressed=metrics.lead_duplicate_suppressed
+)
+
+
+# ENVÍO DE EMAILS
+# Pool de sesiones SMTP por worker: todos los send_* comparten las conexiones
+smtp_pool = SMTPConnectionPool(
+    SMTP_SERVER, SMTP_PORT, EMAIL_USER, EMAIL_PASSWORD,
+    max_size=SMTP_POOL_SIZE,
+    max_age=SMTP_POOL_MAX_AGE,
+    noop_after=SMTP_POOL_NOOP_AFTER,
+    starttls=SMTP_STARTTLS
+)
+
+
+@request_timer.timed('smtp', 'deliver')
+def smtp_deliver(from_addr, to_addrs, raw_message):
+    """Entregar un mensaje ya serializado vía el pool SMTP"""
+    try:
+        smtp_pool.send(from_addr, to_addrs, raw_message)
+    except Exception:
+        metrics.email_delivered(False)
+        raise
+    metrics.email_delivered(True)
+
+
+email_outbox = EmailOutbox(
+    os.path.join(DATA_DIR, 'email_outbox.db'),
+    smtp_deliver,
+    workers=EMAIL_OUTBOX_WORKERS,
+    max_attempts=EMAIL_OUTBOX_MAX_ATTEMPTS
+)
+
+
+attachment_cache = AttachmentCache(max_bytes=ATTACHMENT_CACHE_MAX_BYTES)
+download_signer = URLSafeTimedSerializer(app.secret_key, salt='descargas')
+
+
+def sales_guide_download_url():
+    """Enlace firmado y con caducidad para descargar la guía de vendedores"""
+    token = download_signer.dumps(os.path.basename(SALES_GUIDE_PATH))
+    return url_for('descarga_firmada', token=token, _external=True)
+
+
+# Plantillas de email: compiladas una vez y con los bloques estáticos pre-renderizados
+email_templates = EmailTemplateRegistry(os.path.join(app.root_path, 'templates', 'emails'))
+
+email_templates.prerender('encabezado_vendedores', 'bloques/encabezado.html',
+                          color_inicio='#5B21B6', color_fin='#ef4444', padding='30px', tamano_titulo='2rem',
+                          titulo='¡Tu Guía de Estudio Está Aquí!', subtitulo='PROEDENT - Equipo de Ventas')
+email_templates.prerender('encabezado_candidato', 'bloques/encabezado.html',
+                          color_inicio='#5B21B6', color_fin='#ef4444', padding='20px',
+                          titulo='🎯 Nuevo Candidato a Vendedor', subtitulo='Solicitud de Unirse al Equipo de Ventas')
+email_templates.prerender('encabezado_demo', 'bloques/encabezado.html',
+                          color_inicio='#5B21B6', color_fin='#ef4444', padding='20px',
+                          titulo='Nueva Solicitud de Demostración/Consulta')
+email_templates.prerender('encabezado_confirmacion', 'bloques/encabezado.html',
+                          color_inicio='#5B21B6', color_fin='#ef4444', padding='20px',
+                          titulo='¡Solicitud Recibida!')
+email_templates.prerender('encabezado_webinar', 'bloques/encabezado.html',
+                          color_inicio='#1e3a8a', color_fin='#065f46', padding='30px', tamano_titulo='2rem',
+                          titulo='¡Registro Confirmado!', subtitulo='Webinar DMG - PROEDENT Ecuador')
+email_templates.prerender('encabezado_webinar_notificacion', 'bloques/encabezado.html',
+                          color_inicio='#1e3a8a', color_fin='#065f46', padding='20px',
+                          titulo='🎯 Nuevo Registro Webinar DMG', subtitulo='Sinergia Endodoncia y Rehabilitación Oral')
+
+email_templates.prerender('contacto_demo', 'bloques/contacto.html',
+                          color='#5B21B6', titulo='¿Necesitas una demostración personalizada?',
+                          emails='proedentventasecuador@gmail.com', whatsapp='+593 99 874 5641', extra=[])
+email_templates.prerender('contacto_vendedores', 'bloques/contacto.html',
+                          color='#5B21B6', titulo='¿Necesitas capacitación adicional?',
+                          emails='proedentorg@gmail.com, proedentventasecuador@gmail.com',
+                          whatsapp='+593 98 755 3634, +593 99 874 5641',
+                          extra=[Markup('<strong>💵 Capacitación Adicional Opcional:</strong> Solo $10 USD')])
+email_templates.prerender('contacto_webinar', 'bloques/contacto.html',
+                          color='#1e3a8a', titulo='¿Tienes preguntas?',
+                          emails='proedentventasecuador@gmail.com', whatsapp='+593 99 874 5641',
+                          extra=[Markup('<strong>🌐 Web:</strong> <a href="https://proedent1.onrender.com" '
+                                        'style="color: #1e3a8a;">proedent1.onrender.com</a>')])
+
+email_templates.prerender('pie_vendedores', 'bloques/pie.html',
+                          texto='PROEDENT - Tu oportunidad de generar ingresos extraordinarios')
+email_templates.prerender('pie_webinar', 'bloques/pie.html',
+                          texto='PROEDENT Ecuador - Distribuidores Oficiales DMG')
+
+email_templates.compile_all()
+
+
+def deliver_email(msg):
+    """Encolar el mensaje en el outbox, o enviarlo directamente si está desactivado"""
+    if EMAIL_OUTBOX_ENABLED:
+        email_outbox.enqueue(msg)
+        return
+
+    recipients = [addr for _, addr in getaddresses(msg.get_all('To', []) + msg.get_all('Cc', []))]
+    smtp_deliver(msg['From'], recipients, msg.as_bytes())
+
+
+@request_timer.timed('email')
 def send_lead_magnet_email(lead_data, magnet_type, interests):
     """Enviar correo con lead magnet"""
     try:
@@ -180,58 +657,20 @@ def send_lead_magnet_email(lead_data, magnet_type, interests):
             logger.error("Credenciales de email no configuradas")
             return False
 
-        magnet_info = {
-            'secretos': {
-                'subject': '🔥 Los 10 Secretos de las Mejores Clínicas Dentales',
-                'title': 'Los 10 Secretos Están Aquí!'
-            },
-            'errores': {
-                'subject': '⚠️ URGENTE: 10 Errores MORTALES que Destruyen Clínicas',
-                'title': '¡Tu Clínica Ahora Está Protegida!'
-            },
-            'guia_rx': {
-                'subject': '📋 LEGAL: Guía Completa de Cumplimiento RX Ecuador',
-                'title': '¡Tu Guía Legal Completa!'
-            }
-        }
+        # Cada magnet tiene su plantilla (emails/lead_magnet_<tipo>.html) con subject y título
+        template_name = f"lead_magnet_{magnet_type}"
+        if not email_templates.has(template_name):
+            template_name = 'lead_magnet_secretos'
+        subject, html_content = email_templates.render(template_name, lead=lead_data, interests=interests)
 
-        info = magnet_info.get(magnet_type, magnet_info['secretos'])
         msg = MIMEMultipart()
         msg['From'] = EMAIL_USER
         msg['To'] = lead_data['email']
-        msg['Subject'] = info['subject']
-
-        interests_text = ', '.join(interests) if interests else 'No especificados'
-
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-            <div style="background: linear-gradient(135deg, #5B21B6, #ef4444); padding: 30px; text-align: center;">
-                <h1 style="color: white; margin: 0; font-size: 2rem;">{info['title']}</h1>
-                <p style="color: white; margin: 10px 0 0 0; font-size: 1.1rem;">PROEDENT Ecuador</p>
-            </div>
-            <div style="padding: 30px; background: #f9f9f9;">
-                <h2 style="color: #5B21B6;">Hola {lead_data['nombre']},</h2>
-                <p style="font-size: 1.1rem; line-height: 1.6;">
-                    ¡Perfecto! Tu guía especializada está lista. 
-                </p>
-                <div style="text-align: center; margin: 30px 0;">
-                    <h3 style="color: #5B21B6;">¿Necesitas una demostración personalizada?</h3>
-                    <p style="margin: 5px 0;"><strong>📧 Email:</strong> proedentventasecuador@gmail.com</p>
-                    <p style="margin: 5px 0;"><strong>📱 WhatsApp:</strong> <a href="https://wa.me/593998745641" style="color: #5B21B6;">+593 99 874 5641</a></p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        msg['Subject'] = subject
 
         msg.attach(MIMEText(html_content, 'html'))
 
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        deliver_email(msg)
 
         return True
     except Exception as e:
@@ -239,6 +678,7 @@ def send_lead_magnet_email(lead_data, magnet_type, interests):
         return False
 
 
+@request_timer.timed('email')
 def send_lead_notification_to_proedent(lead_data, magnet_type, interests):
     """Enviar notificación de nuevo lead a PROEDENT"""
     try:
@@ -250,26 +690,18 @@ def send_lead_notification_to_proedent(lead_data, magnet_type, interests):
         msg['To'] = "proedentventasecuador@gmail.com"
         msg['Subject'] = f"🎯 Nuevo Lead: {lead_data['nombre']}"
 
-        html_content = f"""
-        <p>Nuevo lead capturado:</p>
-        <p><strong>Nombre:</strong> {lead_data['nombre']}</p>
-        <p><strong>Email:</strong> {lead_data['email']}</p>
-        <p><strong>Tipo:</strong> {magnet_type}</p>
-        """
+        _, html_content = email_templates.render('lead_notification', lead=lead_data, magnet_type=magnet_type)
 
         msg.attach(MIMEText(html_content, 'html'))
 
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        deliver_email(msg)
 
         return True
     except Exception as e:
         logger.error(f"Error enviando notificación: {e}")
         return False
 
+@request_timer.timed('email')
 def send_sales_recruitment_email(candidate_data):
     """Enviar correo con guía de estudio para vendedores"""
     try:
@@ -283,84 +715,26 @@ def send_sales_recruitment_email(candidate_data):
         msg['To'] = candidate_data['email']
         msg['Subject'] = "🎯 Tu Guía de Estudio - Vendedor PROEDENT"
 
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-            <div style="background: linear-gradient(135deg, #5B21B6, #ef4444); padding: 30px; text-align: center;">
-                <h1 style="color: white; margin: 0; font-size: 2rem;">¡Tu Guía de Estudio Está Aquí!</h1>
-                <p style="color: white; margin: 10px 0 0 0; font-size: 1.1rem;">PROEDENT - Equipo de Ventas</p>
-            </div>
-
-            <div style="padding: 30px; background: #f9f9f9;">
-                <h2 style="color: #5B21B6;">Hola {candidate_data['nombre']},</h2>
-
-                <p style="font-size: 1.1rem; line-height: 1.6;">
-                    ¡Perfecto! Hemos recibido tu postulación para unirte a nuestro equipo de vendedores.
-                    Tu guía de estudio con el catálogo completo de equipos CT y RX está adjunta en formato PDF.
-                </p>
-
-                <div style="background: #e8f5e8; padding: 20px; border-radius: 10px; margin: 20px 0; border-left: 4px solid #10b981;">
-                    <h3 style="color: #059669; margin-top: 0;">📎 Archivo Adjunto:</h3>
-                    <p style="color: #047857; margin: 0;"><strong>GUIAvendedores.pdf</strong> - Catálogo completo de productos PROEDENT</p>
-                </div>
-
-                <div style="background: #fef3c7; padding: 20px; border-radius: 10px; margin: 20px 0; border-left: 4px solid #f59e0b;">
-                    <h3 style="color: #92400e; margin-top: 0;">📋 Próximos Pasos:</h3>
-                    <ul style="color: #92400e;">
-                        <li>Descarga y estudia la guía PDF adjunta</li>
-                        <li>Prepárate para el cuestionario presencial en Quito</li>
-                        <li>Tienes 2 oportunidades para aprobar</li>
-                    </ul>
-                </div>
-
-                <div style="background: white; padding: 20px; border-radius: 10px; margin: 20px 0; border-left: 4px solid #5B21B6;">
-                    <h3 style="color: #5B21B6; margin-top: 0;">💰 Comisiones:</h3>
-                    <p><strong>Hasta el 15% de comisión por cada venta realizada</strong></p>
-                    <p>Ciudad: {candidate_data.get('ciudad', 'No especificada')}</p>
-                </div>
-
-                <div style="text-align: center; margin: 30px 0;">
-                    <h3 style="color: #5B21B6;">¿Necesitas capacitación adicional?</h3>
-                    <p style="margin: 5px 0;"><strong>📧 Email:</strong> proedentorg@gmail.com, proedentventasecuador@gmail.com</p>
-                    <p style="margin: 5px 0;"><strong>📱 WhatsApp:</strong> <a href="https://wa.me/593998745641" style="color: #5B21B6;">+593 98 755 3634, +593 99 874 5641</a></p>
-                    <p style="margin: 5px 0;"><strong>💵 Capacitación Adicional Opcional:</strong> Solo $10 USD</p>
-                </div>
-            </div>
-
-            <div style="background: #333; color: white; text-align: center; padding: 20px;">
-                <p style="margin: 0;">PROEDENT - Tu oportunidad de generar ingresos extraordinarios</p>
-            </div>
-        </body>
-        </html>
-        """
+        guide_link = sales_guide_download_url() if SALES_GUIDE_AS_LINK else None
+
+        _, html_content = email_templates.render('sales_recruitment', candidate=candidate_data, guide_link=guide_link,
+                                                 link_days=SALES_GUIDE_LINK_MAX_AGE // 86400)
 
         msg.attach(MIMEText(html_content, 'html'))
 
-        # ADJUNTAR EL PDF DE LA GUÍA
-        try:
-            pdf_path = os.path.join('static', 'pdfs', 'GUIAvendedores.pdf')
-            if os.path.exists(pdf_path):
-                with open(pdf_path, 'rb') as f:
-                    attach = MIMEBase('application', 'octet-stream')
-                    attach.set_payload(f.read())
-                    encoders.encode_base64(attach)
-                    attach.add_header(
-                        'Content-Disposition',
-                        'attachment; filename= "GUIA_Vendedores_PROEDENT.pdf"'
-                    )
-                    msg.attach(attach)
-                logger.info("PDF adjuntado exitosamente")
-            else:
-                logger.warning(f"Archivo PDF no encontrado en: {pdf_path}")
-        except Exception as pdf_error:
-            logger.error(f"Error adjuntando PDF: {pdf_error}")
+        # ADJUNTAR EL PDF DE LA GUÍA (codificado una sola vez gracias a la caché)
+        if not guide_link:
+            try:
+                if os.path.exists(SALES_GUIDE_PATH):
+                    msg.attach(attachment_cache.get_part(SALES_GUIDE_PATH, "GUIA_Vendedores_PROEDENT.pdf"))
+                    logger.info("PDF adjuntado exitosamente")
+                else:
+                    logger.warning(f"Archivo PDF no encontrado en: {SALES_GUIDE_PATH}")
+            except Exception as pdf_error:
+                logger.error(f"Error adjuntando PDF: {pdf_error}")
 
-        # Enviar email
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        # Encolar email
+        deliver_email(msg)
 
         logger.info(f"Guía de vendedores enviada exitosamente a: {candidate_data['email']}")
         return True
@@ -369,6 +743,7 @@ def send_sales_recruitment_email(candidate_data):
         logger.error(f"Error enviando guía de vendedores: {e}")
         return False
 
+@request_timer.timed('email')
 def send_sales_candidate_notification_to_proedent(candidate_data):
     """Enviar notificación de nuevo candidato a vendedor"""
     try:
@@ -381,75 +756,12 @@ def send_sales_candidate_notification_to_proedent(candidate_data):
         msg['Cc'] = "proedentventasecuador@gmail.com"
         msg['Subject'] = f"🎯 Nuevo Candidato a Vendedor: {candidate_data['nombre']} - {candidate_data.get('ciudad', 'Ecuador')}"
 
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-            <div style="background: linear-gradient(135deg, #5B21B6, #ef4444); padding: 20px; text-align: center;">
-                <h1 style="color: white; margin: 0;">🎯 Nuevo Candidato a Vendedor</h1>
-                <p style="color: white; margin: 10px 0 0 0;">Solicitud de Unirse al Equipo de Ventas</p>
-            </div>
-
-            <div style="padding: 30px; background: #f9f9f9;">
-                <table style="width: 100%; margin: 20px 0;">
-                    <tr>
-                        <td style="padding: 10px; background: white; border-left: 4px solid #5B21B6; font-weight: bold;">
-                            Nombre Completo:
-                        </td>
-                        <td style="padding: 10px; background: white;">
-                            {candidate_data['nombre']}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: #f0f0f0; border-left: 4px solid #ef4444; font-weight: bold;">
-                            Email:
-                        </td>
-                        <td style="padding: 10px; background: #f0f0f0;">
-                            {candidate_data['email']}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: white; border-left: 4px solid #5B21B6; font-weight: bold;">
-                            Teléfono/WhatsApp:
-                        </td>
-                        <td style="padding: 10px; background: white;">
-                            {candidate_data['telefono']}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: #f0f0f0; border-left: 4px solid #ef4444; font-weight: bold;">
-                            Ciudad:
-                        </td>
-                        <td style="padding: 10px; background: #f0f0f0;">
-                            {candidate_data.get('ciudad', 'No especificada')}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: white; border-left: 4px solid #5B21B6; font-weight: bold;">
-                            Experiencia:
-                        </td>
-<td style="padding: 10px; background: white;">
-                            {candidate_data.get('experiencia_sector', 'No especificada')}
-                        </td>
-                    </tr>
-                </table>
-
-                <div style="background: #e3f2fd; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                    <p style="margin: 0; color: #1565c0;">
-                        <strong>Fecha de postulación:</strong> {datetime.now().strftime('%d/%m/%Y %H:%M')}
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        _, html_content = email_templates.render('sales_candidate_notification', candidate=candidate_data,
+                                                 fecha=datetime.now().strftime('%d/%m/%Y %H:%M'))
 
         msg.attach(MIMEText(html_content, 'html'))
 
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        deliver_email(msg)
 
         return True
 
@@ -458,6 +770,7 @@ def send_sales_candidate_notification_to_proedent(candidate_data):
         return False
 
 
+@request_timer.timed('email')
 def send_demo_request_email(form_data):
     """Enviar correo con solicitud de demostración/consulta"""
     try:
@@ -470,85 +783,12 @@ def send_demo_request_email(form_data):
         msg['To'] = "proedentventasecuador@gmail.com"
         msg['Subject'] = f"Nueva Solicitud - {form_data['nombre']}"
 
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-            <div style="background: linear-gradient(135deg, #5B21B6, #ef4444); padding: 20px; text-align: center;">
-                <h1 style="color: white; margin: 0;">Nueva Solicitud de Demostración/Consulta</h1>
-            </div>
-
-            <div style="padding: 30px; background: #f9f9f9;">
-                <h2 style="color: #5B21B6; border-bottom: 2px solid #5B21B6; padding-bottom: 10px;">
-                    Información del Cliente
-                </h2>
-
-                <table style="width: 100%; margin: 20px 0;">
-                    <tr>
-                        <td style="padding: 10px; background: white; border-left: 4px solid #5B21B6; font-weight: bold;">
-                            Nombre:
-                        </td>
-                        <td style="padding: 10px; background: white;">
-                            {form_data['nombre']}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: #f0f0f0; border-left: 4px solid #ef4444; font-weight: bold;">
-                            Correo:
-                        </td>
-                        <td style="padding: 10px; background: #f0f0f0;">
-                            {form_data['correo']}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: white; border-left: 4px solid #5B21B6; font-weight: bold;">
-                            Teléfono:
-                        </td>
-                        <td style="padding: 10px; background: white;">
-                            {form_data.get('telefono', 'No proporcionado')}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: #f0f0f0; border-left: 4px solid #ef4444; font-weight: bold;">
-                            Representante/Área:
-                        </td>
-                        <td style="padding: 10px; background: #f0f0f0;">
-                            {form_data['representante']}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: white; border-left: 4px solid #5B21B6; font-weight: bold;">
-                            Fecha Preferida:
-                        </td>
-                        <td style="padding: 10px; background: white;">
-                            {form_data.get('fecha', 'No especificada')}
-                        </td>
-                    </tr>
-                </table>
-
-                {f'''
-                <h3 style="color: #ef4444; margin-top: 30px;">Mensaje/Consulta:</h3>
-                <div style="background: white; padding: 15px; border-radius: 5px; border-left: 4px solid #ef4444;">
-                    {form_data.get('mensaje', 'Sin mensaje adicional').replace(chr(10), '<br>')}
-                </div>
-                ''' if form_data.get('mensaje') else ''}
-
-                <div style="margin-top: 30px; padding: 15px; background: #e3f2fd; border-radius: 5px;">
-                    <p style="margin: 0; color: #1565c0;">
-                        <strong>Fecha de solicitud:</strong> {datetime.now().strftime('%d/%m/%Y %H:%M')}
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        _, html_content = email_templates.render('demo_request', form=form_data,
+                                                 fecha=datetime.now().strftime('%d/%m/%Y %H:%M'))
 
         msg.attach(MIMEText(html_content, 'html'))
 
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        deliver_email(msg)
 
         logger.info(f"Correo enviado exitosamente para: {form_data['nombre']}")
         return True
@@ -558,6 +798,7 @@ def send_demo_request_email(form_data):
         return False
 
 
+@request_timer.timed('email')
 def send_confirmation_email(client_data):
     """Enviar correo de confirmación al cliente"""
     try:
@@ -569,44 +810,11 @@ def send_confirmation_email(client_data):
         msg['To'] = client_data['correo']
         msg['Subject'] = "Confirmación de Solicitud - PROEDENT"
 
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-            <div style="background: linear-gradient(135deg, #5B21B6, #ef4444); padding: 20px; text-align: center;">
-                <h1 style="color: white; margin: 0;">¡Solicitud Recibida!</h1>
-            </div>
-
-            <div style="padding: 30px; background: #f9f9f9;">
-                <p style="font-size: 18px;">Hola <strong>{client_data['nombre']}</strong>,</p>
-
-                <p>Hemos recibido tu solicitud de demostración/consulta y nos pondremos en contacto contigo muy pronto.</p>
-
-                <div style="background: white; padding: 20px; border-radius: 10px; margin: 20px 0; border-left: 4px solid #5B21B6;">
-                    <h3 style="color: #5B21B6; margin-top: 0;">Resumen de tu solicitud:</h3>
-                    <p><strong>Representante asignado:</strong> {client_data['representante']}</p>
-                    {f"<p><strong>Fecha preferida:</strong> {client_data.get('fecha', 'No especificada')}</p>" if client_data.get('fecha') else ''}
-                    {f"<p><strong>Tu consulta:</strong> {client_data.get('mensaje', 'Sin mensaje')}</p>" if client_data.get('mensaje') else ''}
-                </div>
-
-                <div style="text-align: center; margin: 30px 0;">
-                    <p>Si tienes alguna pregunta urgente, puedes contactarnos:</p>
-                    <p>
-                        📧 proedentventasecuador@gmail.com<br>
-                        📱 WhatsApp: <a href="https://wa.me/593998745641" style="color: #5B21B6;">+593 99 874 5641</a>
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        _, html_content = email_templates.render('demo_confirmation', client=client_data)
 
         msg.attach(MIMEText(html_content, 'html'))
 
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        deliver_email(msg)
 
         return True
 
@@ -616,6 +824,7 @@ def send_confirmation_email(client_data):
 
 
 # Función para enviar correo de confirmación del webinar
+@request_timer.timed('email')
 def send_webinar_registration_email(lead_data, interests):
     """Enviar correo con enlace del webinar DMG"""
     try:
@@ -628,86 +837,11 @@ def send_webinar_registration_email(lead_data, interests):
         msg['To'] = lead_data['email']
         msg['Subject'] = "🎯 Confirmación: Webinar DMG - Sinergia Endodoncia y Rehabilitación Oral"
 
-        interests_text = ', '.join(interests) if interests else 'No especificados'
-        webinar_link = "https://www.dmg-dental.com/en/education-and-events/education/detail/endo-restorative-synergy-preparatory-steps-toward-predictable-adhesive-integration"
-
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-            <div style="background: linear-gradient(135deg, #1e3a8a, #065f46); padding: 30px; text-align: center;">
-                <h1 style="color: white; margin: 0; font-size: 2rem;">¡Registro Confirmado!</h1>
-                <p style="color: white; margin: 10px 0 0 0; font-size: 1.1rem;">Webinar DMG - PROEDENT Ecuador</p>
-            </div>
-
-            <div style="padding: 30px; background: #f9f9f9;">
-                <h2 style="color: #1e3a8a;">Hola {lead_data['nombre']},</h2>
-
-                <p style="font-size: 1.1rem; line-height: 1.6;">
-                    ¡Perfecto! Tu registro para el webinar de DMG ha sido confirmado. Te esperamos para esta 
-                    conferencia magistral sobre sinergia en endodoncia y rehabilitación oral.
-                </p>
-
-                <div style="background: white; padding: 25px; border-radius: 15px; margin: 25px 0; border-left: 4px solid #1e3a8a;">
-                    <h3 style="color: #1e3a8a; margin-top: 0;">📅 Detalles del Evento:</h3>
-                    <p><strong>Tema:</strong> "Sinergia Endodoncia y Rehabilitación Oral: Pasos previos para la integración Adhesiva"</p>
-                    <p><strong>Ponente:</strong> Dr. Roberto Carlos Tello Torres</p>
-                    <p><strong>Fecha:</strong> Martes 30 de Septiembre</p>
-                    <p><strong>Hora:</strong> 1:00 PM Quito & Bogotá / 12:00 PM México</p>
-                    <p><strong>Duración:</strong> Aproximadamente 60 minutos</p>
-                    <p><strong>Idioma:</strong> Español</p>
-                </div>
-
-                <div style="background: #e8f5e8; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                    <h3 style="color: #2e7d32; margin-top: 0;">🔗 Enlace de Acceso:</h3>
-                    <p style="margin: 10px 0;">
-                        <a href="{webinar_link}" 
-                           style="background: #1e3a8a; color: white; padding: 15px 30px; text-decoration: none; border-radius: 8px; font-weight: bold; display: inline-block;">
-                            ACCEDER AL WEBINAR
-                        </a>
-                    </p>
-                    <p style="color: #2e7d32; font-size: 0.9rem; margin: 15px 0 0 0;">
-                        <strong>Importante:</strong> Registrate en la página oficial de DMG para que te llegue el enlace de Zoom directamente lo antes posible o te llegará el enlace 2 horas antes del evento, junto con un recordatorio por parte de PROEDENT.
-                    </p>
-                </div>
-
-                <div style="background: white; padding: 20px; border-radius: 10px; margin: 20px 0; border-left: 4px solid #065f46;">
-                    <h3 style="color: #065f46; margin-top: 0;">Tus intereses seleccionados:</h3>
-                    <p><strong>{interests_text}</strong></p>
-                </div>
-
-                <div style="background: #eff6ff; padding: 20px; border-radius: 10px; margin: 25px 0;">
-                    <h3 style="color: #1d4ed8; margin-top: 0;">🦷 ¿Te interesan nuestros productos DMG?</h3>
-                    <p style="color: #1e40af; margin: 5px 0;">
-                        <strong>Catálogo completo:</strong> 
-                        <a href="https://proedent.org/catalogo" style="color: #1d4ed8;">proedent.org/catalogo</a>
-                    </p>
-                    <p style="color: #1e40af; margin: 5px 0;">
-                        <strong>Microscopios para Endodoncia:</strong> Pregúntanos por nuestros equipos Labomed especializados
-                    </p>
-                </div>
-
-                <div style="text-align: center; margin: 30px 0;">
-                    <h3 style="color: #1e3a8a;">¿Tienes preguntas?</h3>
-                    <p style="margin: 5px 0;"><strong>📧 Email:</strong> proedentventasecuador@gmail.com</p>
-                    <p style="margin: 5px 0;"><strong>📱 WhatsApp:</strong> <a href="https://wa.me/593998745641" style="color: #1e3a8a;">+593 99 874 5641</a></p>
-                    <p style="margin: 5px 0;"><strong>🌐 Web:</strong> <a href="https://proedent1.onrender.com" style="color: #1e3a8a;">proedent1.onrender.com</a></p>
-                </div>
-            </div>
-
-            <div style="background: #333; color: white; text-align: center; padding: 20px;">
-                <p style="margin: 0;">PROEDENT Ecuador - Distribuidores Oficiales DMG</p>
-            </div>
-        </body>
-        </html>
-        """
+        _, html_content = email_templates.render('webinar_registration', lead=lead_data, interests=interests)
 
         msg.attach(MIMEText(html_content, 'html'))
 
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        deliver_email(msg)
 
         logger.info(f"Confirmación webinar enviada exitosamente a: {lead_data['email']}")
         return True
@@ -717,6 +851,7 @@ def send_webinar_registration_email(lead_data, interests):
         return False
 
 
+@request_timer.timed('email')
 def send_webinar_notification_to_proedent(lead_data, interests):
     """Enviar notificación de nuevo registro de webinar a PROEDENT"""
     try:
@@ -728,72 +863,12 @@ def send_webinar_notification_to_proedent(lead_data, interests):
         msg['To'] = "proedentventasecuador@gmail.com"
         msg['Subject'] = f"🎯 Nuevo Registro Webinar DMG: {lead_data['nombre']}"
 
-        interests_text = ', '.join(interests) if interests else 'No especificados'
-
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-            <div style="background: linear-gradient(135deg, #1e3a8a, #065f46); padding: 20px; text-align: center;">
-                <h1 style="color: white; margin: 0;">🎯 Nuevo Registro Webinar DMG</h1>
-                <p style="color: white; margin: 10px 0 0 0;">Sinergia Endodoncia y Rehabilitación Oral</p>
-            </div>
-
-            <div style="padding: 30px; background: #f9f9f9;">
-                <table style="width: 100%; margin: 20px 0;">
-                    <tr>
-                        <td style="padding: 10px; background: white; border-left: 4px solid #1e3a8a; font-weight: bold;">
-                            Nombre:
-                        </td>
-                        <td style="padding: 10px; background: white;">
-                            {lead_data['nombre']}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: #f0f0f0; border-left: 4px solid #065f46; font-weight: bold;">
-                            Email:
-                        </td>
-                        <td style="padding: 10px; background: #f0f0f0;">
-                            {lead_data['email']}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: white; border-left: 4px solid #1e3a8a; font-weight: bold;">
-                            Teléfono:
-                        </td>
-                        <td style="padding: 10px; background: white;">
-                            {lead_data.get('telefono', 'No proporcionado')}
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; background: #f0f0f0; border-left: 4px solid #065f46; font-weight: bold;">
-                            Intereses:
-                        </td>
-                        <td style="padding: 10px; background: #f0f0f0;">
-                            {interests_text}
-                        </td>
-                    </tr>
-                </table>
-
-                <div style="background: #e3f2fd; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                    <p style="margin: 0; color: #1565c0;">
-                        <strong>Fecha de registro:</strong> {datetime.now().strftime('%d/%m/%Y %H:%M')}
-                    </p>
-                    <p style="margin: 0; color: #1565c0;">
-                        <strong>Webinar:</strong> 30 de Septiembre, 1:00 PM
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        _, html_content = email_templates.render('webinar_notification', lead=lead_data, interests=interests,
+                                                 fecha=datetime.now().strftime('%d/%m/%Y %H:%M'))
 
         msg.attach(MIMEText(html_content, 'html'))
 
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        deliver_email(msg)
 
         return True
 
@@ -812,221 +887,242 @@ def admin_required(view_func):
     return wrapper
 
 
+@app.route("/admin/outbox_stats")
+@admin_required
+def outbox_stats():
+    """Métricas del outbox de email (profundidad, latencia, fallos)"""
+    stats = email_outbox.stats()
+    stats['smtp_pool'] = smtp_pool.stats()
+    stats['attachment_cache'] = attachment_cache.stats()
+    return jsonify(stats)
+
+
+@app.route("/admin/cache_stats")
+@admin_required
+def cache_stats():
+    """Aciertos y fallos de la caché de lecturas de Supabase y de la caché de páginas"""
+    stats = db_cache.stats()
+    stats['page_cache'] = page_cache.stats()
+    stats['product_index'] = product_index.stats()
+    return jsonify(stats)
+
+
+@app.route("/admin/lead_capture_stats")
+@admin_required
+def lead_capture_stats():
+    """Spool local, lotes de inserción y duplicados suprimidos de los formularios de captación"""
+    stats = {'batches': lead_batcher.stats()}
+    if LEAD_SPOOL_ENABLED:
+        stats['spool'] = lead_spool.stats()
+        stats['spool']['tables_ready'] = dict(_spool_tables)
+    if LEAD_DEDUP_ENABLED:
+        stats['duplicates'] = lead_dedup.stats()
+    return jsonify(stats)
+
+
+@app.route("/admin/lead_spool/requeue", methods=["POST"])
+@admin_required
+def lead_spool_requeue():
+    """Devolver a la cola los leads del spool que Supabase rechazó (tras corregir el dato o el esquema)"""
+    return jsonify({'requeued': lead_spool.requeue_failed()})
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Métricas en formato de texto Prometheus, agregadas entre todos los workers"""
+    if not metrics.enabled:
+        return "Métricas desactivadas", 404
+    if METRICS_TOKEN:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {METRICS_TOKEN}"):
+            return "No autorizado", 401
+    elif not session.get('admin_logged_in'):
+        return "No encontrado", 404
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+
+@app.route("/admin/timing_stats")
+@admin_required
+def timing_stats():
+    """Histogramas de latencia por ruta y por dependencia (Supabase, SMTP, plantillas)"""
+    return jsonify(request_timer.stats())
+
+
+@app.route("/descargas/<token>")
+def descarga_firmada(token):
+    """Descargar un archivo enviado por email mediante enlace firmado"""
+    try:
+        filename = download_signer.loads(token, max_age=SALES_GUIDE_LINK_MAX_AGE)
+    except SignatureExpired:
+        return "El enlace de descarga ha expirado", 410
+    except BadSignature:
+        return "Enlace de descarga inválido", 404
+
+    return send_from_directory(os.path.dirname(SALES_GUIDE_PATH), filename,
+                               as_attachment=True, download_name="GUIA_Vendedores_PROEDENT.pdf")
+
+
+@app.route("/videos/<path:filename>", methods=['GET', 'HEAD'])
+def video(filename):
+    """Videos de productos con Range (tramos acotados), sendfile u offload al proxy"""
+    return send_video(VIDEO_DIR, filename, chunk_bytes=VIDEO_CHUNK_BYTES, max_age=VIDEO_MAX_AGE,
+                      offload=VIDEO_OFFLOAD, accel_prefix=VIDEO_ACCEL_PREFIX)
+
+
+# Páginas que no dependen de la petición: HTML renderizado y comprimido una vez por versión
+page_cache = PageCache(app, extra_files=(static_assets.MANIFEST_PATH, responsive_images.MANIFEST_PATH),
+                       enabled=PAGE_CACHE_ENABLED)
+
+
 # RUTAS PRINCIPALES
 @app.route("/")
+@page_cache.cached("index.html")
 def index():
     return render_template("index.html")
 
 
 # RUTAS LEAD MAGNETS - ACTUALIZADAS CON SUPABASE
-
-@app.route("/lead_magnet_webinar", methods=["GET", "POST"])
-def lead_magnet_webinar():
+class LeadForm:
+    """Formulario de captación: plantilla, tabla destino, campos y emails que dispara"""
+
+    def __init__(self, template, confirm, notify, magnet_type=None, table='leads',
+                 required=('nombre', 'email'), fields=('telefono',), fixed=None, timestamp=False,
+                 thankyou='thankyou', json_response=False, missing_error="Nombre y email son requeridos",
+                 db_error="Error guardando lead", email_error="Error enviando la guía"):
+        self.template = template
+        self.confirm = confirm
+        self.notify = notify
+        self.magnet_type = magnet_type
+        self.table = table
+        self.required = required
+        self.fields = fields
+        self.fixed = fixed or {}
+        self.timestamp = timestamp
+        self.thankyou = thankyou
+        self.json_response = json_response
+        self.missing_error = missing_error
+        self.db_error = db_error
+        self.email_error = email_error
+
+    def build_row(self, form):
+        """Fila a insertar a partir del formulario, o None si falta algún campo requerido"""
+        row = {field: form.get(field) for field in self.required}
+        if not all(row.values()):
+            return None
+        for field in self.fields:
+            row[field] = form.get(field, "")
+        if self.magnet_type:
+            row['magnet_type'] = self.magnet_type
+            row['intereses'] = form.getlist("intereses")
+        row.update(self.fixed)
+        if self.timestamp:
+            row['created_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return row
+
+    def success_response(self):
+        if self.json_response:
+            return jsonify({"success": True, "redirect": url_for(self.thankyou)})
+        return redirect(url_for(self.thankyou))
+
+
+def _lead_magnet_form(magnet_type, template):
+    return LeadForm(template, magnet_type=magnet_type,
+                    confirm=lambda lead: send_lead_magnet_email(lead, magnet_type, lead['intereses']),
+                    notify=lambda lead: send_lead_notification_to_proedent(lead, magnet_type, lead['intereses']))
+
+
+LEAD_FORMS = {
+    'webinar_dmg': LeadForm("LM-Webinar.html", magnet_type='webinar_dmg', timestamp=True, json_response=True,
+                            confirm=lambda lead: send_webinar_registration_email(lead, lead['intereses']),
+                            notify=lambda lead: send_webinar_notification_to_proedent(lead, lead['intereses']),
+                            db_error="Error guardando datos", email_error="Error enviando confirmación"),
+    'secretos': _lead_magnet_form('secretos', "LM-10Secretos.html"),
+    'errores': _lead_magnet_form('errores', "LM-10Errores.html"),
+    'guia_rx': _lead_magnet_form('guia_rx', "LM-GuiaCompleta.html"),
+    'vendedores': LeadForm("LM-Vendedores.html", table='sales_candidates',
+                           required=('nombre', 'email', 'telefono', 'ciudad'), fields=('experiencia_sector',),
+                           fixed={'status': 'Pendiente'}, timestamp=True, thankyou='sales_thankyou',
+                           confirm=send_sales_recruitment_email,
+                           notify=send_sales_candidate_notification_to_proedent,
+                           missing_error="Todos los campos requeridos deben completarse",
+                           db_error="Error guardando datos"),
+}
+
+
+def handle_lead_form(name):
+    """Flujo común de los formularios de captación: validar, guardar y enviar emails
+
+    Con LEAD_SPOOL_ENABLED la fila se guarda en el spool local (fsync) y Supabase
+    la recibe en segundo plano; si no, la respuesta de éxito espera a que el lote
+    que contiene la fila se confirme en Supabase. Un envío repetido (mismo email y
+    formulario dentro de LEAD_DEDUP_WINDOW_SECONDS) recibe la misma respuesta de
+    éxito sin guardar ni enviar nada.
+    """
+    lead_form = LEAD_FORMS[name]
     if request.method == "GET":
-        return render_template("LM-Webinar.html")
+        return render_template(lead_form.template)
 
+    claim = None
     try:
-        nombre = request.form.get("nombre")
-        email = request.form.get("email")
-        telefono = request.form.get("telefono", "")
-        intereses = request.form.getlist("intereses")
-
-        if not all([nombre, email]):
-            return jsonify({"success": False, "error": "Nombre y email son requeridos"}), 400
-
-        lead_data = {
-            'nombre': nombre,
-            'email': email,
-            'telefono': telefono,
-            'magnet_type': 'webinar_dmg',
-            'intereses': intereses,
-            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        row = lead_form.build_row(request.form)
+        if row is None:
+            return jsonify({"success": False, "error": lead_form.missing_error}), 400
+
+        if LEAD_DEDUP_ENABLED:
+            claim = lead_dedup.claim(name, row['email'])
+            if claim is None:
+                logger.info(f"Lead {name} duplicado suprimido: {row['email']}")
+                return lead_form.success_response()
 
-        # Guardar en Supabase (usando la misma tabla leads)
         try:
-            response = supabase.table('leads').insert(lead_data).execute()
-            logger.info(f"Registro webinar guardado en Supabase: {nombre}")
+            if use_lead_spool(lead_form.table):
+                lead_spool.append(lead_form.table, row)
+            else:
+                lead_batcher.submit(lead_form.table, row)
         except Exception as db_error:
-            logger.error(f"Error guardando en Supabase: {db_error}")
-            return jsonify({"success": False, "error": "Error guardando datos"}), 500
+            lead_dedup.release(claim)
+            logger.error(f"Error guardando {name}: {db_error}")
+            return jsonify({"success": False, "error": lead_form.db_error}), 500
+        logger.info(f"Lead {name} guardado: {row['email']}")
 
-        # Enviar emails
-        email_success = send_webinar_registration_email(lead_data, intereses)
-        send_webinar_notification_to_proedent(lead_data, intereses)
+        email_success = lead_form.confirm(row)
+        lead_form.notify(row)
+        if not email_success:
+            # El visitante verá el error y reintentará: no suprimir ese reintento
+            lead_dedup.release(claim)
+            return jsonify({"success": False, "error": lead_form.email_error}), 500
 
-        if email_success:
-            return jsonify({"success": True, "redirect": url_for('thankyou')})
-        else:
-            return jsonify({"success": False, "error": "Error enviando confirmación"}), 500
+        return lead_form.success_response()
 
     except Exception as e:
-        logger.error(f"Error en lead_magnet_webinar: {e}")
+        lead_dedup.release(claim)
+        logger.error(f"Error en formulario {name}: {e}")
         return jsonify({"success": False, "error": "Error interno"}), 500
 
-@app.route("/lead_magnet_secretos", methods=["GET", "POST"])
-def lead_magnet_secretos():
-    if request.method == "GET":
-        return render_template("LM-10Secretos.html")
-
-    try:
-        nombre = request.form.get("nombre")
-        email = request.form.get("email")
-        telefono = request.form.get("telefono", "")
-        intereses = request.form.getlist("intereses")
-
-        if not all([nombre, email]):
-            return jsonify({"success": False, "error": "Nombre y email son requeridos"}), 400
 
-        lead_data = {
-            'nombre': nombre,
-            'email': email,
-            'telefono': telefono,
-            'magnet_type': 'secretos',
-            'intereses': intereses
-        }
-
-        # GUARDAR EN SUPABASE
-        created_lead = db.create_lead(lead_data)
-
-        if created_lead:
-            email_success = send_lead_magnet_email(lead_data, 'secretos', intereses)
-            send_lead_notification_to_proedent(lead_data, 'secretos', intereses)
+@app.route("/lead_magnet_webinar", methods=["GET", "POST"])
+def lead_magnet_webinar():
+    return handle_lead_form('webinar_dmg')
 
-            if email_success:
-                return redirect(url_for('thankyou'))
-            else:
-                return jsonify({"success": False, "error": "Error enviando la guía"}), 500
-        else:
-            return jsonify({"success": False, "error": "Error guardando lead"}), 500
 
-    except Exception as e:
-        logger.error(f"Error en lead_magnet_secretos: {e}")
-        return jsonify({"success": False, "error": "Error interno"}), 500
+@app.route("/lead_magnet_secretos", methods=["GET", "POST"])
+def lead_magnet_secretos():
+    return handle_lead_form('secretos')
 
 
 @app.route("/lead_magnet_errores", methods=["GET", "POST"])
 def lead_magnet_errores():
-    if request.method == "GET":
-        return render_template("LM-10Errores.html")
-
-    try:
-        nombre = request.form.get("nombre")
-        email = request.form.get("email")
-        telefono = request.form.get("telefono", "")
-        intereses = request.form.getlist("intereses")
-
-        if not all([nombre, email]):
-            return jsonify({"success": False, "error": "Nombre y email son requeridos"}), 400
-
-        lead_data = {
-            'nombre': nombre,
-            'email': email,
-            'telefono': telefono,
-            'magnet_type': 'errores',
-            'intereses': intereses
-        }
-
-        created_lead = db.create_lead(lead_data)
-
-        if created_lead:
-            email_success = send_lead_magnet_email(lead_data, 'errores', intereses)
-            send_lead_notification_to_proedent(lead_data, 'errores', intereses)
-
-            if email_success:
-                return redirect(url_for('thankyou'))
-
-    except Exception as e:
-        logger.error(f"Error en lead_magnet_errores: {e}")
-        return jsonify({"success": False, "error": "Error interno"}), 500
+    return handle_lead_form('errores')
 
 
 @app.route("/lead_magnet_guia_rx", methods=["GET", "POST"])
 def lead_magnet_guia_rx():
-    if request.method == "GET":
-        return render_template("LM-10GuiaCompleta.html")
-
-    try:
-        nombre = request.form.get("nombre")
-        email = request.form.get("email")
-        telefono = request.form.get("telefono", "")
-        intereses = request.form.getlist("intereses")
-
-        if not all([nombre, email]):
-            return jsonify({"success": False, "error": "Nombre y email son requeridos"}), 400
-
-        lead_data = {
-            'nombre': nombre,
-            'email': email,
-            'telefono': telefono,
-            'magnet_type': 'guia_rx',
-            'intereses': intereses
-        }
-
-        created_lead = db.create_lead(lead_data)
-
-        if created_lead:
-            email_success = send_lead_magnet_email(lead_data, 'guia_rx', intereses)
-            send_lead_notification_to_proedent(lead_data, 'guia_rx', intereses)
-
-            if email_success:
-                return redirect(url_for('thankyou'))
-
-    except Exception as e:
-        logger.error(f"Error en lead_magnet_guia_rx: {e}")
-        return jsonify({"success": False, "error": "Error interno"}), 500
+    return handle_lead_form('guia_rx')
 
 
 @app.route("/sales_recruitment", methods=["GET", "POST"])
 def sales_recruitment():
-    if request.method == "GET":
-        return render_template("LM-Vendedores.html")
-
-    try:
-        nombre = request.form.get("nombre")
-        email = request.form.get("email")
-        telefono = request.form.get("telefono")
-        ciudad = request.form.get("ciudad")
-        experiencia_sector = request.form.get("experiencia_sector", "")
-
-        if not all([nombre, email, telefono, ciudad]):
-            return jsonify({"success": False, "error": "Todos los campos requeridos deben completarse"}), 400
-
-        candidate_data = {
-            'nombre': nombre,
-            'email': email,
-            'telefono': telefono,
-            'ciudad': ciudad,
-            'experiencia_sector': experiencia_sector,
-            'status': 'Pendiente',
-            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-
-        # GUARDAR EN SUPABASE (esto ya funciona según los logs)
-        try:
-            response = supabase.table('sales_candidates').insert(candidate_data).execute()
-            logger.info(f"Candidato guardado en Supabase: {nombre}")
-        except Exception as db_error:
-            logger.error(f"Error guardando en Supabase: {db_error}")
-            return jsonify({"success": False, "error": "Error guardando datos"}), 500
-
-        # ENVIAR EMAILS - ESTA PARTE FALTA EN TU CÓDIGO ACTUAL
-        logger.info(f"Intentando enviar email a candidato: {email}")
-        email_success = send_sales_recruitment_email(candidate_data)
-
-        logger.info(f"Intentando enviar notificación a PROEDENT")
-        notification_success = send_sales_candidate_notification_to_proedent(candidate_data)
-
-        if email_success:
-            logger.info(f"Email enviado exitosamente a: {email}")
-            return redirect(url_for('sales_thankyou'))
-        else:
-            logger.error(f"Error enviando email a: {email}")
-            return jsonify({"success": False, "error": "Error enviando la guía"}), 500
-
-    except Exception as e:
-        logger.error(f"Error en sales_recruitment: {e}")
-        return jsonify({"success": False, "error": "Error interno"}), 500
+    return handle_lead_form('vendedores')
 
 @app.route("/agendar_demo", methods=["POST"])
 def agendar_demo():
@@ -1136,21 +1232,59 @@ def admin_panel():
         flash("Acceso denegado. Inicie sesión como administrador.", "danger")
         return redirect(url_for("patients"))
 
-    # Obtener datos desde Supabase
-    leads = db.get_all_leads()
-    appointments = db.get_all_appointments()
-    sales_candidates = db.get_all_sales_candidates()
-
-    # Calcular estadísticas
+    # Solo estadísticas: las tablas se cargan por página desde /admin/api/<tabla>
     stats = db.get_leads_stats()
-    stats['total_appointments'] = len(appointments)
-    stats['total_sales_candidates'] = len(sales_candidates)
+    stats['total_appointments'] = db.get_table_count('appointments')
+    stats['total_sales_candidates'] = db.get_table_count('sales_candidates')
 
     return render_template("admin_panel.html",
-                           leads=leads,
-                           appointments=appointments,
-                           sales_candidates=sales_candidates,
-                           stats=stats)
+                           stats=stats,
+                           page_size=ADMIN_PAGE_SIZE)
+
+
+@app.route("/admin/api/<tabla>")
+@admin_required
+def admin_api_page(tabla):
+    """Página JSON (keyset sobre created_at, id) de leads, citas o candidatos"""
+    columns = ADMIN_TABLE_COLUMNS.get(tabla)
+    if columns is None:
+        return jsonify({"success": False, "error": "Tabla no disponible"}), 404
+
+    limit = min(max(request.args.get('limit', ADMIN_PAGE_SIZE, type=int), 1), 200)
+    try:
+        rows, next_cursor = db.get_page(tabla, columns, cursor=request.args.get('cursor'), limit=limit)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error paginando {tabla}: {e}")
+        return jsonify({"success": False, "error": "Error consultando datos"}), 500
+
+    return jsonify({"success": True, "rows": rows, "next_cursor": next_cursor})
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', stream_csv),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', stream_xlsx),
+}
+
+
+@app.route("/admin/export/<tabla>.<formato>")
+@admin_required
+def admin_export(tabla, formato):
+    """Exportar leads, citas o candidatos en streaming (CSV o XLSX)"""
+    columns = ADMIN_TABLE_COLUMNS.get(tabla)
+    if columns is None or formato not in EXPORT_FORMATS:
+        return jsonify({"success": False, "error": "Exportación no disponible"}), 404
+
+    mimetype, writer = EXPORT_FORMATS[formato]
+    rows = iter_table_rows(db, tabla, columns, page_size=EXPORT_PAGE_SIZE)
+    filename = f"{tabla}_{datetime.now().strftime('%Y%m%d_%H%M')}.{formato}"
+    logger.info(f"Exportando {tabla} en formato {formato}")
+
+    return Response(stream_with_context(writer(rows, columns)),
+                    mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"',
+                             'X-Accel-Buffering': 'no'})
 
 
 @app.route("/thankyou")
@@ -1164,63 +1298,96 @@ def sales_thankyou():
 
 
 # RUTAS DEL CATÁLOGO Y OTRAS PÁGINAS FALTANTES
+# Índice en memoria de productos (se sincroniza con la lista cacheada de get_all_products)
+product_index = ProductIndex()
+CATALOG_PAGE_SIZE = int(os.getenv('CATALOG_PAGE_SIZE', '24'))
+_catalog_source = (None, [])
+
+
+def catalog_products():
+    """Productos de Supabase seguidos de los de catalog_products.py
+
+    Devuelve la misma lista mientras la caché devuelva la misma de Supabase, así
+    product_index.refresh() no reindexa en cada petición.
+    """
+    global _catalog_source
+    products = db.get_all_products()
+    source, merged = _catalog_source
+    if source is not products:
+        merged = products + STATIC_PRODUCTS
+        _catalog_source = (products, merged)
+    return merged
+
+
 @app.route("/catalogo")
 def catalogo():
-    """Catálogo completo de productos"""
+    """Catálogo completo de productos con búsqueda, filtros por categoría/marca y paginación"""
     category_filter = request.args.get('category', '')
-    products = db.get_all_products()
-
-    if category_filter:
-        filtered_products = [p for p in products if p.get('category') == category_filter]
-    else:
-        filtered_products = products
+    brand_filter = request.args.get('brand', '')
+    query = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int) or 1, 1)
 
-    # Obtener categorías únicas
-    categories = list(set([product.get('category', '') for product in products if product.get('category')]))
+    product_index.refresh(catalog_products())
+    filtered_products, total = product_index.search(query, category=category_filter, brand=brand_filter,
+                                                    offset=(page - 1) * CATALOG_PAGE_SIZE,
+                                                    limit=CATALOG_PAGE_SIZE)
 
     return render_template("catalogo.html",
                            products=filtered_products,
-                           categories=categories,
-                           current_category=category_filter)
+                           categories=[category for category, _ in product_index.facets('category')],
+                           brands=product_index.facets('brand'),
+                           current_category=category_filter,
+                           current_brand=brand_filter,
+                           query=query,
+                           page=page,
+                           total_pages=max(-(-total // CATALOG_PAGE_SIZE), 1),
+                           total_products=total)
 
 
 @app.route("/vatech_catalog")
+@page_cache.cached("vatech_catalog.html")
 def vatech_catalog():
     """Catálogo específico de VATECH"""
     return render_template("vatech_catalog.html")
 
 
 @app.route("/acteon_catalog")
+@page_cache.cached("acteon_catalog.html")
 def acteon_catalog():
     """Catálogo específico de ACTEON"""
     return render_template("acteon_catalog.html")
 
 
 @app.route("/euronda_catalog")
+@page_cache.cached("euronda_catalog.html")
 def euronda_catalog():
     """Catálogo específico de EURONDA"""
     return render_template("euronda_catalog.html")
 
 
 @app.route("/faro_catalog")
+@page_cache.cached("faro_catalog.html")
 def faro_catalog():
     """Catálogo específico de FARO"""
     return render_template("faro_catalog.html")
 
 
 @app.route("/frasaco_catalog")
+@page_cache.cached("frasaco_catalog.html")
 def frasaco_catalog():
     """Catálogo específico de FRASACO"""
     return render_template("frasaco_catalog.html")
 
 
 @app.route("/dmg_catalog")
+@page_cache.cached("dmg_catalog.html")
 def dmg_catalog():
     """Catálogo específico de DMG"""
     return render_template("dmg_catalog.html")
 
 
 @app.route("/nufona_catalog")
+@page_cache.cached("nufona_catalog.html")
 def nufona_catalog():
     """Catálogo específico de NUFONA"""
     return render_template("nufona_catalog.html")
@@ -1234,17 +1401,19 @@ def cursos():
         student_name = request.form.get("student_name")
         student_email = request.form.get("student_email")
 
-        courses = db.get_all_courses()
-        course = next((c for c in courses if c['id'] == course_id), None)
-
-        if course and course["available_spots"] > 0:
-            new_spots = course["available_spots"] - 1
-            updated_course = db.update_course_spots(course_id, new_spots)
+        try:
+            course = db.enroll_in_course(course_id)
+        except EnrollmentBusyError as e:
+            logger.warning(str(e))
+            flash("Hay mucha demanda en este curso en este momento. Por favor, inténtalo de nuevo", "warning")
+            return redirect(url_for("cursos"))
+        except Exception as e:
+            logger.error(f"Error inscribiendo en curso {course_id}: {e}")
+            flash("Error procesando la inscripción", "danger")
+            return redirect(url_for("cursos"))
 
-            if updated_course:
-                flash(f"Inscripción exitosa para {student_name} en el curso {course['name']}", "success")
-            else:
-                flash("Error procesando la inscripción", "danger")
+        if course:
+            flash(f"Inscripción exitosa para {student_name} en el curso {course['name']}", "success")
         else:
             flash("Lo sentimos, no hay cupos disponibles para este curso", "danger")
 
@@ -1286,27 +1455,133 @@ def video_conferencia():
         return render_template("video_conferencia.html", authorized=False)
 
 
+# Columnas del catálogo en Excel: (encabezado, campo del producto)
+CATALOG_COLUMNS = (
+    ('Producto', 'name'),
+    ('Categoría', 'category'),
+    ('Marca', 'brand'),
+    ('Descripción', 'description'),
+    ('Precio', 'price'),
+    ('Especificaciones', 'specifications'),
+)
+CATALOG_DIR = os.path.join(DATA_DIR, 'catalogo')
+_catalog_version = {'products': None, 'digest': None}
+
+
+def catalog_version(products):
+    """Hash del contenido de los productos (se recalcula solo si cambia la lista)"""
+    if _catalog_version['products'] is not products:
+        payload = json.dumps([[p.get(field) for _, field in CATALOG_COLUMNS] for p in products],
+                             sort_keys=True, default=str, ensure_ascii=False)
+        _catalog_version['digest'] = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:20]
+        _catalog_version['products'] = products
+    return _catalog_version['digest']
+
+
+def catalog_workbook(products):
+    """Ruta del Excel del catálogo para esta versión; se genera solo si no existe"""
+    version = catalog_version(products)
+    path = os.path.join(CATALOG_DIR, f"catalogo_{version}.xlsx")
+    if os.path.exists(path):
+        return path, version
+
+    os.makedirs(CATALOG_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    save_xlsx(products, [field for _, field in CATALOG_COLUMNS], tmp_path,
+              headers=[header for header, _ in CATALOG_COLUMNS], sheet_title='Catálogo')
+    os.replace(tmp_path, path)
+    logger.info(f"Catálogo Excel regenerado (versión {version})")
+
+    # Borrar versiones anteriores
+    for filename in os.listdir(CATALOG_DIR):
+        if filename.startswith('catalogo_') and filename.endswith('.xlsx') and filename != os.path.basename(path):
+            try:
+                os.remove(os.path.join(CATALOG_DIR, filename))
+            except OSError:
+                pass
+    return path, version
+
+
 @app.route('/download_catalog')
 def download_catalog():
-    """Descargar catálogo en Excel"""
+    """Descargar catálogo en Excel (cacheado por versión, con ETag y 304)"""
     products = db.get_all_products()
+    path, version = catalog_workbook(products)
+    return send_file(path, download_name="catalogo_proedent.xlsx", as_attachment=True,
+                     etag=version, conditional=True)
 
-    data = []
-    for product in products:
-        data.append({
-            'Producto': product.get('name', ''),
-            'Categoría': product.get('category', ''),
-            'Marca': product.get('brand', ''),
-            'Descripción': product.get('description', ''),
-            'Precio': product.get('price', ''),
-            'Especificaciones': product.get('specifications', '')
-        })
 
-    df = pd.DataFrame(data)
-    excel_file = BytesIO()
-    df.to_excel(excel_file, index=False, engine='openpyxl')
-    excel_file.seek(0)
-    return send_file(excel_file, download_name="catalogo_proedent.xlsx", as_attachment=True)
+# API JSON DE PRODUCTOS (v1)
+PRODUCT_API_FIELDS = ('id', 'name', 'category', 'brand', 'description', 'specifications', 'price', 'image')
+PRODUCT_API_PAGE_SIZE = int(os.getenv('PRODUCT_API_PAGE_SIZE', '50'))
+PRODUCT_API_GZIP_MIN_BYTES = 1024
+
+
+def encode_product_cursor(product_id):
+    """Cursor opaco (keyset por id) para /api/v1/products"""
+    return base64.urlsafe_b64encode(json.dumps([product_id]).encode()).decode().rstrip('=')
+
+
+def decode_product_cursor(cursor):
+    """Decodificar un cursor de productos; lanza ValueError si no es válido"""
+    try:
+        product_id, = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if not isinstance(product_id, int):
+        raise ValueError("Cursor inválido")
+    return product_id
+
+
+@app.route("/api/v1/products")
+def api_products():
+    """Productos en JSON: fields=, category=, brand=, q=, cursor=/limit=, con ETag y gzip"""
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or list(PRODUCT_API_FIELDS)
+    unknown = [f for f in fields if f not in PRODUCT_API_FIELDS]
+    if unknown:
+        return jsonify({"success": False, "error": f"Campos no disponibles: {', '.join(unknown)}"}), 400
+
+    limit = min(max(request.args.get('limit', PRODUCT_API_PAGE_SIZE, type=int), 1), 200)
+    after = None
+    if request.args.get('cursor'):
+        try:
+            after = decode_product_cursor(request.args['cursor'])
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+    product_index.refresh(catalog_products())
+    products = product_index.matching(request.args.get('q', '').strip(),
+                                      category=request.args.get('category', ''),
+                                      brand=request.args.get('brand', ''))
+    products = sorted((p for p in products if isinstance(p.get('id'), int)), key=lambda p: p['id'])
+    if after is not None:
+        products = products[bisect.bisect_right([p['id'] for p in products], after):]
+    page = products[:limit]
+    next_cursor = encode_product_cursor(page[-1]['id']) if len(products) > limit else None
+
+    body = json.dumps({"success": True,
+                       "products": [{field: p.get(field) for field in fields} for p in page],
+                       "next_cursor": next_cursor},
+                      ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+    # El ETag identifica la representación: la variante gzip lleva su propio sufijo
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    use_gzip = 'gzip' in static_assets.accepted_encodings(request) and len(body) >= PRODUCT_API_GZIP_MIN_BYTES
+    if use_gzip:
+        etag += '-gzip'
+
+    response = app.response_class(mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    if request.if_none_match.contains(etag):
+        response.status_code = 304
+        return response
+    if use_gzip:
+        body = gzip.compress(body, compresslevel=6)
+        response.headers['Content-Encoding'] = 'gzip'
+    response.set_data(body)
+    return response
 
 
 @app.route("/test_email")
@@ -1349,16 +1624,19 @@ def test_email():
 
 # Rutas de administrador requerido
 @app.route("/lm/secretos")
+@page_cache.cached("LM-10Secretos.html")
 def lm_secretos():
     return render_template("LM-10Secretos.html")
 
 
 @app.route("/lm/errores")
+@page_cache.cached("LM-10Errores.html")
 def lm_errores():
     return render_template("LM-10Errores.html")
 
 
 @app.route("/lm/guia")
+@page_cache.cached("LM-GuiaCompleta.html")
 def lm_guia():
     return render_template("LM-GuiaCompleta.html")
 
@@ -1371,6 +1649,26 @@ def admin_logout():
     return redirect(url_for("patients"))
 
 
+# INICIALIZACIÓN POR PROCESO
+def init_worker():
+    """Crear los recursos que no pueden heredarse del master tras el fork
+
+    Con preload_app el módulo se importa una sola vez en el master; el pool
+    httpx del cliente Supabase no debe compartirse entre procesos, así que cada
+    worker construye el suyo. El pool SMTP, el outbox y las conexiones SQLite ya
+    detectan el cambio de pid por su cuenta.
+    """
+    global supabase
+    supabase = build_supabase_client()
+    db.supabase = supabase
+    logger.info(f"Cliente Supabase inicializado para el worker {os.getpid()}")
+
+
+def create_app():
+    """Factory de la aplicación (gunicorn: "app2:create_app()")"""
+    return app
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("🚀 INICIANDO APLICACIÓN PROEDENT CON SUPABASE")
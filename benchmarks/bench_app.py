@@ -0,0 +1,62 @@
+# bench_app.py - app2 con Supabase falso para correr bajo gunicorn en los benchmarks
+#
+#     gunicorn -c gunicorn_config.py benchmarks.bench_app:app
+#
+# BENCH_SUPABASE_LATENCY / BENCH_SUPABASE_JITTER (segundos) simulan el viaje
+# HTTP a Supabase; el SMTP se configura con las variables normales de la app
+# (SMTP_SERVER, SMTP_PORT, SMTP_STARTTLS=false para benchmarks/smtp_sink.py).
+#
+# Datos de partida deterministas para los escenarios de benchmarks/load_suite.py:
+# BENCH_PRODUCTS productos, BENCH_LEADS leads (más citas y candidatos) y un curso
+# con BENCH_COURSE_SPOTS cupos, para que las inscripciones no se agoten.
+import os
+import random
+
+os.environ.setdefault('SUPABASE_URL', 'http://localhost:54321')
+os.environ.setdefault('SUPABASE_KEY', 'benchmark-key')
+os.environ.setdefault('PROEDENT_DATA_DIR', os.path.join('var', 'benchmarks'))
+
+import app2  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase  # noqa: E402
+
+BRANDS = ('vatech', 'acteon', 'euronda', 'faro', 'frasaco', 'dmg', 'nufona')
+CATEGORIES = ('Radiología', 'Esterilización', 'Iluminación', 'Cementos', 'Impresión', 'Instrumental')
+WORDS = ('digital', 'panorámico', 'sensor', 'autoclave', 'lámpara', 'resina', 'composite',
+         'cemento', 'silicona', 'cámara', 'tomógrafo', 'ultrasonido', 'compacto', 'inalámbrico')
+
+
+def sample_tables(products, leads, course_spots, seed=42):
+    rng = random.Random(seed)
+    tables = {'products': [], 'leads': [], 'appointments': [], 'sales_candidates': [],
+              'courses': [{'id': 1, 'name': 'Curso de carga', 'available_spots': course_spots}]}
+    for i in range(1, products + 1):
+        words = ' '.join(rng.sample(WORDS, 3))
+        tables['products'].append({'id': i, 'name': f"{words.title()} {i}", 'brand': rng.choice(BRANDS),
+                                   'category': rng.choice(CATEGORIES), 'description': f"Equipo {words}",
+                                   'specifications': '', 'price': round(rng.uniform(20, 9000), 2),
+                                   'image': ''})
+    for i in range(1, leads + 1):
+        created_at = f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d} {i % 24:02d}:00:00"
+        tables['leads'].append({'id': i, 'nombre': f"Lead {i}", 'email': f"lead{i}@example.com",
+                                'telefono': '', 'magnet_type': rng.choice(app2.LEAD_MAGNET_TYPES),
+                                'intereses': [], 'created_at': created_at})
+        if i % 10 == 0:
+            tables['appointments'].append({'id': i // 10, 'nombre': f"Cita {i}", 'correo': f"cita{i}@example.com",
+                                           'status': 'pendiente', 'created_at': created_at})
+            tables['sales_candidates'].append({'id': i // 10, 'nombre': f"Candidato {i}",
+                                               'email': f"candidato{i}@example.com", 'status': 'nuevo',
+                                               'created_at': created_at})
+    return tables
+
+
+fake_supabase = FakeSupabase(latency=float(os.getenv('BENCH_SUPABASE_LATENCY', '0.05')),
+                             jitter=float(os.getenv('BENCH_SUPABASE_JITTER', '0.01')),
+                             tables=sample_tables(int(os.getenv('BENCH_PRODUCTS', '300')),
+                                                  int(os.getenv('BENCH_LEADS', '2000')),
+                                                  int(os.getenv('BENCH_COURSE_SPOTS', '1000000'))))
+app2.supabase = fake_supabase
+app2.db.supabase = fake_supabase
+# Con preload_app el hook post_fork llama a app2.init_worker(): que reutilice el falso
+app2.build_supabase_client = lambda: fake_supabase
+
+app = app2.app
@@ -0,0 +1,100 @@
+# enrollment_load_test.py - Prueba de carga de inscripciones concurrentes en /cursos
+#
+# Lanza N inscripciones simultáneas contra un curso con pocos cupos usando un
+# Supabase falso con latencia (benchmarks/fake_supabase.py) y verifica que no
+# haya sobreventa: inscripciones exitosas == cupos iniciales y cupos finales == 0.
+#
+# Uso:
+#   python -m benchmarks.enrollment_load_test                 # vía RPC enroll_in_course
+#   python -m benchmarks.enrollment_load_test --mode cas      # UPDATE condicional
+#   python -m benchmarks.enrollment_load_test --mode legacy   # lógica anterior (sobrevende)
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault('SUPABASE_URL', 'http://localhost:54321')
+os.environ.setdefault('SUPABASE_KEY', 'benchmark-key')
+os.environ.setdefault('PROEDENT_DATA_DIR', os.path.join('var', 'benchmarks'))
+
+import app2  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase  # noqa: E402
+
+
+def legacy_enroll(course_id):
+    """Lógica anterior de cursos(): leer toda la tabla y escribir available_spots - 1"""
+    courses = app2.db.get_all_courses()
+    course = next((c for c in courses if c['id'] == course_id), None)
+    if course and course["available_spots"] > 0:
+        return app2.db.update_course_spots(course_id, course["available_spots"] - 1)
+    return None
+
+
+def run(mode, concurrency, spots, latency):
+    fake = FakeSupabase(latency=latency, jitter=latency / 2, with_rpc=(mode == 'rpc'),
+                        tables={'courses': [{'id': 1, 'name': 'Curso de carga', 'available_spots': spots}]})
+    app2.db.supabase = fake
+    app2.db._enroll_rpc_available = True
+    app2.db_cache.ttls['courses'] = 0  # sin caché: cada lectura va al "servidor"
+
+    results = []
+    results_lock = threading.Lock()
+    original_enroll = app2.db.enroll_in_course
+
+    def recording_enroll(course_id):
+        course = legacy_enroll(course_id) if mode == 'legacy' else original_enroll(course_id)
+        with results_lock:
+            results.append(course is not None)
+        return course
+
+    app2.db.enroll_in_course = recording_enroll
+    barrier = threading.Barrier(concurrency)
+    errors = []
+
+    def student(i):
+        client = app2.app.test_client()
+        barrier.wait()
+        response = client.post('/cursos', data={'course_id': '1', 'student_name': f'Alumno {i}',
+                                                'student_email': f'alumno{i}@example.com'})
+        if response.status_code != 302:
+            errors.append(response.status_code)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=student, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    app2.db.enroll_in_course = original_enroll
+
+    enrolled = sum(results)
+    final_spots = fake.tables['courses'][0]['available_spots']
+    overbooked = max(0, enrolled - spots)
+    print(f"modo={mode} concurrencia={concurrency} cupos={spots} latencia={latency * 1000:.0f}ms")
+    print(f"  inscripciones exitosas: {enrolled}")
+    print(f"  cupos finales:          {final_spots}")
+    print(f"  sobreventa:             {overbooked}")
+    print(f"  errores HTTP:           {len(errors)}")
+    print(f"  tiempo total:           {elapsed:.2f}s")
+    return enrolled == spots and final_spots == 0 and not errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mode', choices=('rpc', 'cas', 'legacy'), default='rpc')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--spots', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.01, help="latencia simulada de Supabase (s)")
+    args = parser.parse_args()
+
+    ok = run(args.mode, args.concurrency, args.spots, args.latency)
+    if args.mode != 'legacy' and not ok:
+        print("FALLO: hubo sobreventa o inscripciones perdidas")
+        sys.exit(1)
+    print("OK" if ok else "La lógica anterior sobrevende (esperado en modo legacy)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+# fake_supabase.py - Cliente Supabase falso, en memoria, para pruebas de carga
+#
+# Imita la parte de supabase-py / postgrest-py que usa app2.py: table() con
+# select / insert / update / delete / upsert, filtros eq/neq/gt/gte/lt/lte/in_,
+# or_() con la sintaxis de PostgREST, order, limit, count='exact' y rpc().
+# Cada sentencia se aplica de forma atómica (como una fila bloqueada en
+# Postgres) después de una latencia configurable que simula el viaje HTTP.
+import itertools
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+# FILTROS
+def _coerce(value):
+    if isinstance(value, str):
+        if value.startswith('"') and value.endswith('"'):
+            return value[1:-1]
+        if re.fullmatch(r'-?\d+', value):
+            return int(value)
+    return value
+
+
+def _compare(op, left, right):
+    if left is None:
+        return op == 'is' and right in (None, 'null')
+    try:
+        if op == 'eq':
+            return left == right
+        if op == 'neq':
+            return left != right
+        if op == 'gt':
+            return left > right
+        if op == 'gte':
+            return left >= right
+        if op == 'lt':
+            return left < right
+        if op == 'lte':
+            return left <= right
+        if op == 'in':
+            return left in right
+    except TypeError:
+        return str(left) < str(right) if op in ('lt', 'lte') else str(left) > str(right)
+    raise ValueError(f"Operador no soportado: {op}")
+
+
+def _split_top_level(expression):
+    parts, depth, quoted, current = [], 0, False, ''
+    for char in expression:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and char == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _parse_logic(expression, mode='or'):
+    """Convertir 'a.lt.1,and(b.eq.2,c.lt.3)' en un predicado"""
+    predicates = []
+    for part in _split_top_level(expression):
+        match = re.fullmatch(r'(and|or)\((.*)\)', part)
+        if match:
+            predicates.append(_parse_logic(match.group(2), match.group(1)))
+            continue
+        column, op, value = part.split('.', 2)
+        predicates.append(lambda row, c=column, o=op, v=_coerce(value): _compare(o, row.get(c), v))
+    combine = any if mode == 'or' else all
+    return lambda row: combine(p(row) for p in predicates)
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.operation = 'select'
+        self.columns = None
+        self.payload = None
+        self.filters = []
+        self.ordering = []
+        self.row_limit = None
+        self.row_offset = 0
+        self.count_mode = None
+        self.head = False
+        self.single_row = False
+        self.upsert_conflict = None
+        self.ignore_duplicates = False
+
+    # CONSTRUCCIÓN
+    def select(self, *columns, count=None, head=None):
+        self.columns = None if not columns or columns == ('*',) else \
+            [c.strip() for column in columns for c in column.split(',')]
+        self.count_mode = count
+        self.head = bool(head)
+        return self
+
+    def insert(self, json, count=None, returning=None, upsert=False, default_to_null=True):
+        self.operation = 'insert'
+        self.payload = json
+        return self
+
+    def upsert(self, json, on_conflict='', ignore_duplicates=False, **kwargs):
+        self.operation = 'upsert'
+        self.payload = json
+        self.upsert_conflict = [c for c in on_conflict.split(',') if c] or ['id']
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json, count=None, returning=None):
+        self.operation = 'update'
+        self.payload = json
+        return self
+
+    def delete(self, count=None, returning=None):
+        self.operation = 'delete'
+        return self
+
+    def _filter(self, column, op, value):
+        self.filters.append(lambda row: _compare(op, row.get(column), value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column, value):
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column, value):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column, value):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self._filter(column, 'lte', value)
+
+    def in_(self, column, values):
+        return self._filter(column, 'in', list(values))
+
+    def or_(self, filters, reference_table=None):
+        self.filters.append(_parse_logic(filters))
+        return self
+
+    def order(self, column, desc=False, nullsfirst=None, foreign_table=None):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size, foreign_table=None):
+        self.row_limit = size
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self.row_offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def maybe_single(self):
+        self.single_row = True
+        return self
+
+    # EJECUCIÓN
+    def execute(self):
+        self.client.simulate_latency()
+        with self.client.lock:
+            self.client.counters[self.operation] += 1
+            rows = self.client.tables.setdefault(self.table, [])
+            return getattr(self, f'_execute_{self.operation}')(rows)
+
+    def _project(self, row):
+        if self.columns is None:
+            return dict(row)
+        return {column: row.get(column) for column in self.columns}
+
+    def _matching(self, rows):
+        return [row for row in rows if all(f(row) for f in self.filters)]
+
+    def _execute_select(self, rows):
+        matched = self._matching(rows)
+        for column, desc in reversed(self.ordering):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        total = len(matched)
+        if self.row_limit is not None:
+            matched = matched[self.row_offset:self.row_offset + self.row_limit]
+        data = [] if self.head else [self._project(row) for row in matched]
+        if self.single_row:
+            data = data[0] if data else None
+        return FakeResponse(data, total if self.count_mode else None)
+
+    def _new_row(self, values):
+        row = dict(values)
+        row.setdefault('id', next(self.client.ids[self.table]))
+        row.setdefault('created_at', datetime.now(timezone.utc).isoformat())
+        return row
+
+    def _execute_insert(self, rows):
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        created = [self._new_row(values) for values in payload]
+        rows.extend(created)
+        return FakeResponse([dict(row) for row in created], len(created))
+
+    def _execute_upsert(self, rows):
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        result = []
+        for values in payload:
+            key = tuple(values.get(c) for c in self.upsert_conflict)
+            existing = next((row for row in rows
+                             if tuple(row.get(c) for c in self.upsert_conflict) == key), None)
+            if existing is None:
+                row = self._new_row(values)
+                rows.append(row)
+                result.append(dict(row))
+            elif not self.ignore_duplicates:
+                existing.update(values)
+                result.append(dict(existing))
+        return FakeResponse(result, len(result))
+
+    def _execute_update(self, rows):
+        matched = self._matching(rows)
+        for row in matched:
+            row.update(self.payload)
+        return FakeResponse([dict(row) for row in matched], len(matched))
+
+    def _execute_delete(self, rows):
+        matched = self._matching(rows)
+        for row in matched:
+            rows.remove(row)
+        return FakeResponse([dict(row) for row in matched], len(matched))
+
+
+class FakeRPC:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        function = self.client.functions.get(self.name)
+        if function is None:
+            raise Exception(f"PGRST202: Could not find the function public.{self.name}")
+        self.client.simulate_latency()
+        with self.client.lock:
+            self.client.counters['rpc'] += 1
+            return FakeResponse(function(self.client.tables, **self.params))
+
+
+# FUNCIONES SQL (equivalentes a las de sql/)
+def _enroll_in_course(tables, p_course_id):
+    for course in tables.get('courses', []):
+        if course['id'] == p_course_id and course.get('available_spots', 0) > 0:
+            course['available_spots'] -= 1
+            return [dict(course)]
+    return []
+
+
+def _lead_counts_by_magnet(tables):
+    counts = {}
+    for lead in tables.get('leads', []):
+        magnet_type = lead.get('magnet_type') or 'sin_tipo'
+        counts[magnet_type] = counts.get(magnet_type, 0) + 1
+    return [{'magnet_type': k, 'total': v} for k, v in counts.items()]
+
+
+class FakeSupabase:
+    """Sustituto de supabase.Client con tablas en memoria"""
+
+    def __init__(self, latency=0.0, jitter=0.0, tables=None, with_rpc=True):
+        self.latency = latency
+        self.jitter = jitter
+        self.lock = threading.Lock()
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.counters = {'select': 0, 'insert': 0, 'upsert': 0, 'update': 0, 'delete': 0, 'rpc': 0}
+        self.ids = {}
+        for name in set(self.tables) | {'leads', 'appointments', 'sales_candidates', 'patients',
+                                        'products', 'courses'}:
+            start = max((row.get('id', 0) for row in self.tables.get(name, [])), default=0) + 1
+            self.ids[name] = itertools.count(start)
+        self.functions = {}
+        if with_rpc:
+            self.functions = {'enroll_in_course': _enroll_in_course,
+                              'lead_counts_by_magnet': _lead_counts_by_magnet}
+
+    def simulate_latency(self):
+        if self.latency or self.jitter:
+            import random
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    def table(self, name):
+        self.ids.setdefault(name, itertools.count(1))
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None, **kwargs):
+        return FakeRPC(self, name, params)
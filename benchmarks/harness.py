@@ -0,0 +1,110 @@
+# harness.py - Piezas comunes de los benchmarks bajo gunicorn
+#
+# Arranque de gunicorn_config.py sobre benchmarks/bench_app.py (Supabase falso),
+# peticiones HTTP en conexiones nuevas y un generador de carga de N clientes
+# durante D segundos que devuelve throughput, percentiles y tasa de errores.
+# Lo usan worker_models.py y load_suite.py.
+import http.client
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_APP = 'benchmarks.bench_app:app'
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def http_request(port, method, path, body=None, headers=None, timeout=60):
+    """Una petición en una conexión nueva: (status, cabeceras, cuerpo)
+
+    Sin keep-alive, como visitantes distintos: con keep-alive las conexiones se
+    quedan pegadas al worker que las aceptó y la carga no se reparte.
+    """
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        connection.request(method, path, body=body, headers=dict(headers or {}, Connection='close'))
+        response = connection.getresponse()
+        return response.status, response.headers, response.read()
+    finally:
+        connection.close()
+
+
+def start_gunicorn(port, env, label, ready_path='/lm/errores', app=BENCH_APP, timeout=60):
+    """Lanzar gunicorn con gunicorn_config.py y esperar al primer 200 en ready_path"""
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py',
+                                '--log-level', 'warning', '--access-logfile', os.devnull, app],
+                               cwd=BASE_DIR, env=dict(os.environ, PORT=str(port), **env))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn ({label}) terminó al arrancar (código {process.returncode})")
+        try:
+            if http_request(port, 'GET', ready_path, timeout=2)[0] == 200:
+                return process
+        except OSError:
+            time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError(f"gunicorn ({label}) no arrancó en {timeout} s")
+
+
+def stop_gunicorn(process):
+    process.terminate()
+    process.wait(timeout=30)
+
+
+def run_load(concurrency, duration, client_factory):
+    """N clientes en hilos durante `duration` segundos
+
+    client_factory(n) devuelve la función que hace una iteración del cliente n:
+    recibe el número de iteración y devuelve True si la respuesta fue la esperada.
+    Solo las iteraciones correctas cuentan para los percentiles de latencia.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(n):
+        step = client_factory(n)
+        local_latencies, local_errors, i = [], 0, 0
+        while time.monotonic() < deadline:
+            i += 1
+            started = time.perf_counter()
+            try:
+                ok = step(i)
+            except (OSError, http.client.HTTPException):
+                ok = False
+            if ok:
+                local_latencies.append(time.perf_counter() - started)
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    total = len(latencies) + sum(errors)
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'error_rate': round(sum(errors) / total, 4) if total else 0.0,
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+    }
@@ -0,0 +1,226 @@
+# load_suite.py - Suite de carga por escenarios sobre las rutas reales bajo gunicorn
+#
+# Levanta gunicorn (gunicorn_config.py) con benchmarks/bench_app.py: Supabase
+# falso con latencia y datos de partida, y un sink SMTP con latencia
+# (benchmarks/smtp_sink.py). Después recorre los escenarios uno a uno con N
+# clientes durante D segundos:
+#
+#   catalogo  navegación: /catalogo con búsqueda, filtros y páginas, catálogos
+#             por marca y /api/v1/products
+#   leads     envío de lead magnets (secretos, errores, guía RX, webinar)
+#   admin     login de administrador, /admin_panel y páginas de /admin/api/leads
+#   cursos    inscripción en /cursos
+#
+# Por escenario informa throughput, p50/p95/p99 y tasa de errores, y guarda los
+# resultados en JSON junto con la configuración y el commit, para comparar
+# ejecuciones (--compare). Ver benchmarks/README.md.
+#
+# Uso:
+#   python -m benchmarks.load_suite
+#   python -m benchmarks.load_suite --scenarios catalogo leads --concurrency 64 --duration 30
+#   python -m benchmarks.load_suite --json base.json
+#   python -m benchmarks.load_suite --json nuevo.json --compare base.json
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from benchmarks.harness import BASE_DIR, http_request, run_load, start_gunicorn, stop_gunicorn
+from benchmarks.smtp_sink import SMTPSink
+
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+CATALOG_PATHS = (
+    '/catalogo',
+    '/catalogo?q=sensor',
+    '/catalogo?q=cemento&page=2',
+    '/catalogo?category=Radiolog%C3%ADa',
+    '/catalogo?brand=dmg',
+    '/dmg_catalog',
+    '/vatech_catalog',
+    '/api/v1/products?limit=50&fields=id,name,brand,price',
+    '/api/v1/products?q=autoclave',
+)
+
+# (ruta, estado esperado): secretos/errores/guía redirigen a /thankyou, el webinar responde JSON
+LEAD_FORMS = (
+    ('/lead_magnet_secretos', 302),
+    ('/lead_magnet_errores', 302),
+    ('/lead_magnet_guia_rx', 302),
+    ('/lead_magnet_webinar', 200),
+)
+
+
+def catalog_scenario(port):
+    def factory(n):
+        def step(i):
+            return http_request(port, 'GET', CATALOG_PATHS[(n + i) % len(CATALOG_PATHS)])[0] == 200
+        return step
+    return factory
+
+
+def leads_scenario(port):
+    def factory(n):
+        def step(i):
+            path, expected = LEAD_FORMS[(n + i) % len(LEAD_FORMS)]
+            body = urlencode({'nombre': f'Carga {n}-{i}', 'email': f'carga{n}.{i}@example.com',
+                              'telefono': '0999999999', 'intereses': 'tomografia'})
+            return http_request(port, 'POST', path, body, FORM_HEADERS)[0] == expected
+        return step
+    return factory
+
+
+def admin_login(port):
+    """Cookie de sesión de administrador (el login no cuenta en las latencias)"""
+    body = urlencode({'action': 'admin_login', 'employee_id': 'admin', 'password': 'admin'})
+    status, headers, _ = http_request(port, 'POST', '/patients', body, FORM_HEADERS)
+    cookie = SimpleCookie(headers.get('Set-Cookie', '')).get('session')
+    if status != 302 or cookie is None:
+        raise RuntimeError(f"login de administrador falló (HTTP {status})")
+    return f"session={cookie.value}"
+
+
+def admin_scenario(port):
+    def factory(n):
+        headers = {'Cookie': admin_login(port)}
+        state = {'cursor': None}
+
+        def step(i):
+            if i % 3 == 1:
+                return http_request(port, 'GET', '/admin_panel', headers=headers)[0] == 200
+            path = '/admin/api/leads?limit=50'
+            if state['cursor']:
+                path += f"&cursor={state['cursor']}"
+            status, _, body = http_request(port, 'GET', path, headers=headers)
+            if status != 200:
+                return False
+            state['cursor'] = json.loads(body).get('next_cursor')
+            return True
+        return step
+    return factory
+
+
+def courses_scenario(port):
+    def factory(n):
+        def step(i):
+            body = urlencode({'course_id': '1', 'student_name': f'Alumno {n}-{i}',
+                              'student_email': f'alumno{n}.{i}@example.com'})
+            return http_request(port, 'POST', '/cursos', body, FORM_HEADERS)[0] == 302
+        return step
+    return factory
+
+
+SCENARIOS = {
+    'catalogo': catalog_scenario,
+    'leads': leads_scenario,
+    'admin': admin_scenario,
+    'cursos': courses_scenario,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print()
+    print(f"Comparación con {baseline_path} (commit {baseline['environment'].get('commit')})")
+    print(f"{'escenario':>10} {'req/s':>16} {'p99 ms':>18} {'errores':>16}")
+    for name, current in results['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            continue
+        rps_delta = (current['throughput_rps'] / previous['throughput_rps'] - 1) * 100 \
+            if previous['throughput_rps'] else 0.0
+        print(f"{name:>10} {previous['throughput_rps']:>6} → {current['throughput_rps']:<6} ({rps_delta:+.0f}%)"
+              f" {previous['p99_ms']:>7} → {current['p99_ms']:<7}"
+              f" {previous['error_rate']:>6.2%} → {current['error_rate']:<6.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de carga por escenarios bajo gunicorn")
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=32, help="clientes simultáneos")
+    parser.add_argument('--duration', type=float, default=15, help="segundos por escenario")
+    parser.add_argument('--worker-class', default='gthread', choices=['sync', 'gthread', 'gevent'])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8, help="hilos por worker (gthread)")
+    parser.add_argument('--supabase-latency', type=float, default=0.05, help="segundos por consulta")
+    parser.add_argument('--smtp-latency', type=float, default=0.1, help="segundos por mensaje")
+    parser.add_argument('--sync-email', action='store_true',
+                        help="enviar por SMTP dentro de la petición (por defecto, outbox como en producción)")
+    parser.add_argument('--products', type=int, default=300, help="productos en el Supabase falso")
+    parser.add_argument('--leads', type=int, default=2000, help="leads de partida en el Supabase falso")
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--json', help="guardar los resultados en este archivo")
+    parser.add_argument('--compare', help="JSON de una ejecución anterior con el que comparar")
+    args = parser.parse_args()
+
+    settings = {k: v for k, v in vars(args).items() if k not in ('json', 'compare')}
+    results = {
+        'settings': settings,
+        'environment': {
+            'commit': git_commit(),
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'scenarios': {},
+    }
+
+    sink = SMTPSink(latency=args.smtp_latency).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix='bench-suite-') as data_dir:
+            env = dict(GUNICORN_WORKER_CLASS=args.worker_class,
+                       GUNICORN_WORKERS=str(args.workers),
+                       GUNICORN_THREADS=str(args.threads),
+                       BENCH_SUPABASE_LATENCY=str(args.supabase_latency),
+                       BENCH_PRODUCTS=str(args.products),
+                       BENCH_LEADS=str(args.leads),
+                       SMTP_SERVER='127.0.0.1', SMTP_PORT=str(sink.port), SMTP_STARTTLS='false',
+                       EMAIL_USER='benchmark@proedent.local', EMAIL_PASSWORD='benchmark',
+                       EMAIL_OUTBOX_ENABLED='false' if args.sync_email else 'true',
+                       SMTP_POOL_SIZE=str(args.threads),
+                       PROEDENT_DATA_DIR=data_dir)
+            process = start_gunicorn(args.port, env, args.worker_class)
+            try:
+                for name in args.scenarios:
+                    results['scenarios'][name] = run_load(args.concurrency, args.duration,
+                                                          SCENARIOS[name](args.port))
+                    print(f"{name:>10}: {results['scenarios'][name]}")
+            finally:
+                stop_gunicorn(process)
+    finally:
+        sink.stop()
+
+    print()
+    print(f"{'escenario':>10} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}")
+    for name, result in results['scenarios'].items():
+        print(f"{name:>10} {result['throughput_rps']:>8} {result['p50_ms']:>9} {result['p95_ms']:>9} "
+              f"{result['p99_ms']:>9} {result['error_rate']:>8.2%}")
+    print(f"Emails recibidos por el sink: {sink.messages}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        print_comparison(results, args.compare)
+    if any(result['requests'] == 0 for result in results['scenarios'].values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
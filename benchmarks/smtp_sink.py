@@ -0,0 +1,103 @@
+# smtp_sink.py - Servidor SMTP mínimo que acepta y descarta mensajes, con latencia
+#
+# Responde EHLO/AUTH/MAIL/RCPT/DATA/NOOP/RSET/QUIT como un relay real pero sin
+# TLS (usar SMTP_STARTTLS=false en la app). La latencia se aplica al confirmar
+# cada DATA, que es donde un servidor real tarda (colas, antispam).
+#
+# Uso suelto:  python -m benchmarks.smtp_sink --port 2525 --latency 0.1
+import argparse
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        try:
+            self._session()
+        except (ConnectionResetError, BrokenPipeError):
+            pass  # el cliente (p. ej. un worker de gunicorn al terminar) cerró la conexión
+
+    def _session(self):
+        sink = self.server.sink
+        self._reply('220 smtp-sink listo')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                self.wfile.write(b'250-smtp-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n')
+            elif command.startswith('AUTH'):
+                self._reply('235 Autenticado')
+            elif command.startswith('DATA'):
+                self._reply('354 Fin con <CRLF>.<CRLF>')
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data == b'.\r\n':
+                        break
+                    size += len(data)
+                if sink.latency:
+                    time.sleep(sink.latency)
+                sink.record(size)
+                self._reply('250 Mensaje aceptado')
+            elif command.startswith('QUIT'):
+                self._reply('221 Adiós')
+                return
+            else:  # MAIL, RCPT, NOOP, RSET
+                self._reply('250 OK')
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """Sink SMTP en un hilo de fondo; cuenta mensajes y bytes recibidos"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        self.latency = latency
+        self.messages = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _SMTPHandler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address
+
+    def record(self, size):
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sink SMTP con latencia para pruebas de carga")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2525)
+    parser.add_argument('--latency', type=float, default=0.1, help="segundos por mensaje")
+    args = parser.parse_args()
+    sink = SMTPSink(args.host, args.port, args.latency).start()
+    print(f"Sink SMTP en {sink.host}:{sink.port} (latencia {args.latency}s); Ctrl+C para salir")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"  {sink.messages} mensajes, {sink.bytes} bytes")
+    except KeyboardInterrupt:
+        sink.stop()
+
+
+if __name__ == '__main__':
+    main()
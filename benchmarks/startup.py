@@ -0,0 +1,141 @@
+# startup.py - Tiempo de arranque, RSS e imports de un worker (import app2)
+#
+# Cada ejecución importa app2 en un intérprete nuevo con `-X importtime`, como
+# hace un worker de gunicorn sin preload_app, y mide el tiempo hasta tener la app
+# lista, el RSS máximo del proceso y los paquetes más caros de importar. Con los
+# presupuestos (--max-boot-ms, --max-rss-mb) y la lista de módulos prohibidos
+# (--forbid) termina con código 1 si alguno se incumple, para usarlo como
+# guardia en CI. Ver benchmarks/README.md.
+#
+# Uso:
+#   python -m benchmarks.startup
+#   python -m benchmarks.startup --runs 5 --max-boot-ms 800 --max-rss-mb 60
+#   python -m benchmarks.startup --top 30 --json arranque.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencias pesadas que ningún worker debe cargar al arrancar: o no se usan
+# (pandas, numpy, matplotlib, scikit-learn, partes de supabase-py que no son la
+# API REST) o se importan dentro de la función que las necesita (openpyxl, PIL)
+FORBIDDEN_MODULES = ('pandas', 'numpy', 'matplotlib', 'sklearn', 'openpyxl', 'PIL',
+                     'supabase', 'supabase_auth', 'realtime', 'storage3', 'supabase_functions')
+
+# Presupuestos por defecto (mediana, con -X importtime activo). Referencia en la
+# máquina de desarrollo: ~480 ms y ~55 MB; el margen absorbe el ruido entre
+# máquinas pero no una dependencia pesada nueva importada al arrancar.
+BOOT_BUDGET_MS = 1000
+RSS_BUDGET_MB = 64
+
+_CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+import app2
+import_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({
+    'import_ms': import_ms,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': sorted(sys.modules),
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """Tiempos acumulados (ms) por paquete de primer nivel a partir de -X importtime"""
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        top = name.strip().split('.')[0]
+        # El primer import de un paquete incluye a sus submódulos; las entradas
+        # posteriores del mismo paquete ya están contadas en ese acumulado
+        if top not in packages or name.strip() == top:
+            packages[top] = max(packages.get(top, 0.0), int(cumulative) / 1000)
+    return packages
+
+
+def measure_once(env):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', _CHILD],
+                            cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"import app2 falló:\n{result.stderr[-2000:]}")
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    data['wall_ms'] = wall_ms
+    data['packages'] = parse_importtime(result.stderr)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Medir el arranque de un worker (import app2) y comprobar presupuestos")
+    parser.add_argument('--runs', type=int, default=3, help="ejecuciones; se reporta la mediana")
+    parser.add_argument('--top', type=int, default=15, help="paquetes más caros a mostrar")
+    parser.add_argument('--max-boot-ms', type=float, default=BOOT_BUDGET_MS,
+                        help="presupuesto de import app2 (mediana, ms; 0 = sin límite)")
+    parser.add_argument('--max-rss-mb', type=float, default=RSS_BUDGET_MB,
+                        help="presupuesto de RSS tras importar (mediana, MB; 0 = sin límite)")
+    parser.add_argument('--forbid', nargs='*', default=list(FORBIDDEN_MODULES),
+                        help="módulos que no deben estar cargados tras el arranque")
+    parser.add_argument('--json', help="guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench-startup-') as data_dir:
+        # El cliente Supabase no conecta al crearse: basta con una URL cualquiera
+        env = dict(os.environ,
+                   SUPABASE_URL=os.getenv('SUPABASE_URL', 'http://localhost:54321'),
+                   SUPABASE_KEY=os.getenv('SUPABASE_KEY', 'benchmark-key'),
+                   PROEDENT_DATA_DIR=data_dir)
+        runs = [measure_once(env) for _ in range(args.runs)]
+
+    import_ms = statistics.median(run['import_ms'] for run in runs)
+    wall_ms = statistics.median(run['wall_ms'] for run in runs)
+    rss_mb = statistics.median(run['rss_mb'] for run in runs)
+    modules = runs[-1]['modules']
+    packages = {name: statistics.median(run['packages'].get(name, 0.0) for run in runs)
+                for name in runs[-1]['packages']}
+    top = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    print(f"import app2:      {import_ms:8.1f} ms (mediana de {args.runs})")
+    print(f"proceso completo: {wall_ms:8.1f} ms (intérprete + import + salida)")
+    print(f"RSS máximo:       {rss_mb:8.1f} MB")
+    print(f"Módulos cargados: {len(modules):8d}")
+    print()
+    print(f"{'paquete':<28} {'ms acumulados':>14}")
+    for name, ms in top:
+        print(f"{name:<28} {ms:>14.1f}")
+
+    violations = []
+    if args.max_boot_ms and import_ms > args.max_boot_ms:
+        violations.append(f"import app2 tarda {import_ms:.0f} ms (presupuesto {args.max_boot_ms:.0f} ms)")
+    if args.max_rss_mb and rss_mb > args.max_rss_mb:
+        violations.append(f"RSS {rss_mb:.0f} MB (presupuesto {args.max_rss_mb:.0f} MB)")
+    loaded = sorted(name for name in args.forbid if name in modules)
+    if loaded:
+        violations.append(f"módulos prohibidos cargados al arrancar: {', '.join(loaded)}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'import_ms': import_ms, 'wall_ms': wall_ms, 'rss_mb': rss_mb,
+                       'modules': len(modules), 'top_packages': dict(top),
+                       'violations': violations}, f, indent=2)
+
+    if violations:
+        print()
+        for violation in violations:
+            print(f"FALLO: {violation}")
+        sys.exit(1)
+    print()
+    print("Presupuestos de arranque: OK")
+
+
+if __name__ == '__main__':
+    main()
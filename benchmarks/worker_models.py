@@ -0,0 +1,97 @@
+# worker_models.py - Throughput y p99 del POST de lead magnet con cada modelo de worker
+#
+# Para cada modo (sync, gthread, gevent) levanta gunicorn con gunicorn_config.py
+# sobre benchmarks/bench_app.py (Supabase falso con latencia) y un sink SMTP con
+# latencia, y envía POST /lead_magnet_secretos desde N clientes durante D
+# segundos, cada petición en su propia conexión (benchmarks/harness.py). Ver
+# benchmarks/README.md.
+#
+# Uso:
+#   python -m benchmarks.worker_models
+#   python -m benchmarks.worker_models --modes sync gthread --concurrency 64 --duration 30
+#   python -m benchmarks.worker_models --outbox --json resultados.json
+import argparse
+import importlib.util
+import json
+import tempfile
+from urllib.parse import urlencode
+
+from benchmarks.harness import http_request, run_load, start_gunicorn, stop_gunicorn
+from benchmarks.smtp_sink import SMTPSink
+
+LEAD_PATH = '/lead_magnet_secretos'
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+
+def gunicorn_env(mode, args, smtp_port, data_dir):
+    return dict(GUNICORN_WORKER_CLASS=mode,
+                GUNICORN_WORKERS=str(args.workers),
+                GUNICORN_THREADS=str(args.threads),
+                GUNICORN_WORKER_CONNECTIONS=str(args.worker_connections),
+                BENCH_SUPABASE_LATENCY=str(args.supabase_latency),
+                SMTP_SERVER='127.0.0.1', SMTP_PORT=str(smtp_port), SMTP_STARTTLS='false',
+                EMAIL_USER='benchmark@proedent.local', EMAIL_PASSWORD='benchmark',
+                EMAIL_OUTBOX_ENABLED='true' if args.outbox else 'false',
+                SMTP_POOL_SIZE=str(args.smtp_pool_size or args.threads),
+                PAGE_CACHE_WARMUP='false',
+                PROEDENT_DATA_DIR=data_dir)
+
+
+def lead_client(port):
+    def factory(n):
+        def step(i):
+            body = urlencode({'nombre': f'Carga {n}-{i}', 'email': f'carga{n}.{i}@example.com',
+                              'intereses': 'tomografia'})
+            return http_request(port, 'POST', LEAD_PATH, body, FORM_HEADERS)[0] == 302
+        return step
+    return factory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar modelos de worker de gunicorn en el POST de leads")
+    parser.add_argument('--modes', nargs='+', default=['sync', 'gthread', 'gevent'],
+                        choices=['sync', 'gthread', 'gevent'])
+    parser.add_argument('--concurrency', type=int, default=64, help="clientes simultáneos")
+    parser.add_argument('--duration', type=float, default=20, help="segundos por modo")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8, help="hilos por worker (gthread)")
+    parser.add_argument('--worker-connections', type=int, default=200, help="greenlets por worker (gevent)")
+    parser.add_argument('--supabase-latency', type=float, default=0.05, help="segundos por consulta")
+    parser.add_argument('--smtp-latency', type=float, default=0.1, help="segundos por mensaje")
+    parser.add_argument('--smtp-pool-size', type=int, help="sesiones SMTP por worker (por defecto = --threads)")
+    parser.add_argument('--outbox', action='store_true', help="encolar emails en el outbox (por defecto SMTP síncrono)")
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--json', help="guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    sink = SMTPSink(latency=args.smtp_latency).start()
+    results = {'settings': {k: v for k, v in vars(args).items() if k != 'json'}, 'modes': {}}
+    try:
+        for mode in args.modes:
+            if mode == 'gevent' and importlib.util.find_spec('gevent') is None:
+                print("gevent no está instalado: se omite (pip install gevent)")
+                continue
+            with tempfile.TemporaryDirectory(prefix=f'bench-{mode}-') as data_dir:
+                process = start_gunicorn(args.port, gunicorn_env(mode, args, sink.port, data_dir), mode)
+                try:
+                    results['modes'][mode] = run_load(args.concurrency, args.duration, lead_client(args.port))
+                finally:
+                    stop_gunicorn(process)
+            print(f"{mode:>8}: {results['modes'][mode]}")
+    finally:
+        sink.stop()
+
+    print()
+    print(f"{'modo':>8} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'errores':>8}")
+    for mode, result in results['modes'].items():
+        print(f"{mode:>8} {result['throughput_rps']:>8} {result['p50_ms']:>9} "
+              f"{result['p99_ms']:>9} {result['errors']:>8}")
+    print(f"Emails recibidos por el sink: {sink.messages}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
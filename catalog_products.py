@@ -0,0 +1,509 @@
+# catalog_products.py - Productos del catálogo que no están en la tabla products de Supabase
+#
+# Antes eran tarjetas escritas a mano en templates/catalogo.html, fuera del
+# índice de productos: aparecían en todas las páginas y con cualquier búsqueda o
+# filtro. Ahora /catalogo los indexa junto con los de Supabase (detrás de ellos)
+# y pasan por la misma búsqueda, filtros y paginación. Los ids son texto para no
+# chocar con los de la tabla (y /api/v1/products solo expone ids numéricos).
+#
+# Campos de presentación opcionales: details (texto del modal si difiere de la
+# descripción), badge_class (color de la etiqueta de marca), category_label
+# (texto de la etiqueta de categoría), accent (degradado de la tarjeta),
+# highlight ('DESTACADO' o 'NUEVO') y placeholder_icon (icono Font Awesome que
+# se muestra si la imagen no carga; por defecto fa-image).
+
+STATIC_PRODUCTS = [
+    # NUFONA
+    {'id': 'nu-x1preferred',
+     'name': 'X1 Preferred',
+     'brand': 'NUFONA',
+     'category': 'Unidades Dentales',
+     'image': 'nufona/nu-x1preferred.png',
+     'price': 'Consultar precio',
+     'description': 'Unidad dental premium con características avanzadas y ergonomía superior. Diseñada para profesionales que buscan la máxima calidad.',
+     'details': 'Unidad dental premium con características avanzadas y ergonomía superior',
+     'specifications': 'Control táctil avanzado, sillón ergonómico premium, sistema de aspiración dual, iluminación LED integrada',
+     'badge_class': 'bg-warning',
+     'accent': ('#10b981', '#059669'),
+     'highlight': 'DESTACADO'},
+    {'id': 'nu-x1smart',
+     'name': 'X1 Smart',
+     'brand': 'NUFONA',
+     'category': 'Unidades Dentales',
+     'image': 'nufona/nu-x1smart.png',
+     'price': 'Consultar precio',
+     'description': 'Unidad dental inteligente con tecnología de control automatizado y funciones avanzadas de diagnóstico integrado.',
+     'details': 'Unidad dental inteligente con tecnología de control automatizado',
+     'specifications': 'Sistema de control inteligente, memoria de posiciones, conectividad avanzada, panel de control intuitivo',
+     'badge_class': 'bg-warning',
+     'accent': ('#3b82f6', '#1e40af')},
+    {'id': 'nu-x1expert',
+     'name': 'X1 Expert',
+     'brand': 'NUFONA',
+     'category': 'Unidades Dentales',
+     'image': 'nufona/nu-x1expert.png',
+     'price': 'Consultar precio',
+     'description': 'Unidad dental profesional diseñada para especialistas, con características avanzadas para tratamientos complejos.',
+     'details': 'Unidad dental profesional diseñada para especialistas',
+     'specifications': 'Configuración especializada, instrumentos de alta precisión, sistema de irrigación avanzado, ergonomía optimizada',
+     'badge_class': 'bg-warning',
+     'accent': ('#3b82f6', '#1e40af')},
+    {'id': 'nu-x1master',
+     'name': 'X1 Master',
+     'brand': 'NUFONA',
+     'category': 'Unidades Dentales',
+     'image': 'nufona/nu-x1master.png',
+     'price': 'Consultar precio',
+     'description': 'La unidad dental más completa de la serie X1, con todas las características avanzadas para consultas de alta gama.',
+     'details': 'La unidad dental más completa de la serie X1',
+     'specifications': 'Configuración máxima completa, tecnología de última generación, sistema multimedia integrado, control remoto avanzado',
+     'badge_class': 'bg-warning',
+     'accent': ('#3b82f6', '#1e40af')},
+    {'id': 'nu-m200surgical45',
+     'name': 'Maxso M200 Surgical 45',
+     'brand': 'NUFONA',
+     'category': 'Turbinas de Alta Velocidad',
+     'image': 'nufona/nu-m200surgical45.png',
+     'price': 'Consultar precio',
+     'description': 'Turbina quirúrgica de alta precisión sin fibra óptica, ideal para procedimientos que requieren máximo control.',
+     'details': 'Turbina quirúrgica de alta precisión sin fibra óptica',
+     'specifications': 'Cabeza quirúrgica compacta, rotación de 45°, sistema de refrigeración eficiente, bajo nivel de ruido',
+     'badge_class': 'bg-warning',
+     'category_label': 'Turbinas Alta Velocidad',
+     'accent': ('#f59e0b', '#d97706')},
+    {'id': 'nu-m200esmart',
+     'name': 'Maxso M200E Smart',
+     'brand': 'NUFONA',
+     'category': 'Turbinas de Alta Velocidad',
+     'image': 'nufona/nu-m200esmart.png',
+     'price': 'Consultar precio',
+     'description': 'Turbina inteligente con sistema de control automático y características avanzadas de rendimiento.',
+     'details': 'Turbina inteligente con sistema de control automático',
+     'specifications': 'Sistema smart integrado, control de velocidad automático, ergonomía optimizada, mantenimiento simplificado',
+     'badge_class': 'bg-warning',
+     'category_label': 'Turbinas Alta Velocidad',
+     'accent': ('#f59e0b', '#d97706')},
+    {'id': 'nu-f1000',
+     'name': 'F1000',
+     'brand': 'NUFONA',
+     'category': 'Turbinas de Alta Velocidad',
+     'image': 'nufona/nu-f1000.png',
+     'price': 'Consultar precio',
+     'description': 'Turbina estándar confiable y eficiente, ideal para uso diario en consulta general.',
+     'details': 'Turbina estándar confiable y eficiente',
+     'specifications': 'Diseño clásico confiable, mantenimiento sencillo, excelente relación calidad-precio, compatible con múltiples sistemas',
+     'badge_class': 'bg-warning',
+     'category_label': 'Turbinas Alta Velocidad',
+     'accent': ('#f59e0b', '#d97706')},
+    {'id': 'nu-x200surgical45',
+     'name': 'Maxso X200 Surgical 45',
+     'brand': 'NUFONA',
+     'category': 'Turbinas de Alta Velocidad',
+     'image': 'nufona/nu-x200surgical45.png',
+     'price': 'Consultar precio',
+     'description': 'Turbina quirúrgica con fibra óptica integrada para máxima visibilidad en procedimientos complejos.',
+     'details': 'Turbina quirúrgica con fibra óptica integrada',
+     'specifications': 'Fibra óptica integrada, iluminación LED superior, cabeza quirúrgica 45°, visibilidad excepcional',
+     'badge_class': 'bg-warning',
+     'category_label': 'Turbinas Alta Velocidad',
+     'accent': ('#f59e0b', '#d97706')},
+    {'id': 'nu-x200x',
+     'name': 'Maxso X200 X',
+     'brand': 'NUFONA',
+     'category': 'Turbinas de Alta Velocidad',
+     'image': 'nufona/nu-x200x.png',
+     'price': 'Consultar precio',
+     'description': 'Turbina avanzada con tecnología de fibra óptica y características premium para profesionales exigentes.',
+     'details': 'Turbina avanzada con tecnología de fibra óptica',
+     'specifications': 'Tecnología de fibra óptica avanzada, potencia superior, durabilidad excepcional, ergonomía profesional',
+     'badge_class': 'bg-warning',
+     'category_label': 'Turbinas Alta Velocidad',
+     'accent': ('#f59e0b', '#d97706')},
+    {'id': 'nu-f2000',
+     'name': 'F2000',
+     'brand': 'NUFONA',
+     'category': 'Turbinas de Alta Velocidad',
+     'image': 'nufona/nu-f2000.png',
+     'price': 'Consultar precio',
+     'description': 'Turbina con fibra óptica de excelente relación calidad-precio, perfecta para consultas que buscan iluminación superior.',
+     'details': 'Turbina con fibra óptica de excelente relación calidad-precio',
+     'specifications': 'Fibra óptica estándar, iluminación LED eficiente, fácil mantenimiento, versatilidad de uso',
+     'badge_class': 'bg-warning',
+     'category_label': 'Turbinas Alta Velocidad',
+     'accent': ('#f59e0b', '#d97706')},
+    {'id': 'nu-airmotor',
+     'name': 'Air Motor',
+     'brand': 'NUFONA',
+     'category': 'Piezas de Mano',
+     'image': 'nufona/nu-airmotor.png',
+     'price': 'Consultar precio',
+     'description': 'Motor neumático de baja velocidad para procedimientos de pulido y acabado.',
+     'details': 'Motor neumático de baja velocidad',
+     'specifications': 'Velocidad variable, torque constante, acoplamiento universal, operación silenciosa',
+     'badge_class': 'bg-warning',
+     'accent': ('#8b5cf6', '#7c3aed')},
+    {'id': 'nu-contraangle',
+     'name': 'Contra Angle',
+     'brand': 'NUFONA',
+     'category': 'Piezas de Mano',
+     'image': 'nufona/nu-contraangle.png',
+     'price': 'Consultar precio',
+     'description': 'Contraángulo ergonómico para acceso óptimo en todas las zonas de la boca.',
+     'details': 'Contraángulo ergonómico para acceso óptimo',
+     'specifications': 'Cabeza angulada optimizada, sistema de refrigeración, fácil cambio de fresas, diseño ergonómico',
+     'badge_class': 'bg-warning',
+     'accent': ('#8b5cf6', '#7c3aed')},
+    {'id': 'nu-straightnosecone',
+     'name': 'Straight Nose Cone',
+     'brand': 'NUFONA',
+     'category': 'Piezas de Mano',
+     'image': 'nufona/nu-straightnosecone.png',
+     'price': 'Consultar precio',
+     'description': 'Pieza de mano recta para trabajos de precisión y pulido directo.',
+     'details': 'Pieza de mano recta para trabajos de precisión',
+     'specifications': 'Acceso directo lineal, control preciso, compatible con múltiples fresas, construcción robusta',
+     'badge_class': 'bg-warning',
+     'accent': ('#8b5cf6', '#7c3aed')},
+    {'id': 'nu-coupler',
+     'name': 'Coupler',
+     'brand': 'NUFONA',
+     'category': 'Acoplamientos',
+     'image': 'nufona/nu-coupler.png',
+     'price': 'Consultar precio',
+     'description': 'Acoplamiento universal para conexión de instrumentos con diferentes sistemas.',
+     'details': 'Acoplamiento universal para conexión de instrumentos',
+     'specifications': 'Conexión universal, sellado hermético, fácil instalación, compatibilidad amplia',
+     'badge_class': 'bg-warning',
+     'accent': ('#64748b', '#475569')},
+
+    # ACTEON
+    {'id': 'a-x-mind-prime-3d',
+     'name': 'X-MIND® prime 3D',
+     'brand': 'ACTEON',
+     'category': 'Tomografía 3D',
+     'image': 'acteon/a-x-mind-prime-3d.png',
+     'price': 'Consultar precio',
+     'description': '¡Es la nueva inteligencia! Siempre dependerá de imágenes de alta calidad y potentes herramientas de imagen para tener éxito en el diagnóstico y la planificación del tratamiento.',
+     'specifications': 'Tecnología de vanguardia en tomografía 3D con imágenes de alta resolución e interface intuitiva',
+     'badge_class': 'bg-info',
+     'accent': ('#0ea5e9', '#0284c7')},
+    {'id': 'a-x-mind-optima-3d',
+     'name': 'X-MIND® optima 3D',
+     'brand': 'ACTEON',
+     'category': 'Tomografía 3D',
+     'image': 'acteon/a-x-mind-optima-3d.png',
+     'price': 'Consultar precio',
+     'description': 'Personifica la visión de ACTEON: soluciones innovadoras y centradas en el usuario. Su diseño compacto se integra perfectamente en cualquier consulta dental.',
+     'specifications': 'Diseño compacto con máxima accesibilidad y optimización de espacio en consulta',
+     'badge_class': 'bg-info',
+     'accent': ('#0ea5e9', '#0284c7')},
+    {'id': 'a-x-mind-ceph',
+     'name': 'X-MIND® Ceph',
+     'brand': 'ACTEON',
+     'category': 'Cefalometría',
+     'image': 'acteon/a-x-mind-ceph.png',
+     'price': 'Consultar precio',
+     'description': 'Diseño elegante y fluido con tecnología de vanguardia, muy intuitivo... para estar al alcance de todos.',
+     'specifications': 'Sistema cefalométrico con adquisición rápida y alta calidad de imagen, protección óptima del paciente',
+     'badge_class': 'bg-info',
+     'accent': ('#8b5cf6', '#7c3aed')},
+    {'id': 'a-x-mind-prime2',
+     'name': 'X-MIND® prime 2',
+     'brand': 'ACTEON',
+     'category': 'Panorámico',
+     'image': 'acteon/a-x-mind-prime2.png',
+     'price': 'Consultar precio',
+     'description': 'Es una unidad dental extraoral digital de nueva generación. Presenta un diseño elegante y tecnología de última generación.',
+     'specifications': 'Unidad panorámica digital con diseño elegante, tecnología avanzada e imágenes de alta calidad',
+     'badge_class': 'bg-info',
+     'accent': ('#6b7280', '#4b5563')},
+
+    # EURONDA
+    {'id': 'eu-e10',
+     'name': 'E10',
+     'brand': 'EURONDA',
+     'category': 'Autoclaves',
+     'image': 'euronda/eu-e10.png',
+     'price': 'Consultar precio',
+     'description': 'Autoclave de clase B con tecnología avanzada de esterilización',
+     'specifications': 'Clase B según EN 13060 con capacidad optimizada y tecnología de vapor avanzada',
+     'badge_class': 'bg-danger',
+     'accent': ('#dc2626', '#b91c1c')},
+    {'id': 'eu-exl',
+     'name': 'EXL',
+     'brand': 'EURONDA',
+     'category': 'Autoclaves',
+     'image': 'euronda/eu-exl.png',
+     'price': 'Consultar precio',
+     'description': 'Autoclave premium con tecnología de excelencia para consultas exigentes',
+     'specifications': 'Tecnología premium con mayor capacidad y eficiencia energética',
+     'badge_class': 'bg-danger',
+     'accent': ('#16a34a', '#15803d'),
+     'highlight': 'DESTACADO'},
+    {'id': 'eu-e9',
+     'name': 'E9',
+     'brand': 'EURONDA',
+     'category': 'Autoclaves',
+     'image': 'euronda/eu-e9.png',
+     'price': 'Consultar precio',
+     'description': 'Autoclave confiable con excelente relación calidad-precio',
+     'specifications': 'Diseño compacto con operación sencilla y ciclos de esterilización rápidos',
+     'badge_class': 'bg-danger',
+     'accent': ('#dc2626', '#b91c1c')},
+    {'id': 'eu-e8',
+     'name': 'E8',
+     'brand': 'EURONDA',
+     'category': 'Autoclaves',
+     'image': 'euronda/eu-e8.png',
+     'price': 'Consultar precio',
+     'description': 'Autoclave de entrada ideal para consultas pequeñas',
+     'specifications': 'Tamaño compacto con fácil instalación y controles intuitivos',
+     'badge_class': 'bg-danger',
+     'accent': ('#dc2626', '#b91c1c')},
+    {'id': 'eu-euromatic',
+     'name': 'Euromatic',
+     'brand': 'EURONDA',
+     'category': 'Termoselladoras',
+     'image': 'euronda/eu-euromatic.png',
+     'price': 'Consultar precio',
+     'description': 'Termoselladora automática de alta eficiencia',
+     'specifications': 'Operación automática con sellado uniforme y alta velocidad',
+     'badge_class': 'bg-danger',
+     'accent': ('#0ea5e9', '#0284c7')},
+    {'id': 'eu-eurosealvalida',
+     'name': 'Euroseal Valida',
+     'brand': 'EURONDA',
+     'category': 'Termoselladoras',
+     'image': 'euronda/eu-eurosealvalida.png',
+     'price': 'Consultar precio',
+     'description': 'Termoselladora con sistema de validación integrado',
+     'specifications': 'Sistema de validación con control de temperatura y trazabilidad del proceso',
+     'badge_class': 'bg-danger',
+     'accent': ('#0ea5e9', '#0284c7')},
+    {'id': 'eu-euroseal',
+     'name': 'Euroseal',
+     'brand': 'EURONDA',
+     'category': 'Termoselladoras',
+     'image': 'euronda/eu-euroseal.png',
+     'price': 'Consultar precio',
+     'description': 'Termoselladora estándar confiable y eficiente',
+     'specifications': 'Operación manual con diseño robusto y sellado consistente',
+     'badge_class': 'bg-danger',
+     'accent': ('#0ea5e9', '#0284c7')},
+    {'id': 'eu-eurosealinfinity',
+     'name': 'Euroseal Infinity',
+     'brand': 'EURONDA',
+     'category': 'Termoselladoras',
+     'image': 'euronda/eu-eurosealinfinity.png',
+     'price': 'Consultar precio',
+     'description': 'Termoselladora de uso continuo para alta demanda',
+     'specifications': 'Uso continuo con alta productividad y resistencia extrema',
+     'badge_class': 'bg-danger',
+     'accent': ('#0ea5e9', '#0284c7')},
+    {'id': 'eu-eurosafe60',
+     'name': 'Eurosafe 60',
+     'brand': 'EURONDA',
+     'category': 'Termodesinfección',
+     'image': 'euronda/eu-eurosafe60.png',
+     'price': 'Consultar precio',
+     'description': 'Termodesinfectora compacta de 60 litros',
+     'specifications': 'Capacidad de 60 litros con desinfección térmica eficiente y ciclos automáticos',
+     'badge_class': 'bg-danger',
+     'accent': ('#2563eb', '#1d4ed8')},
+    {'id': 'eu-eurosafe170',
+     'name': 'Eurosafe 170',
+     'brand': 'EURONDA',
+     'category': 'Termodesinfección',
+     'image': 'euronda/eu-eurosafe170.png',
+     'price': 'Consultar precio',
+     'description': 'Termodesinfectora de gran capacidad 170 litros',
+     'specifications': 'Capacidad de 170 litros con alta productividad y múltiples programas',
+     'badge_class': 'bg-danger',
+     'accent': ('#2563eb', '#1d4ed8')},
+    {'id': 'eu-eurosafesmart',
+     'name': 'Eurosafe Smart',
+     'brand': 'EURONDA',
+     'category': 'Cubas multifuncionales',
+     'image': 'euronda/eu-eurosafesmart.png',
+     'price': 'Consultar precio',
+     'description': 'Sistema multifuncional inteligente de limpieza y desinfección',
+     'specifications': 'Múltiples funciones integradas con control inteligente y diseño compacto',
+     'badge_class': 'bg-danger',
+     'category_label': 'Multifuncional',
+     'accent': ('#16a34a', '#15803d')},
+    {'id': 'eu-eurosonic3d',
+     'name': 'Eurosonic',
+     'brand': 'EURONDA',
+     'category': 'Cuba de ultrasonidos',
+     'image': 'euronda/eu-eurosonic3d.png',
+     'price': 'Consultar precio',
+     'description': 'Cuba de ultrasonidos estándar para limpieza eficaz',
+     'specifications': 'Limpieza ultrasónica con frecuencia optimizada y fácil operación',
+     'badge_class': 'bg-danger',
+     'category_label': 'Ultrasonidos',
+     'accent': ('#8b5cf6', '#7c3aed')},
+    {'id': 'eu-eurosonicmicro',
+     'name': 'Eurosonic Micro',
+     'brand': 'EURONDA',
+     'category': 'Cuba de ultrasonidos',
+     'image': 'euronda/eu-eurosonicmicro.png',
+     'price': 'Consultar precio',
+     'description': 'Cuba de ultrasonidos compacta para espacios reducidos',
+     'specifications': 'Diseño compacto con eficiencia espacial, ideal para consultas pequeñas',
+     'badge_class': 'bg-danger',
+     'category_label': 'Ultrasonidos',
+     'accent': ('#8b5cf6', '#7c3aed')},
+    {'id': 'eu-eurosonicenergy',
+     'name': 'Eurosonic Energy',
+     'brand': 'EURONDA',
+     'category': 'Cuba de ultrasonidos',
+     'image': 'euronda/eu-eurosonicenergy.png',
+     'price': 'Consultar precio',
+     'description': 'Cuba de ultrasonidos de alta potencia para limpieza intensiva',
+     'specifications': 'Alta potencia con limpieza intensiva y mayor eficiencia',
+     'badge_class': 'bg-danger',
+     'category_label': 'Ultrasonidos',
+     'accent': ('#8b5cf6', '#7c3aed')},
+    {'id': 'eu-eurosonic4d',
+     'name': 'Eurosonic 4D',
+     'brand': 'EURONDA',
+     'category': 'Cuba de ultrasonidos',
+     'image': 'euronda/eu-eurosonic4d.png',
+     'price': 'Consultar precio',
+     'description': 'Cuba de ultrasonidos con tecnología 4D para limpieza superior',
+     'specifications': 'Tecnología 4D con múltiples frecuencias para resultados excepcionales',
+     'badge_class': 'bg-danger',
+     'category_label': 'Ultrasonidos',
+     'accent': ('#8b5cf6', '#7c3aed')},
+
+    # FARO
+    {'id': 'faro-b75',
+     'name': 'Lámpara Quirúrgica y Dental B75',
+     'brand': 'FARO',
+     'category': 'Iluminación LED',
+     'image': 'faro/faro-b75.png',
+     'price': 'Consultar precio',
+     'description': 'Nueva lámpara quirúrgica LED de última generación para procedimientos médicos y dentales',
+     'specifications': 'Tecnología LED avanzada con iluminación quirúrgica profesional y control de intensidad variable',
+     'badge_class': 'bg-warning',
+     'accent': ('#ef4444', '#dc2626'),
+     'highlight': 'NUEVO',
+     'placeholder_icon': 'fa-lightbulb'},
+    {'id': 'faro-eva',
+     'name': 'Lámpara Led Dental Eva',
+     'brand': 'FARO',
+     'category': 'Iluminación LED',
+     'image': 'faro/faro-eva.png',
+     'price': 'Consultar precio',
+     'description': 'Lámpara LED dental de alto rendimiento con tecnología avanzada de iluminación',
+     'specifications': 'LED de alta eficiencia con brazo articulado flexible y control táctil intuitivo',
+     'badge_class': 'bg-warning',
+     'accent': ('#10b981', '#059669'),
+     'highlight': 'DESTACADO'},
+    {'id': 'faro-evacam',
+     'name': 'Lámpara Led Dental Eva Cam',
+     'brand': 'FARO',
+     'category': 'Iluminación LED',
+     'image': 'faro/faro-evacam.png',
+     'price': 'Consultar precio',
+     'description': 'Lámpara LED dental Eva con cámara integrada para documentación',
+     'specifications': 'Cámara intraoral integrada con documentación digital e iluminación LED premium',
+     'badge_class': 'bg-warning',
+     'accent': ('#f59e0b', '#d97706')},
+
+    # FRASACO
+    {'id': 'fra-ana4',
+     'name': 'Serie ANA-4',
+     'brand': 'FRASACO',
+     'category': 'Modelos Educativos',
+     'image': 'frasaco/fra-ana4.png',
+     'price': 'Consultar precio',
+     'description': 'Serie de modelos estándar para enseñanza dental básica y avanzada',
+     'specifications': 'Dentición completa anatómicamente correcta con material resistente, ideal para prácticas de preparación',
+     'badge_class': 'bg-primary',
+     'accent': ('#16a34a', '#15803d'),
+     'highlight': 'DESTACADO'},
+    {'id': 'fra-endodoncia',
+     'name': 'Endodoncia',
+     'brand': 'FRASACO',
+     'category': 'Modelos Educativos',
+     'image': 'frasaco/fra-endodoncia.png',
+     'price': 'Consultar precio',
+     'description': 'Modelos especializados para entrenamiento en endodoncia',
+     'specifications': 'Canales radiculares realistas con pulpa visible para práctica de instrumentación',
+     'badge_class': 'bg-primary',
+     'accent': ('#2563eb', '#1d4ed8')},
+    {'id': 'fra-implantologia',
+     'name': 'Implantología',
+     'brand': 'FRASACO',
+     'category': 'Modelos Educativos',
+     'image': 'frasaco/fra-implantologia.png',
+     'price': 'Consultar precio',
+     'description': 'Modelos para práctica de técnicas de implantología oral',
+     'specifications': 'Hueso artificial realista con sitios de implante marcados para entrenamiento quirúrgico',
+     'badge_class': 'bg-primary',
+     'accent': ('#2563eb', '#1d4ed8')},
+    {'id': 'fra-cabezaP63',
+     'name': 'Phantom Head P-6/3',
+     'brand': 'FRASACO',
+     'category': 'Modelos Educativos',
+     'image': 'frasaco/fra-cabezaP63.png',
+     'price': 'Consultar precio',
+     'description': 'Phantom heads P-6/3 para simulación dental completa',
+     'specifications': 'Anatomía facial realista con apertura bucal natural, compatible con unidades dentales',
+     'badge_class': 'bg-primary',
+     'accent': ('#2563eb', '#1d4ed8')},
+    {'id': 'fra-infantil',
+     'name': 'Odontología Infantil',
+     'brand': 'FRASACO',
+     'category': 'Modelos Educativos',
+     'image': 'frasaco/fra-infantil.png',
+     'price': 'Consultar precio',
+     'description': 'Modelos para odontología pediátrica y dentición decidua',
+     'specifications': 'Dentición decidua completa con caries típicas infantiles para técnicas de odontopediatría',
+     'badge_class': 'bg-primary',
+     'accent': ('#2563eb', '#1d4ed8')},
+
+    # DMG
+    {'id': 'dmg-iconproximal',
+     'name': 'Icon Proximal',
+     'brand': 'DMG',
+     'category': 'Materiales Dentales',
+     'image': 'dmg/dmg-iconproximal.png',
+     'price': 'Consultar precio',
+     'description': 'Infiltrante de resina para lesiones cariosas proximales',
+     'specifications': 'Tratamiento microinvasivo de caries proximal incipiente sin preparación cavitaria',
+     'badge_class': 'bg-success',
+     'accent': ('#059669', '#047857')},
+    {'id': 'dmg-luxatempstar',
+     'name': 'Luxatemp Star',
+     'brand': 'DMG',
+     'category': 'Materiales Dentales',
+     'image': 'dmg/dmg-luxatempstar.png',
+     'price': 'Consultar precio',
+     'description': 'Material de restauración provisional de última generación',
+     'specifications': 'Composite autopolimerizable para coronas y puentes provisionales con excelentes propiedades estéticas',
+     'badge_class': 'bg-success',
+     'accent': ('#16a34a', '#15803d'),
+     'highlight': 'DESTACADO'},
+    {'id': 'dmg-silagumlight',
+     'name': 'Silagum Light',
+     'brand': 'DMG',
+     'category': 'Materiales Dentales',
+     'image': 'dmg/dmg-silagumlight.png',
+     'price': 'Consultar precio',
+     'description': 'Silicona de impresión de baja viscosidad para técnica de doble impresión',
+     'specifications': 'A-silicona de adición con excelentes propiedades de flujo y precisión dimensional',
+     'badge_class': 'bg-success',
+     'accent': ('#059669', '#047857')},
+    {'id': 'dmg-permacemuniversal',
+     'name': 'PermaCem Universal',
+     'brand': 'DMG',
+     'category': 'Materiales Dentales',
+     'image': 'dmg/dmg-permacemuniversal.png',
+     'price': 'Consultar precio',
+     'description': 'Cemento de resina universal para cementación permanente',
+     'specifications': 'Cemento dual para todo tipo de restauraciones indirectas con adhesión universal',
+     'badge_class': 'bg-success',
+     'accent': ('#059669', '#047857')},
+]
@@ -0,0 +1,139 @@
+# db_cache.py - Caché read-through con TTL para las consultas de DatabaseManager
+#
+# Cada entrada pertenece a una tabla con su propio TTL. Pasado el TTL, y dentro
+# de la ventana "stale", se sirve el valor viejo mientras un hilo lo refresca
+# en segundo plano (stale-while-revalidate). Las escrituras invalidan la tabla:
+# en este worker de inmediato y en los demás workers a través de un archivo
+# marcador cuyo mtime actúa como generación compartida.
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ('value', 'loaded_at', 'generation', 'refreshing')
+
+    def __init__(self, value, loaded_at, generation):
+        self.value = value
+        self.loaded_at = loaded_at
+        self.generation = generation
+        self.refreshing = False
+
+
+class TableCache:
+    """Caché acotada por número de entradas con TTL por tabla"""
+
+    def __init__(self, ttls, default_ttl=30.0, stale_factor=2.0, max_entries=256, invalidation_dir=None):
+        self.ttls = dict(ttls)
+        self.default_ttl = default_ttl
+        self.stale_factor = stale_factor
+        self.max_entries = max_entries
+        self.invalidation_dir = invalidation_dir
+        if invalidation_dir:
+            os.makedirs(invalidation_dir, exist_ok=True)
+
+        self._entries = OrderedDict()
+        self._local_generations = {}
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    # GENERACIONES (invalidación entre workers)
+    def _marker(self, table):
+        return os.path.join(self.invalidation_dir, f"{table}.gen")
+
+    def _generation(self, table):
+        local = self._local_generations.get(table, 0)
+        if not self.invalidation_dir:
+            return local
+        try:
+            shared = os.stat(self._marker(table)).st_mtime_ns
+        except FileNotFoundError:
+            shared = 0
+        return max(local, shared)
+
+    def _count(self, table, counter):
+        table_counters = self._counters.setdefault(table, {'hits': 0, 'misses': 0, 'stale_hits': 0,
+                                                           'refresh_errors': 0, 'invalidations': 0})
+        table_counters[counter] += 1
+
+    # API PÚBLICA
+    def get_or_load(self, table, key, loader):
+        """Devolver el valor cacheado o cargarlo con loader() (que puede lanzar)"""
+        ttl = self.ttls.get(table, self.default_ttl)
+        if ttl <= 0:
+            return loader()
+
+        cache_key = (table, key)
+        generation = self._generation(table)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry.generation == generation:
+                age = now - entry.loaded_at
+                if age < ttl:
+                    self._entries.move_to_end(cache_key)
+                    self._count(table, 'hits')
+                    return entry.value
+                if age < ttl * self.stale_factor:
+                    self._count(table, 'stale_hits')
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        threading.Thread(target=self._refresh, args=(cache_key, loader, generation),
+                                         daemon=True).start()
+                    return entry.value
+            self._count(table, 'misses')
+
+        value = loader()
+        self._store(cache_key, value, generation)
+        return value
+
+    def _refresh(self, cache_key, loader, generation):
+        try:
+            value = loader()
+        except Exception as e:
+            logger.warning(f"Error refrescando caché de {cache_key[0]}: {e}")
+            with self._lock:
+                self._count(cache_key[0], 'refresh_errors')
+                entry = self._entries.get(cache_key)
+                if entry is not None:
+                    entry.refreshing = False
+            return
+        self._store(cache_key, value, generation)
+
+    def _store(self, cache_key, value, generation):
+        with self._lock:
+            # Si hubo una invalidación mientras se cargaba, no guardar datos viejos
+            if generation != self._generation(cache_key[0]):
+                return
+            self._entries[cache_key] = _Entry(value, time.monotonic(), generation)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table):
+        """Descartar todas las entradas de la tabla en todos los workers"""
+        with self._lock:
+            self._local_generations[table] = max(self._generation(table), time.time_ns())
+            for cache_key in [k for k in self._entries if k[0] == table]:
+                del self._entries[cache_key]
+            self._count(table, 'invalidations')
+        if self.invalidation_dir:
+            try:
+                with open(self._marker(table), 'a'):
+                    pass
+                os.utime(self._marker(table), ns=(self._local_generations[table], self._local_generations[table]))
+            except OSError as e:
+                logger.warning(f"No se pudo propagar la invalidación de {table}: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'tables': {table: dict(counters) for table, counters in self._counters.items()},
+            }
@@ -0,0 +1,68 @@
+# email_attachments.py - Caché de adjuntos ya codificados en base64
+#
+# Los adjuntos que se envían una y otra vez (p. ej. GUIAvendedores.pdf) se leen
+# y codifican una sola vez por worker. La clave incluye mtime y tamaño, así que
+# reemplazar el archivo en disco invalida la entrada automáticamente.
+import logging
+import os
+import threading
+from base64 import encodebytes
+from collections import OrderedDict
+from email.mime.base import MIMEBase
+
+logger = logging.getLogger(__name__)
+
+
+class AttachmentCache:
+    """Caché LRU de payloads base64, acotada por el total de bytes codificados"""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _encoded_payload(self, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                return payload
+            self._counters['misses'] += 1
+
+        with open(path, 'rb') as f:
+            payload = encodebytes(f.read()).decode('ascii')
+
+        if len(payload) > self.max_bytes:
+            # Demasiado grande para cachear: se usa una sola vez
+            return payload
+
+        with self._lock:
+            # Descartar versiones anteriores del mismo archivo
+            for old_key in [k for k in self._entries if k[0] == key[0] and k != key]:
+                self._total_bytes -= len(self._entries.pop(old_key))
+            if key not in self._entries:
+                self._entries[key] = payload
+                self._total_bytes += len(payload)
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+                self._counters['evictions'] += 1
+        return payload
+
+    def get_part(self, path, filename, maintype='application', subtype='octet-stream'):
+        """Construir una parte MIME nueva reutilizando el payload codificado"""
+        part = MIMEBase(maintype, subtype)
+        part.set_payload(self._encoded_payload(path))
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        return part
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, entries=len(self._entries), bytes=self._total_bytes)
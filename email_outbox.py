@@ -0,0 +1,218 @@
+# email_outbox.py - Cola persistente de correos salientes
+#
+# Las rutas solo encolan el mensaje ya construido (en SQLite) y responden de
+# inmediato. Hilos remitentes dentro de cada worker vacían la cola con
+# reintentos y backoff exponencial, de modo que un handshake lento con Gmail
+# ya no bloquea el worker que atiende la petición.
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from email.utils import getaddresses
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    from_addr TEXT NOT NULL,
+    to_addrs TEXT NOT NULL,
+    subject TEXT,
+    raw_message BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_ready ON outbox (status, next_attempt_at);
+"""
+
+
+class EmailOutbox:
+    """Outbox durable con hilos remitentes, reintentos y métricas básicas"""
+
+    def __init__(self, db_path, send_func, workers=2, max_attempts=6,
+                 base_delay=5.0, max_delay=600.0, lease_seconds=120.0, poll_interval=1.0):
+        self.db_path = db_path
+        self.send_func = send_func
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._local = threading.local()
+        self._pid = None
+        self._threads = []
+        self._schema_ready = False
+
+        # Métricas del proceso actual (cada worker de gunicorn tiene las suyas)
+        self._latencies = deque(maxlen=500)
+        self._counters = {'enqueued': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+
+    # CONEXIÓN
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        if not self._schema_ready:
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    # API PÚBLICA
+    def enqueue(self, msg):
+        """Guardar un mensaje MIME en la cola; devuelve el id asignado"""
+        recipients = [addr for _, addr in getaddresses(
+            msg.get_all('To', []) + msg.get_all('Cc', []) + msg.get_all('Bcc', [])
+        ) if addr]
+        if not recipients:
+            raise ValueError("El mensaje no tiene destinatarios")
+        del msg['Bcc']
+
+        now = time.time()
+        conn = self._connect()
+        cursor = conn.execute(
+            "INSERT INTO outbox (from_addr, to_addrs, subject, raw_message, next_attempt_at, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (msg['From'], ','.join(recipients), msg['Subject'], msg.as_bytes(), now, now)
+        )
+        with self._lock:
+            self._counters['enqueued'] += 1
+        self.ensure_started()
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def ensure_started(self):
+        """Arrancar los hilos remitentes en este proceso (seguro tras un fork)"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._threads = []
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"email-outbox-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"Outbox de email iniciado con {self.workers} hilos (pid {pid})")
+
+    def stats(self):
+        """Profundidad de la cola, latencia de envío y conteo de fallos"""
+        conn = self._connect()
+        rows = dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        oldest = conn.execute(
+            "SELECT MIN(created_at) FROM outbox WHERE status IN ('pending', 'sending')"
+        ).fetchone()[0]
+
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = dict(self._counters)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 4)
+
+        return {
+            'queue_depth': rows.get('pending', 0) + rows.get('sending', 0),
+            'pending': rows.get('pending', 0),
+            'sending': rows.get('sending', 0),
+            'dead_letters': rows.get('failed', 0),
+            'oldest_pending_age_s': round(time.time() - oldest, 1) if oldest else 0,
+            'worker_pid': os.getpid(),
+            'worker_counters': counters,
+            'send_latency_s': {'p50': percentile(0.50), 'p95': percentile(0.95), 'max': percentile(1.0)},
+        }
+
+    # HILOS REMITENTES
+    def _claim(self):
+        """Tomar el siguiente mensaje listo (o con lease vencido) de forma atómica"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, from_addr, to_addrs, raw_message, attempts FROM outbox "
+                "WHERE (status = 'pending' AND next_attempt_at <= ?) "
+                "   OR (status = 'sending' AND lease_until < ?) "
+                "ORDER BY id LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE outbox SET status = 'sending', lease_until = ? WHERE id = ?",
+                    (now + self.lease_seconds, row[0])
+                )
+            conn.execute("COMMIT")
+            return row
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _run(self):
+        while True:
+            try:
+                row = self._claim()
+            except Exception as e:
+                logger.error(f"Error leyendo outbox de email: {e}")
+                row = None
+
+            if row is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self._deliver(*row)
+
+    def _deliver(self, message_id, from_addr, to_addrs, raw_message, attempts):
+        conn = self._connect()
+        started = time.perf_counter()
+        try:
+            self.send_func(from_addr, to_addrs.split(','), raw_message)
+        except Exception as e:
+            attempts += 1
+            if attempts >= self.max_attempts:
+                conn.execute(
+                    "UPDATE outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                    (attempts, str(e), message_id)
+                )
+                with self._lock:
+                    self._counters['failed'] += 1
+                logger.error(f"Email {message_id} descartado tras {attempts} intentos: {e}")
+            else:
+                delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+                delay *= random.uniform(0.8, 1.2)
+                conn.execute(
+                    "UPDATE outbox SET status = 'pending', attempts = ?, next_attempt_at = ?, "
+                    "last_error = ? WHERE id = ?",
+                    (attempts, time.time() + delay, str(e), message_id)
+                )
+                with self._lock:
+                    self._counters['retried'] += 1
+                logger.warning(f"Email {message_id} falló (intento {attempts}), reintento en {delay:.0f}s: {e}")
+            return
+
+        elapsed = time.perf_counter() - started
+        conn.execute("DELETE FROM outbox WHERE id = ?", (message_id,))
+        with self._lock:
+            self._counters['sent'] += 1
+            self._latencies.append(elapsed)
+        logger.info(f"Email {message_id} enviado a {to_addrs} en {elapsed:.2f}s")
@@ -0,0 +1,59 @@
+# email_templates.py - Registro de plantillas de email (Jinja)
+#
+# Todas las plantillas de templates/emails se compilan una sola vez al arrancar.
+# Los bloques compartidos sin datos del destinatario (encabezados, contacto,
+# pies) se pre-renderizan y se inyectan como HTML seguro, así cada envío solo
+# rellena los campos propios del destinatario. El autoescape protege contra
+# HTML inyectado en los formularios (nombre, mensaje, etc.).
+import logging
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup, escape
+
+logger = logging.getLogger(__name__)
+
+
+def nl2br(value):
+    """Escapar el texto y convertir saltos de línea en <br>"""
+    return Markup('<br>').join(escape(value).split('\n'))
+
+
+class EmailTemplateRegistry:
+    """Plantillas de email precompiladas con bloques estáticos pre-renderizados"""
+
+    def __init__(self, template_dir):
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(['html']),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False,
+        )
+        self.env.filters['nl2br'] = nl2br
+        self.bloques = {}
+        self.env.globals['bloques'] = self.bloques
+        self._templates = {}
+
+    def prerender(self, name, template, **context):
+        """Renderizar una vez un bloque compartido y guardarlo como HTML seguro"""
+        self.bloques[name] = Markup(self.env.get_template(template).render(**context))
+
+    def compile_all(self):
+        """Compilar todas las plantillas de envío (las que empiezan con _ son bases)"""
+        for filename in self.env.list_templates(extensions=['html']):
+            if filename.startswith(('_', 'bloques/')):
+                continue
+            self._templates[filename[:-len('.html')]] = self.env.get_template(filename)
+        logger.info(f"{len(self._templates)} plantillas de email compiladas")
+
+    def has(self, name):
+        return name in self._templates
+
+    def render(self, name, **context):
+        """Devolver (subject, html); subject sale del bloque 'subject' si existe"""
+        template = self._templates[name]
+        html = template.render(**context)
+        subject = None
+        if 'subject' in template.blocks:
+            subject = ''.join(template.blocks['subject'](template.new_context(context))).strip()
+        return subject, html
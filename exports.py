@@ -0,0 +1,228 @@
+# exports.py - Exportación en streaming (CSV / XLSX) de tablas de Supabase
+#
+# Las filas se leen página a página con la paginación por keyset de
+# DatabaseManager y se escriben a medida que llegan, así la memoria del worker
+# se mantiene plana sin importar cuántas filas tenga la tabla. El XLSX de las
+# exportaciones también se genera al vuelo (XML de la hoja comprimido en un zip
+# sin posicionamiento), sin pasar por un temporal: el primer byte sale con la
+# primera página de filas.
+import csv
+import io
+import math
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+# En un CSV, un texto que empieza por uno de estos caracteres se interpreta como
+# fórmula al abrirlo en Excel/LibreOffice (inyección CSV): los campos vienen de
+# formularios públicos, así que se anteponen con un apóstrofo. En XLSX el tipo
+# de cada celda es explícito y el valor se guarda tal cual ("+593 ..." sigue
+# siendo un teléfono); solo hay que evitar que openpyxl convierta en fórmula lo
+# que empieza por '='
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def iter_table_rows(db, table, columns, page_size=500):
+    """Recorrer toda la tabla (created_at, id descendente) página por página"""
+    cursor = None
+    while True:
+        rows, cursor = db.get_page(table, columns, cursor=cursor, limit=page_size)
+        yield from rows
+        if not cursor:
+            return
+
+
+def _neutralize(text):
+    return "'" + text if text.startswith(FORMULA_PREFIXES) else text
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(v) for v in value)
+    if isinstance(value, dict):
+        return str(value)
+    return value
+
+
+def _csv_cell(value):
+    value = _cell(value)
+    return _neutralize(value) if isinstance(value, str) else value
+
+
+def _xlsx_cell(sheet, value):
+    from openpyxl.cell import WriteOnlyCell
+
+    value = _cell(value)
+    if isinstance(value, str) and value.startswith('='):
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.data_type = 's'
+        return cell
+    return value
+
+
+def stream_csv(rows, columns):
+    """Generar el CSV por fragmentos (con BOM para que Excel detecte UTF-8)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    buffer.write('\ufeff')
+    writer.writerow([_csv_cell(column) for column in columns])
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_csv_cell(row.get(column)) for column in columns])
+        if count % 200 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def save_xlsx(rows, columns, path, headers=None, sheet_title='Datos'):
+    """Escribir un libro en modo write-only (memoria constante) en la ruta dada"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title[:31])
+    sheet.append([_xlsx_cell(sheet, header) for header in (headers or columns)])
+    for row in rows:
+        sheet.append([_xlsx_cell(sheet, row.get(column)) for column in columns])
+    workbook.save(path)
+
+
+# Caracteres de control que XML no admite (los mismos que rechaza openpyxl)
+ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{title}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+XLSX_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+class _ChunkSink:
+    """Destino sin posicionamiento para zipfile: guarda lo escrito hasta que se recoge"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_row_xml(number, letters, values):
+    """XML de una fila: números como números y el resto como texto en línea (nunca fórmulas)"""
+    cells = []
+    for letter, value in zip(letters, values):
+        value = _cell(value)
+        ref = f'{letter}{number}'
+        if isinstance(value, bool):
+            cells.append(f'<c r="{ref}" t="b"><v>{int(value)}</v></c>')
+        elif isinstance(value, (int, float)) and math.isfinite(value):
+            cells.append(f'<c r="{ref}"><v>{value!r}</v></c>')
+        elif value != '':
+            text = escape(ILLEGAL_XML_CHARS.sub('', str(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+def stream_xlsx(rows, columns, sheet_title='Datos', chunk_size=64 * 1024, flush_every=200):
+    """Generar el XLSX por fragmentos a medida que llegan las filas (sin temporal en disco)
+
+    zipfile escribe cada parte con descriptor de datos al no poder retroceder, así
+    que el tamaño de la hoja no hace falta de antemano. La memoria depende de
+    chunk_size y flush_every, no del número de filas.
+    """
+    sink = _ChunkSink()
+    letters = [_column_letter(i) for i in range(len(columns))]
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK.format(title=escape(sheet_title[:31], {'"': '&quot;'})))
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        archive.writestr('xl/styles.xml', XLSX_STYLES)
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            pending = [XLSX_SHEET_HEAD, _xlsx_row_xml(1, letters, columns)]
+            for number, row in enumerate(rows, 2):
+                pending.append(_xlsx_row_xml(number, letters, [row.get(column) for column in columns]))
+                if len(pending) >= flush_every:
+                    sheet.write(''.join(pending).encode())
+                    pending = []
+                    if sink.size >= chunk_size:
+                        yield sink.take()
+            pending.append(XLSX_SHEET_TAIL)
+            sheet.write(''.join(pending).encode())
+    yield sink.take()
@@ -1,12 +1,54 @@
 import multiprocessing
 import os
+import sys
 
 # Configuración básica de Gunicorn para Render
 bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}" # Render asigna dinámicamente el puerto mediante la variable de entorno PORT
-workers = multiprocessing.cpu_count() * 2 + 1  # Fórmula recomendada: (2 x núm_CPUs) + 1
-worker_class = "sync"  # Usa gevent para mejor rendimiento con aplicaciones Flask
-timeout = 120  # Aumentado para operaciones que pueden tomar más tiempo (como envío de WhatsApp)
-keepalive = 5  # Tiempo que un worker permanecerá inactivo esperando conexiones
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))  # Fórmula recomendada: (2 x núm_CPUs) + 1
+
+# Modelo de concurrencia (GUNICORN_WORKER_CLASS):
+#   gthread (por defecto): cada worker atiende `threads` peticiones a la vez; las
+#            esperas de Supabase/SMTP liberan el GIL y no bloquean a las demás
+#   gevent:  cada worker atiende hasta `worker_connections` peticiones como greenlets
+#            (requiere `pip install gevent`)
+#   sync:    una petición por worker, como antes
+# Comparación de throughput y p99: benchmarks/README.md
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class not in ('sync', 'gthread', 'gevent'):
+    raise ValueError(f"GUNICORN_WORKER_CLASS no soportado: {worker_class}")
+# Solo gthread: con threads > 1 gunicorn convierte silenciosamente "sync" en gthread
+threads = int(os.environ.get('GUNICORN_THREADS', '8')) if worker_class == 'gthread' else 1
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '200'))  # solo gevent
+
+if worker_class == 'gevent':
+    # Parchear socket/ssl/threading antes de importar la app (y sus clientes HTTP
+    # y SMTP); si se parchea después, las conexiones creadas antes quedan bloqueantes.
+    # aggressive=False conserva select.epoll mientras se importa httpcore (transporte de
+    # httpx/Supabase): importa trio si está instalado y trio necesita epoll al definir
+    # sus clases; el worker gevent vuelve a parchear en modo agresivo al arrancar
+    from gevent import monkey
+    monkey.patch_all(aggressive=False)
+    import httpcore  # noqa: F401,E402
+
+# Métricas Prometheus multiproceso (metrics.py): cada worker escribe en archivos
+# de este directorio y /metrics los agrega. Se vacía aquí, al cargar la
+# configuración en el master y antes de importar la app o lanzar workers
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(
+    os.environ.get('PROEDENT_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'var')),
+    'metrics'))
+from metrics import reset_multiproc_dir  # noqa: E402
+reset_multiproc_dir(os.environ['PROMETHEUS_MULTIPROC_DIR'])
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))  # Aumentado para operaciones que pueden tomar más tiempo (como envío de WhatsApp)
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))  # Tiempo que un worker permanecerá inactivo esperando conexiones
+
+# La app se importa una vez en el master y los workers la heredan al hacer fork:
+# arranque más rápido y memoria compartida (copy-on-write) para plantillas,
+# índice de productos y páginas precalentadas. Lo que no puede compartirse entre
+# procesos (cliente Supabase) se recrea en post_fork.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+wsgi_app = "app2:create_app()"
 
 # Configuración de logging
 loglevel = "info"
@@ -15,5 +57,50 @@ errorlog = "-"   # Envía logs de error a stderr (Render captura estos logs)
 
 # Gunicorn reiniciará los workers que excedan este límite de memoria (en bytes)
 # 250 MB es un buen punto de partida
-max_requests = 1000
-max_requests_jitter = 50  # Añade variación aleatoria para evitar que todos los workers se reinicien al mismo tiempo
\ No newline at end of file
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '50'))  # Añade variación aleatoria para evitar que todos los workers se reinicien al mismo tiempo
+
+
+def when_ready(server):
+    # Con preload_app: precalentar en el master para que los workers hereden las páginas
+    app2 = sys.modules.get('app2')
+    if app2 is not None and app2.PAGE_CACHE_WARMUP:
+        app2.page_cache.warmup()
+
+
+def post_fork(server, worker):
+    # Con preload_app el worker hereda el cliente Supabase del master: crear uno propio.
+    # Sin preload la app aún no se ha importado y cada worker la importa por su cuenta.
+    app2 = sys.modules.get('app2')
+    if app2 is not None:
+        app2.init_worker()
+
+
+def worker_exit(server, worker):
+    # En el worker que termina: distinguir el reciclado por max_requests del resto
+    app2 = sys.modules.get('app2')
+    if app2 is not None:
+        app2.metrics.worker_exit('max_requests' if worker.nr >= worker.max_requests else 'shutdown')
+        # Reenviar a Supabase los leads del spool antes de salir (lo que quede lo
+        # reenvían los demás workers o el siguiente arranque)
+        if app2.LEAD_SPOOL_ENABLED:
+            pending = app2.lead_spool.drain(app2.LEAD_SPOOL_DRAIN_SECONDS)
+            if pending:
+                server.log.warning(f"Worker {worker.pid} sale con {pending} leads en el spool")
+
+
+def child_exit(server, worker):
+    # En el master: retirar de /metrics los gauges del worker que ya no existe
+    from metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # Pre-renderizar las páginas cacheadas antes de que el worker reciba tráfico
+    # (solo las que no se hayan heredado ya vigentes del master)
+    from app2 import page_cache, PAGE_CACHE_WARMUP, lead_spool, LEAD_SPOOL_ENABLED
+    if PAGE_CACHE_WARMUP:
+        page_cache.warmup()
+    # Reenviar desde el arranque los leads que quedaron en el spool (caída, despliegue)
+    if LEAD_SPOOL_ENABLED:
+        lead_spool.ensure_started()
@@ -0,0 +1,136 @@
+# insert_batcher.py - Inserciones concurrentes agrupadas en un solo insert([...])
+#
+# Group commit: la primera petición que llega abre un lote y espera hasta
+# max_wait a que se sumen otras de la misma tabla (y mismas columnas); el lote
+# se envía al llenarse (max_rows) o al vencer la espera, con una sola llamada a
+# insert_many(table, rows). Cada petición recibe su fila creada, o la excepción
+# del lote, solo después de que el insert masivo se haya confirmado: nadie
+# responde "guardado" antes de que lo esté. Si Supabase rechaza el lote por el
+# contenido de alguna fila (is_permanent), las filas se reenvían una a una y
+# solo falla la petición culpable: agrupar no amplía el fallo de una fila a
+# todas las demás. No usa hilos propios (la petición que abre el lote es la que
+# lo envía), así que no hay nada que recrear tras el fork de gunicorn.
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    __slots__ = ('rows', 'created', 'error', 'row_errors', 'closed', 'done')
+
+    def __init__(self):
+        self.rows = []
+        self.created = None
+        self.error = None
+        self.row_errors = {}
+        self.closed = False
+        self.done = threading.Event()
+
+
+class InsertBatcher:
+    """Lotes por (tabla, columnas) enviados cada max_rows filas o max_wait segundos"""
+
+    def __init__(self, insert_many, max_rows=50, max_wait=0.02, timeout=30.0, is_permanent=None):
+        self.insert_many = insert_many
+        self.max_rows = max(int(max_rows), 1)
+        self.max_wait = max(float(max_wait), 0.0)
+        self.timeout = timeout
+        self.is_permanent = is_permanent or (lambda exc: False)
+        self._open = {}
+        self._cond = threading.Condition()
+        self._counters = {'rows': 0, 'batches': 0, 'full': 0, 'timer': 0, 'failed_batches': 0,
+                          'split_batches': 0, 'failed_rows': 0, 'max_batch': 0}
+
+    def submit(self, table, row):
+        """Insertar row en el próximo lote; devuelve la fila creada o lanza el error del lote"""
+        # Un insert masivo de PostgREST usa las columnas de todas las filas: solo se
+        # agrupan filas con las mismas claves para no rellenar columnas con NULL
+        key = (table, tuple(sorted(row)))
+        with self._cond:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch()
+            index = len(batch.rows)
+            batch.rows.append(row)
+            if len(batch.rows) >= self.max_rows:
+                self._close(key, batch, 'full')
+                self._cond.notify_all()
+
+        if leader:
+            self._lead(key, batch)
+        elif not batch.done.wait(self.timeout):
+            raise TimeoutError(f"El lote de {table} no se confirmó en {self.timeout}s")
+
+        error = batch.row_errors.get(index, batch.error)
+        if error is not None:
+            raise error
+        return batch.created[index] if index < len(batch.created) else None
+
+    def _close(self, key, batch, reason):
+        batch.closed = True
+        if self._open.get(key) is batch:
+            del self._open[key]
+        self._counters[reason] += 1
+
+    def _lead(self, key, batch):
+        """La petición que abrió el lote espera a que se llene o venza max_wait y lo envía"""
+        deadline = time.monotonic() + self.max_wait
+        with self._cond:
+            while not batch.closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._close(key, batch, 'timer')
+                    break
+                self._cond.wait(remaining)
+
+        table = key[0]
+        try:
+            batch.created = list(self.insert_many(table, batch.rows))
+        except Exception as e:
+            logger.error(f"Error insertando lote de {len(batch.rows)} filas en {table}: {e}")
+            if len(batch.rows) > 1 and self.is_permanent(e):
+                self._split(table, batch)
+            else:
+                batch.error = e
+        finally:
+            with self._cond:
+                self._counters['batches'] += 1
+                self._counters['rows'] += len(batch.rows)
+                self._counters['max_batch'] = max(self._counters['max_batch'], len(batch.rows))
+                if batch.row_errors:
+                    self._counters['split_batches'] += 1
+                if batch.error is not None:
+                    self._counters['failed_batches'] += 1
+                    self._counters['failed_rows'] += len(batch.rows)
+                else:
+                    self._counters['failed_rows'] += len(batch.row_errors)
+            batch.done.set()
+
+    def _split(self, table, batch):
+        """Alguna fila fue rechazada: insertarlas una a una para que solo falle la culpable"""
+        batch.created = [None] * len(batch.rows)
+        for index, row in enumerate(batch.rows):
+            try:
+                created = self.insert_many(table, [row])
+            except Exception as e:
+                if self.is_permanent(e):
+                    logger.error(f"Fila rechazada en {table}: {e}")
+                    batch.row_errors[index] = e
+                    continue
+                # Error transitorio: no insistir con el resto durante la caída
+                for pending in range(index, len(batch.rows)):
+                    batch.row_errors[pending] = e
+                return
+            batch.created[index] = created[0] if created else None
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._counters)
+            stats['open_batches'] = len(self._open)
+        stats['avg_batch'] = round(stats['rows'] / stats['batches'], 2) if stats['batches'] else 0.0
+        stats['max_rows'] = self.max_rows
+        stats['max_wait_ms'] = self.max_wait * 1000
+        return stats
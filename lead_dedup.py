@@ -0,0 +1,190 @@
+# lead_dedup.py - Supresión de envíos repetidos de los formularios de captación
+#
+# Un doble clic en "Enviar" o el mismo visitante que vuelve por retargeting
+# generaban cada vez un insert en Supabase y dos emails. Antes de cualquier E/S
+# remota se reclama la clave (formulario, email normalizado) durante `window`
+# segundos: si ya estaba reclamada el envío es un duplicado y la ruta responde
+# como siempre (redirección a /thankyou) sin guardar ni enviar nada.
+#
+# Dos niveles: un dict en memoria por worker con las reclamaciones hechas por
+# ese proceso, que resuelve sin tocar disco sus propios duplicados (solo él
+# puede liberarlas, así que nunca quedan obsoletas), y un SQLite local
+# compartido por todos los workers (DATA_DIR/lead_dedup.db), donde la
+# reclamación es un único upsert atómico. El almacén no hace fsync (synchronous=NORMAL): perder la última
+# reclamación en una caída solo deja pasar un duplicado. Los duplicados
+# suprimidos se cuentan por formulario en el mismo almacén (totales de todos
+# los workers) para /admin/lead_capture_stats.
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS claims (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_claims_expires ON claims (expires_at);
+CREATE TABLE IF NOT EXISTS suppressed (
+    form TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class LeadDeduplicator:
+    """Reclamaciones (formulario, email) con caducidad, en memoria y en un SQLite compartido"""
+
+    def __init__(self, db_path, window=86400, max_memory_entries=10000, prune_every=500, on_suppressed=None):
+        self.db_path = db_path
+        self.window = window
+        self.max_memory_entries = max_memory_entries
+        self.prune_every = prune_every
+        self.on_suppressed = on_suppressed
+
+        self._memory = {}  # clave -> expires_at
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._schema_ready = False
+        self._claims_since_prune = 0
+        self._counters = {'checked': 0, 'claimed': 0, 'suppressed_memory': 0, 'suppressed_store': 0,
+                          'released': 0, 'store_errors': 0}
+
+    # CONEXIÓN
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        if not self._schema_ready:
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    @staticmethod
+    def make_key(form, email):
+        """Clave estable sin guardar el email en claro"""
+        normalized = f"{form}:{(email or '').strip().lower()}"
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    # API PÚBLICA
+    def claim(self, form, email):
+        """Reclamar (form, email): devuelve la clave, o None si es un duplicado dentro de la ventana
+
+        Si el almacén local no responde se deja pasar el envío (mejor un duplicado
+        que perder un lead).
+        """
+        key = self.make_key(form, email)
+        now = time.time()
+        self._count('checked')
+
+        with self._lock:
+            expires_at = self._memory.get(key)
+        if expires_at is not None and expires_at > now:
+            self._suppress(form, 'suppressed_memory')
+            return None
+
+        try:
+            conn = self._connect()
+            cursor = conn.execute(
+                "INSERT INTO claims (key, expires_at) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET expires_at = excluded.expires_at WHERE claims.expires_at <= ?",
+                (key, now + self.window, now)
+            )
+            claimed = cursor.rowcount > 0
+        except Exception as e:
+            self._count('store_errors')
+            logger.error(f"Error en el almacén de duplicados de leads: {e}")
+            return key
+
+        if not claimed:
+            # Reclamación de otro worker: no se cachea, porque si ese worker la
+            # libera solo borra su memoria y el almacén
+            self._suppress(form, 'suppressed_store')
+            return None
+        self._remember(key, now + self.window, now)
+        self._count('claimed')
+        self._maybe_prune(now)
+        return key
+
+    def release(self, key):
+        """Liberar una reclamación cuyo envío falló, para que el visitante pueda reintentar"""
+        if key is None:
+            return
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            self._connect().execute("DELETE FROM claims WHERE key = ?", (key,))
+        except Exception as e:
+            logger.error(f"Error liberando clave de duplicados de leads: {e}")
+        self._count('released')
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters['memory_entries'] = len(self._memory)
+        try:
+            conn = self._connect()
+            suppressed = dict(conn.execute("SELECT form, count FROM suppressed").fetchall())
+            active = conn.execute("SELECT COUNT(*) FROM claims WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error leyendo el almacén de duplicados de leads: {e}")
+            suppressed, active = {}, None
+        total = sum(suppressed.values())
+        return {
+            'window_seconds': self.window,
+            'active_claims': active,
+            'suppressed_by_form': suppressed,
+            'suppressed_total': total,
+            # Cada duplicado suprimido evita un insert en Supabase y dos emails (confirmación y aviso)
+            'saved': {'supabase_inserts': total, 'emails': total * 2},
+            'worker_pid': os.getpid(),
+            'worker_counters': counters,
+        }
+
+    # INTERNOS
+    def _suppress(self, form, counter):
+        self._count(counter)
+        try:
+            self._connect().execute(
+                "INSERT INTO suppressed (form, count) VALUES (?, 1) "
+                "ON CONFLICT (form) DO UPDATE SET count = count + 1",
+                (form,)
+            )
+        except Exception as e:
+            logger.error(f"Error contando duplicado de leads: {e}")
+        if self.on_suppressed is not None:
+            self.on_suppressed(form)
+
+    def _remember(self, key, expires_at, now):
+        with self._lock:
+            if len(self._memory) >= self.max_memory_entries:
+                self._memory = {k: v for k, v in self._memory.items() if v > now}
+                if len(self._memory) >= self.max_memory_entries:
+                    self._memory.clear()
+            self._memory[key] = expires_at
+
+    def _maybe_prune(self, now):
+        with self._lock:
+            self._claims_since_prune += 1
+            if self._claims_since_prune < self.prune_every:
+                return
+            self._claims_since_prune = 0
+        try:
+            self._connect().execute("DELETE FROM claims WHERE expires_at <= ?", (now,))
+        except Exception as e:
+            logger.error(f"Error purgando el almacén de duplicados de leads: {e}")
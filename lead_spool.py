@@ -0,0 +1,284 @@
+# lead_spool.py - Spool local (write-ahead) de leads con reenvío ordenado a Supabase
+#
+# Los formularios de captación guardan la fila en un SQLite local en modo WAL con
+# synchronous=FULL (cada commit hace fsync) y responden: la latencia del
+# formulario ya no depende de Supabase. Un hilo reenviador en cada worker vacía
+# el spool en orden de llegada: cada lote parte de la fila más antigua y suma las
+# siguientes de la misma tabla y columnas, con una sola inserción por lote. Cada fila lleva una clave de idempotencia
+# generada al encolar: si un lote se insertó pero el worker murió antes de
+# borrarlo del spool, el reintento no duplica filas (upsert que ignora claves
+# repetidas, ver sql/lead_idempotency_keys.sql).
+#
+# Solo hay un lote en vuelo a la vez entre todos los workers (lease en el propio
+# spool), así el orden se mantiene. Los errores transitorios (red, timeouts, 5xx)
+# se reintentan sin límite con backoff acotado: durante una caída de Supabase
+# los leads esperan en el spool, no se descartan. Solo un error permanente
+# (is_permanent: la fila rechazada por su contenido, o que falte la columna de
+# idempotencia) la descarta: si el lote tenía varias filas se reenvían una a
+# una para aislar la culpable, que pasa a 'failed' sin bloquear a las demás.
+# requeue_failed() las devuelve a la cola.
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    columns TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_spool_status ON spool (status, id);
+CREATE INDEX IF NOT EXISTS idx_spool_shape ON spool (table_name, columns, id);
+"""
+
+
+class LeadSpool:
+    """Spool durable de filas pendientes de insertar en Supabase"""
+
+    def __init__(self, db_path, insert_many, key_column='idempotency_key', batch_size=50, is_permanent=None,
+                 base_delay=2.0, max_delay=60.0, lease_seconds=60.0, poll_interval=1.0):
+        self.db_path = db_path
+        self.insert_many = insert_many
+        self.key_column = key_column
+        self.batch_size = batch_size
+        self.is_permanent = is_permanent or (lambda exc: False)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._local = threading.local()
+        self._pid = None
+        self._schema_ready = False
+        self._counters = {'spooled': 0, 'replayed': 0, 'batches': 0, 'retried': 0, 'failed': 0}
+
+    # CONEXIÓN
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        if not self._schema_ready:
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def _count(self, counter, n=1):
+        with self._lock:
+            self._counters[counter] += n
+
+    # API PÚBLICA
+    def append(self, table, row):
+        """Guardar la fila de forma durable (fsync); devuelve su clave de idempotencia"""
+        key = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO spool (table_name, columns, payload, idempotency_key, next_attempt_at, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (table, ','.join(sorted(row)), json.dumps(row, ensure_ascii=False), key, now, now)
+        )
+        self._count('spooled')
+        self.ensure_started()
+        self._wakeup.set()
+        return key
+
+    def ensure_started(self):
+        """Arrancar el hilo reenviador en este proceso (seguro tras un fork)"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            threading.Thread(target=self._run, name="lead-spool", daemon=True).start()
+        logger.info(f"Reenvío del spool de leads iniciado (pid {pid})")
+
+    def drain(self, timeout=5.0):
+        """Reenviar lo pendiente desde el hilo actual durante hasta `timeout` segundos
+
+        Para el cierre ordenado del worker; devuelve cuántas filas quedaron en el spool.
+        Si otro worker tiene un lote en vuelo se espera a que termine; si la cabeza
+        está en backoff (Supabase falla) se sale sin esperar.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                batch = self._claim()
+                if batch is None and not self._in_flight():
+                    break
+            except Exception as e:
+                logger.error(f"Error leyendo el spool de leads: {e}")
+                break
+            if batch is None:
+                time.sleep(0.05)
+                continue
+            self._replay(*batch)
+        return self.stats()['pending']
+
+    def requeue_failed(self):
+        """Devolver a la cola las filas descartadas (p. ej. tras corregir el esquema)"""
+        cursor = self._connect().execute(
+            "UPDATE spool SET status = 'pending', attempts = 0, next_attempt_at = ? WHERE status = 'failed'",
+            (time.time(),)
+        )
+        self._wakeup.set()
+        return cursor.rowcount
+
+    def stats(self):
+        conn = self._connect()
+        rows = dict(conn.execute("SELECT status, COUNT(*) FROM spool GROUP BY status").fetchall())
+        oldest = conn.execute(
+            "SELECT MIN(created_at) FROM spool WHERE status IN ('pending', 'sending')"
+        ).fetchone()[0]
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            'pending': rows.get('pending', 0) + rows.get('sending', 0),
+            'dead_letters': rows.get('failed', 0),
+            'oldest_pending_age_s': round(time.time() - oldest, 1) if oldest else 0,
+            'worker_pid': os.getpid(),
+            'worker_counters': counters,
+        }
+
+    # REENVÍO
+    def _in_flight(self):
+        return self._connect().execute(
+            "SELECT 1 FROM spool WHERE status = 'sending' AND lease_until >= ? LIMIT 1", (time.time(),)
+        ).fetchone() is not None
+
+    def _claim(self):
+        """Tomar el siguiente lote en orden, si no hay otro en vuelo y la cabeza está lista"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            in_flight = conn.execute(
+                "SELECT 1 FROM spool WHERE status = 'sending' AND lease_until >= ? LIMIT 1", (now,)
+            ).fetchone()
+            head = None if in_flight else conn.execute(
+                "SELECT id, table_name, columns, attempts, next_attempt_at FROM spool "
+                "WHERE status IN ('pending', 'sending') ORDER BY id LIMIT 1"
+            ).fetchone()
+            if head is None or head[4] > now:
+                conn.execute("COMMIT")
+                return None
+
+            head_id, table, columns, _, _ = head
+            batch = conn.execute(
+                "SELECT id, payload, idempotency_key, attempts FROM spool "
+                "WHERE status IN ('pending', 'sending') AND id >= ? AND table_name = ? AND columns = ? "
+                "ORDER BY id LIMIT ?",
+                (head_id, table, columns, self.batch_size)
+            ).fetchall()
+            ids = [entry[0] for entry in batch]
+            conn.execute(
+                f"UPDATE spool SET status = 'sending', lease_until = ? WHERE id IN ({','.join('?' * len(ids))})",
+                (now + self.lease_seconds, *ids)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return table, batch
+
+    def _replay(self, table, batch):
+        """Enviar un lote reclamado; si Supabase rechaza alguna fila, reenviarlas una a una"""
+        rows = []
+        for _, payload, key, _ in batch:
+            row = json.loads(payload)
+            if self.key_column:
+                row[self.key_column] = key
+            rows.append(row)
+
+        try:
+            self.insert_many(table, rows)
+        except Exception as e:
+            if not self.is_permanent(e):
+                self._retry_later(batch, e)
+                return False
+            if len(batch) == 1:
+                self._dead_letter(batch[0], e)
+                return False
+            # Alguna fila del lote es inválida: aislarla sin soltar el lease
+            for i, (entry, row) in enumerate(zip(batch, rows)):
+                try:
+                    self.insert_many(table, [row])
+                except Exception as row_error:
+                    if self.is_permanent(row_error):
+                        self._dead_letter(entry, row_error)
+                        continue
+                    self._retry_later(batch[i:], row_error)
+                    return False
+                self._delete([entry])
+            return True
+
+        self._delete(batch)
+        self._count('batches')
+        return True
+
+    def _delete(self, batch):
+        ids = [entry[0] for entry in batch]
+        self._connect().execute(f"DELETE FROM spool WHERE id IN ({','.join('?' * len(ids))})", ids)
+        self._count('replayed', len(ids))
+
+    def _retry_later(self, batch, error):
+        """Error transitorio: reintentar sin límite con backoff exponencial acotado a max_delay"""
+        ids = [entry[0] for entry in batch]
+        attempts = max(entry[3] for entry in batch) + 1
+        delay = min(self.max_delay, self.base_delay * 2 ** min(attempts - 1, 16)) * random.uniform(0.8, 1.2)
+        self._connect().execute(
+            f"UPDATE spool SET status = 'pending', attempts = attempts + 1, next_attempt_at = ?, "
+            f"last_error = ? WHERE id IN ({','.join('?' * len(ids))})",
+            (time.time() + delay, str(error), *ids)
+        )
+        self._count('retried')
+        logger.warning(f"Lote de {len(batch)} leads del spool falló (intento {attempts}), "
+                       f"reintento en {delay:.0f}s: {error}")
+
+    def _dead_letter(self, entry, error):
+        """Supabase rechazó la fila por su contenido: apartarla (requeue_failed la recupera)"""
+        self._connect().execute(
+            "UPDATE spool SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+            (str(error), entry[0])
+        )
+        self._count('failed')
+        logger.error(f"Lead {entry[0]} del spool rechazado por Supabase, apartado: {error}")
+
+    def _run(self):
+        while True:
+            try:
+                batch = self._claim()
+            except Exception as e:
+                logger.error(f"Error leyendo el spool de leads: {e}")
+                batch = None
+
+            if batch is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self._replay(*batch)
@@ -0,0 +1,38 @@
+# manifest_loader.py - Lectura de los manifest.json generados en el build
+#
+# Lo comparten responsive_images.py (variantes de imágenes) y static_assets.py
+# (assets con huella): el manifest se carga al primer uso y se recarga si el
+# archivo cambia, revisando su mtime como mucho cada check_interval segundos.
+import json
+import os
+import threading
+import time
+
+
+class JsonManifest:
+    """Manifest JSON clave -> entrada, recargado si el archivo cambia"""
+
+    def __init__(self, path, check_interval=10.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._data = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        if now - self._checked_at > self.check_interval:
+            with self._lock:
+                self._checked_at = now
+                try:
+                    mtime = os.stat(self.path).st_mtime_ns
+                except FileNotFoundError:
+                    mtime = None
+                if mtime != self._mtime:
+                    self._mtime = mtime
+                    self._data = {}
+                    if mtime is not None:
+                        with open(self.path) as f:
+                            self._data = json.load(f)
+        return self._data.get(key)
@@ -0,0 +1,133 @@
+# metrics.py - Métricas Prometheus agregadas entre todos los workers de gunicorn
+#
+# Con varios workers cada proceso solo ve su parte del tráfico. En modo
+# multiproceso de prometheus_client cada worker escribe sus contadores e
+# histogramas en archivos mmap de PROMETHEUS_MULTIPROC_DIR y /metrics los suma
+# al responder, sea cual sea el worker que atienda la petición. gunicorn_config.py
+# define el directorio, lo vacía al arrancar el master y da de baja los gauges
+# de los workers que terminan (child_exit). Sin esa variable (flask run, scripts)
+# las métricas son las del proceso.
+#
+# Latencias: RequestTimer (request_timing.py) notifica cada petición y cada
+# llamada a dependencia a Metrics, que las vuelca en histogramas Prometheus.
+import glob
+import logging
+import os
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # opcional: sin el paquete /metrics responde 404
+    prometheus_client = None
+
+from request_timing import BUCKETS_MS
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+LATENCY_BUCKETS = tuple(ms / 1000 for ms in BUCKETS_MS) + (float('inf'),)
+
+
+def reset_multiproc_dir(path):
+    """Vaciar el directorio multiproceso (solo en el master, antes de lanzar workers)"""
+    os.makedirs(path, exist_ok=True)
+    for db_file in glob.glob(os.path.join(path, '*.db')):
+        os.remove(db_file)
+
+
+def mark_worker_dead(pid):
+    """Descartar los gauges 'live' de un worker que terminó (hook child_exit)"""
+    if prometheus_client is not None and os.environ.get(MULTIPROC_ENV):
+        multiprocess.mark_process_dead(pid)
+
+
+class Metrics:
+    """Contadores e histogramas de la app, expuestos en formato de texto Prometheus"""
+
+    def __init__(self, app=None, enabled=True):
+        self.enabled = enabled and prometheus_client is not None
+        self.multiprocess = bool(os.environ.get(MULTIPROC_ENV))
+        if enabled and prometheus_client is None:
+            logger.warning("prometheus_client no está instalado: /metrics desactivado")
+        if not self.enabled:
+            return
+
+        # Registro propio: en modo multiproceso no se expone (se agrega desde los
+        # archivos), pero evita duplicados en el REGISTRY global si se reimporta
+        self._registry = prometheus_client.CollectorRegistry()
+        Counter, Gauge, Histogram = prometheus_client.Counter, prometheus_client.Gauge, prometheus_client.Histogram
+        self.requests = Counter('http_requests_total', "Peticiones HTTP atendidas",
+                                ['method', 'route', 'status'], registry=self._registry)
+        self.request_latency = Histogram('http_request_duration_seconds', "Tiempo total por petición",
+                                         ['method', 'route'], buckets=LATENCY_BUCKETS, registry=self._registry)
+        self.in_progress = Gauge('http_requests_in_progress', "Peticiones en curso en todos los workers",
+                                 multiprocess_mode='livesum', registry=self._registry)
+        self.dependency_latency = Histogram('dependency_duration_seconds',
+                                            "Tiempo por llamada a dependencia (db.*, email.*, smtp.*, tpl.*)",
+                                            ['dependency'], buckets=LATENCY_BUCKETS, registry=self._registry)
+        self.leads = Counter('leads_created_total', "Leads guardados por tipo de lead magnet",
+                             ['magnet_type'], registry=self._registry)
+        self.lead_duplicates = Counter('lead_duplicates_suppressed_total',
+                                       "Envíos repetidos de formularios suprimidos antes de guardar",
+                                       ['form'], registry=self._registry)
+        self.email_deliveries = Counter('email_deliveries_total', "Entregas SMTP por resultado",
+                                        ['result'], registry=self._registry)
+        self.supabase_errors = Counter('supabase_errors_total',
+                                       "Errores de Supabase (código HTTP o tipo de excepción)",
+                                       ['kind'], registry=self._registry)
+        self.worker_exits = Counter('gunicorn_worker_exits_total',
+                                    "Salidas de workers (max_requests = reciclado)",
+                                    ['reason'], registry=self._registry)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not self.enabled:
+            return
+        app.before_request(self._request_started)
+        app.teardown_request(self._request_finished)
+
+    def _request_started(self):
+        self.in_progress.inc()
+
+    def _request_finished(self, exc):
+        self.in_progress.dec()
+
+    # OBSERVADOR DE RequestTimer
+    def observe_request(self, method, route, status, ms):
+        self.requests.labels(method, route, str(status)).inc()
+        self.request_latency.labels(method, route).observe(ms / 1000)
+
+    def observe_dependency(self, name, ms):
+        self.dependency_latency.labels(name).observe(ms / 1000)
+
+    # EVENTOS DE NEGOCIO
+    def lead_created(self, magnet_type):
+        if self.enabled:
+            self.leads.labels(magnet_type or 'desconocido').inc()
+
+    def lead_duplicate_suppressed(self, form):
+        if self.enabled:
+            self.lead_duplicates.labels(form).inc()
+
+    def email_delivered(self, ok):
+        if self.enabled:
+            self.email_deliveries.labels('ok' if ok else 'error').inc()
+
+    def supabase_error(self, kind):
+        if self.enabled:
+            self.supabase_errors.labels(kind).inc()
+
+    def worker_exit(self, reason):
+        if self.enabled:
+            self.worker_exits.labels(reason).inc()
+
+    # EXPOSICIÓN
+    def render(self):
+        """(cuerpo, content-type) con las métricas de todos los workers"""
+        if self.multiprocess:
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = self._registry
+        return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
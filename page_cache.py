@@ -0,0 +1,194 @@
+# page_cache.py - Caché de respuestas completas para páginas que no dependen de la petición
+#
+# Las landing pages y los catálogos por marca renderizan siempre el mismo HTML.
+# La primera petición (o el warmup al arrancar el worker) guarda el cuerpo ya
+# renderizado junto a sus variantes gzip/brotli y un ETag fuerte por codificación
+# (cada variante es otra representación); las siguientes
+# sirven esos bytes tal cual, o 304 si el navegador ya los tiene. La versión de
+# cada entrada es el mtime de la plantilla, de las que extiende/incluye y de los
+# manifests de assets, así un deploy o un build de assets invalida solo.
+import functools
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from jinja2 import meta
+
+from static_assets import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se guarda la variante gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class _Page:
+    __slots__ = ('version', 'etag', 'bodies', 'mimetype')
+
+    def __init__(self, version, etag, bodies, mimetype):
+        self.version = version
+        self.etag = etag
+        self.bodies = bodies
+        self.mimetype = mimetype
+
+
+class PageCache:
+    """Cuerpos renderizados y comprimidos por endpoint, versionados por mtime"""
+
+    def __init__(self, app, extra_files=(), check_interval=2.0, enabled=True):
+        self.app = app
+        self.extra_files = tuple(extra_files)
+        self.check_interval = check_interval
+        self.enabled = enabled
+        self._templates = {}
+        self._dependencies = {}
+        self._pages = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'not_modified': 0, 'renders': 0, 'bypass': 0}
+
+    # VERSIONADO
+    def _template_files(self, template_name):
+        """Rutas de la plantilla y de todas las que extiende, incluye o importa"""
+        if template_name not in self._dependencies:
+            env = self.app.jinja_env
+            pending, seen, files = [template_name], set(), []
+            while pending:
+                name = pending.pop()
+                if name in seen:
+                    continue
+                seen.add(name)
+                source, filename, _ = env.loader.get_source(env, name)
+                files.append(filename)
+                pending.extend(n for n in meta.find_referenced_templates(env.parse(source)) if n)
+            self._dependencies[template_name] = tuple(files)
+        return self._dependencies[template_name] + self.extra_files
+
+    def _version(self, endpoint):
+        now = time.monotonic()
+        checked_at, version = self._versions.get(endpoint, (0.0, None))
+        if version is None or now - checked_at > self.check_interval:
+            mtimes = []
+            for path in self._template_files(self._templates[endpoint]):
+                try:
+                    mtimes.append(os.stat(path).st_mtime_ns)
+                except FileNotFoundError:
+                    mtimes.append(0)
+            version = tuple(mtimes)
+            self._versions[endpoint] = (now, version)
+        return version
+
+    # ALMACENAMIENTO
+    def _store(self, endpoint, version, response):
+        body = response.get_data()
+        bodies = {None: body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            bodies['br'] = brotli.compress(body, quality=11)
+        page = _Page(version, hashlib.sha256(body).hexdigest()[:32], bodies, response.mimetype)
+        with self._lock:
+            self._pages[endpoint] = page
+            self._counters['renders'] += 1
+        return page
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _respond(self, page):
+        from flask import request
+
+        # Elegir la codificación antes de validar: el ETag identifica el cuerpo exacto
+        accepted = accepted_encodings(request)
+        encoding = next((e for e in ('br', 'gzip') if e in accepted and e in page.bodies), None)
+        etag = f"{page.etag}-{encoding}" if encoding else page.etag
+
+        response = self.app.response_class(status=200, mimetype=page.mimetype)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Accept-Encoding')
+        if request.if_none_match.contains(etag):
+            self._count('not_modified')
+            response.status_code = 304
+            return response
+
+        self._count('hits')
+        response.set_data(page.bodies[encoding])
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    # API PÚBLICA
+    def cached(self, template_name):
+        """Decorador de vistas GET cuyo HTML solo depende de `template_name`"""
+
+        def decorator(view_func):
+            self._templates[view_func.__name__] = template_name
+
+            @functools.wraps(view_func)
+            def wrapper(*args, **kwargs):
+                from flask import request, session
+
+                # Los mensajes flash se pintan en layout.html: esa respuesta no es cacheable
+                if not self.enabled or request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+                    self._count('bypass')
+                    return view_func(*args, **kwargs)
+
+                endpoint = request.endpoint
+                version = self._version(endpoint)
+                page = self._pages.get(endpoint)
+                if page is None or page.version != version:
+                    response = self.app.make_response(view_func(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    page = self._store(endpoint, version, response)
+                return self._respond(page)
+
+            return wrapper
+
+        return decorator
+
+    def warmup(self):
+        """Renderizar de antemano las páginas registradas que no estén ya vigentes
+
+        Con preload_app se llama en el master y los workers heredan las páginas al
+        hacer fork; en cada worker solo se renderiza lo que falte.
+        """
+        if not self.enabled:
+            return 0
+        started = time.perf_counter()
+        warmed = 0
+        with self.app.app_context():
+            adapter = self.app.url_map.bind('localhost')
+            for endpoint in self._templates:
+                try:
+                    path = adapter.build(endpoint)
+                    with self.app.test_request_context(path):
+                        version = self._version(endpoint)
+                        page = self._pages.get(endpoint)
+                        if page is not None and page.version == version:
+                            continue
+                        view = self.app.view_functions[endpoint].__wrapped__
+                        self._store(endpoint, version, self.app.make_response(view()))
+                    warmed += 1
+                except Exception as e:
+                    logger.warning(f"No se pudo precalentar {endpoint}: {e}")
+        logger.info(f"Caché de páginas: {warmed} páginas en {time.perf_counter() - started:.2f}s")
+        return warmed
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+            self._versions.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pages': len(self._pages),
+                'bytes': sum(len(b) for page in self._pages.values() for b in page.bodies.values()),
+                **self._counters,
+            }
@@ -0,0 +1,178 @@
+# product_index.py - Índice en memoria de productos para búsqueda y filtros del catálogo
+#
+# Se construye a partir de DatabaseManager.get_all_products(): mapas invertidos
+# por categoría y por marca, y un índice de tokens (sin acentos ni mayúsculas)
+# sobre nombre, marca, categoría, descripción y especificaciones. Cuando la caché de lecturas
+# devuelve una lista nueva, refresh() compara la huella de cada producto y solo
+# reindexa los que se agregaron, cambiaron o desaparecieron.
+import bisect
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+
+TEXT_FIELDS = ('name', 'brand', 'category', 'description', 'specifications')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def fold(text):
+    """Minúsculas y sin acentos: 'Tomografía' -> 'tomografia'"""
+    decomposed = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(fold(text))
+
+
+def _fingerprint(product):
+    payload = json.dumps(product, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ProductIndex:
+    """Mapas invertidos categoría/marca/token -> ids de producto"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source = None
+        self._products = {}
+        self._fingerprints = {}
+        self._postings = {}
+        self._keys = {}
+        self._position = {}
+        self._order = []
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+        self._facets = {'category': {}, 'brand': {}}
+        self._labels = {'category': {}, 'brand': {}}
+        self.rebuilds = 0
+        self.reindexed = 0
+
+    @staticmethod
+    def _product_id(product):
+        return product.get('id', product.get('name'))
+
+    # CONSTRUCCIÓN INCREMENTAL
+    def _index_keys(self, product):
+        keys = set()
+        for field in TEXT_FIELDS:
+            keys.update(('token', token) for token in tokenize(product.get(field)))
+        for facet in self._facets:
+            if product.get(facet):
+                keys.add((facet, fold(product[facet]).strip()))
+        return keys
+
+    def _remove(self, product_id):
+        for kind, value in self._keys.pop(product_id, ()):
+            postings = self._postings if kind == 'token' else self._facets[kind]
+            ids = postings.get(value)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del postings[value]
+                    if kind == 'token':
+                        self._vocabulary_dirty = True
+                    else:
+                        self._labels[kind].pop(value, None)
+        self._products.pop(product_id, None)
+        self._fingerprints.pop(product_id, None)
+
+    def _add(self, product_id, product, fingerprint):
+        keys = self._index_keys(product)
+        for kind, value in keys:
+            postings = self._postings if kind == 'token' else self._facets[kind]
+            if kind == 'token' and value not in postings:
+                self._vocabulary_dirty = True
+            postings.setdefault(value, set()).add(product_id)
+            if kind != 'token':
+                self._labels[kind].setdefault(value, product[kind])
+        self._keys[product_id] = keys
+        self._products[product_id] = product
+        self._fingerprints[product_id] = fingerprint
+        self.reindexed += 1
+
+    def refresh(self, products):
+        """Sincronizar el índice con la lista (no hace nada si es la misma lista)"""
+        if products is self._source:
+            return
+        with self._lock:
+            if products is self._source:
+                return
+            current = {}
+            for product in products:
+                current[self._product_id(product)] = product
+
+            for product_id in [pid for pid in self._products if pid not in current]:
+                self._remove(product_id)
+            for product_id, product in current.items():
+                fingerprint = _fingerprint(product)
+                if self._fingerprints.get(product_id) != fingerprint:
+                    self._remove(product_id)
+                    self._add(product_id, product, fingerprint)
+
+            self._order = list(current)
+            self._position = {product_id: i for i, product_id in enumerate(self._order)}
+            if self._vocabulary_dirty:
+                self._vocabulary = sorted(self._postings)
+                self._vocabulary_dirty = False
+            self._source = products
+            self.rebuilds += 1
+
+    # CONSULTAS
+    def _token_matches(self, token):
+        """Ids cuyo texto tiene alguna palabra que empieza por `token`"""
+        matched = set()
+        start = bisect.bisect_left(self._vocabulary, token)
+        for word in self._vocabulary[start:]:
+            if not word.startswith(token):
+                break
+            matched |= self._postings[word]
+        return matched
+
+    def _matching_ids(self, query, category, brand):
+        candidates = None
+        for facet, value in (('category', category), ('brand', brand)):
+            if value:
+                ids = self._facets[facet].get(fold(value).strip(), set())
+                candidates = set(ids) if candidates is None else candidates & ids
+        for token in tokenize(query):
+            ids = self._token_matches(token)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                break
+
+        if candidates is None:
+            return self._order
+        return sorted(candidates, key=self._position.__getitem__)
+
+    def matching(self, query='', category='', brand=''):
+        """Todos los productos que cumplen los filtros, ordenados como en la tabla"""
+        with self._lock:
+            return [self._products[pid] for pid in self._matching_ids(query, category, brand)]
+
+    def search(self, query='', category='', brand='', offset=0, limit=24):
+        """(productos de la página, total) ordenados como en la tabla"""
+        with self._lock:
+            ordered = self._matching_ids(query, category, brand)
+            page = [self._products[pid] for pid in ordered[offset:offset + limit]]
+            return page, len(ordered)
+
+    def facets(self, facet):
+        """[(valor, número de productos)] ordenado alfabéticamente"""
+        with self._lock:
+            labels = self._labels[facet]
+            return sorted(((labels[key], len(ids)) for key, ids in self._facets[facet].items()),
+                          key=lambda item: fold(item[0]))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'products': len(self._products),
+                'tokens': len(self._postings),
+                'categories': len(self._facets['category']),
+                'brands': len(self._facets['brand']),
+                'rebuilds': self.rebuilds,
+                'reindexed': self.reindexed,
+            }
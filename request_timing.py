@@ -0,0 +1,197 @@
+# request_timing.py - Tiempo por ruta y por dependencia, con cabecera Server-Timing
+#
+# Cada petición mide su tiempo total y, por separado, el de cada llamada a una
+# dependencia: métodos de DatabaseManager (Supabase), helpers send_* y entrega
+# SMTP, y render_template (señales de Flask). Los tiempos van a histogramas en
+# memoria por ruta y por dependencia (buckets fijos: observar es un bisect y dos
+# sumas) y se resumen en la cabecera Server-Timing de la respuesta, que las
+# DevTools del navegador muestran en la pestaña Network. Los observadores
+# (add_observer, p. ej. metrics.Metrics) reciben las mismas mediciones.
+import bisect
+import logging
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_request_context, request, before_render_template, template_rendered
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores de los buckets (ms); el último bucket es +inf
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Histograma de latencias con buckets fijos (no thread-safe: lo protege RequestTimer)"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q):
+        """Estimar el cuantil interpolando dentro del bucket que lo contiene"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = BUCKETS_MS[i - 1] if i else 0.0
+                upper = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max
+                return min(lower + (upper - lower) * (rank - cumulative) / bucket_count, self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def snapshot(self):
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(BUCKETS_MS + ('+Inf',), self.counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 2) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50), 2),
+            'p95_ms': round(self.quantile(0.95), 2),
+            'p99_ms': round(self.quantile(0.99), 2),
+            'max_ms': round(self.max, 2),
+            'buckets': buckets,
+        }
+
+
+class RequestTimer:
+    """Histogramas por ruta y por dependencia, y cabecera Server-Timing por petición"""
+
+    def __init__(self, app=None, enabled=True, server_timing=True, max_header_entries=20):
+        self.enabled = enabled
+        self.server_timing = server_timing
+        self.max_header_entries = max_header_entries
+        self._routes = {}
+        self._dependencies = {}
+        self._observers = []
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not self.enabled:
+            return
+        # Registrado antes que los demás hooks: before_request corre el primero
+        # y after_request (orden inverso) el último, así el total lo incluye todo
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        before_render_template.connect(self._template_started, app, weak=False)
+        template_rendered.connect(self._template_finished, app, weak=False)
+
+    def add_observer(self, observer):
+        """Notificar también a observer.observe_request() / observe_dependency()"""
+        self._observers.append(observer)
+
+    # REGISTRO
+    def _observe(self, table, key, ms):
+        with self._lock:
+            histogram = table.get(key)
+            if histogram is None:
+                histogram = table[key] = Histogram()
+            histogram.observe(ms)
+
+    def record(self, name, ms):
+        """Registrar una llamada a una dependencia (y sumarla a la petición en curso)"""
+        self._observe(self._dependencies, name, ms)
+        for observer in self._observers:
+            observer.observe_dependency(name, ms)
+        if has_request_context():
+            spans = g.get('_timing_spans')
+            if spans is not None:
+                span = spans.get(name)
+                if span is None:
+                    spans[name] = [ms, 1]
+                else:
+                    span[0] += ms
+                    span[1] += 1
+
+    def timed(self, category, name=None):
+        """Decorador: medir cada llamada como la dependencia '<category>.<nombre>'"""
+        def decorator(func):
+            if not self.enabled:
+                return func
+            metric = f"{category}.{name or func.__name__}"
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(metric, (time.perf_counter() - started) * 1000)
+
+            return wrapper
+
+        return decorator
+
+    def instrument(self, category):
+        """Decorador de clase: medir todos sus métodos públicos"""
+        def decorator(cls):
+            for attr, value in list(vars(cls).items()):
+                if callable(value) and not attr.startswith('_'):
+                    setattr(cls, attr, self.timed(category, attr)(value))
+            return cls
+
+        return decorator
+
+    # HOOKS DE FLASK
+    def _start_request(self):
+        g._timing_started = time.perf_counter()
+        g._timing_spans = {}
+        g._timing_templates = []
+
+    def _template_started(self, sender, template, context, **extra):
+        templates = g.get('_timing_templates')
+        if templates is not None:
+            templates.append(time.perf_counter())
+
+    def _template_finished(self, sender, template, context, **extra):
+        templates = g.get('_timing_templates')
+        if templates:
+            self.record(f"tpl.{template.name}", (time.perf_counter() - templates.pop()) * 1000)
+
+    def _finish_request(self, response):
+        started = g.get('_timing_started')
+        if started is None:
+            return response
+        total_ms = (time.perf_counter() - started) * 1000
+        route = request.url_rule.rule if request.url_rule is not None else '<sin ruta>'
+        self._observe(self._routes, f"{request.method} {route}", total_ms)
+        for observer in self._observers:
+            observer.observe_request(request.method, route, response.status_code, total_ms)
+
+        if self.server_timing:
+            spans = sorted(g._timing_spans.items(), key=lambda item: item[1][0], reverse=True)
+            entries = [f'{name};dur={ms:.1f};desc="x{count}"' if count > 1 else f"{name};dur={ms:.1f}"
+                       for name, (ms, count) in spans[:self.max_header_entries]]
+            entries.append(f"total;dur={total_ms:.1f}")
+            response.headers.add('Server-Timing', ', '.join(entries))
+        return response
+
+    # CONSULTA
+    def stats(self):
+        with self._lock:
+            return {
+                'routes': {key: histogram.snapshot() for key, histogram in sorted(self._routes.items())},
+                'dependencies': {key: histogram.snapshot() for key, histogram in sorted(self._dependencies.items())},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._dependencies.clear()
@@ -0,0 +1,141 @@
+# responsive_images.py - Variantes WebP/AVIF redimensionadas para las imágenes del catálogo
+#
+# Paso de build (ejecutar en el deploy, p. ej. en el Build Command de Render):
+#     python responsive_images.py build
+# genera en static/build/img/ una variante por ancho y formato con el hash del
+# contenido en el nombre, más un manifest.json. En tiempo de ejecución el helper
+# de Jinja responsive_img() lee el manifest y emite <picture> con srcset, sizes y
+# loading="lazy"; si una imagen no tiene variantes, emite el <img> original.
+import argparse
+import hashlib
+import json
+import logging
+import os
+
+from markupsafe import Markup, escape
+
+from manifest_loader import JsonManifest
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+BUILD_SUBDIR = os.path.join('build', 'img')
+MANIFEST_PATH = os.path.join(STATIC_DIR, BUILD_SUBDIR, 'manifest.json')
+
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+WIDTHS = (320, 480, 768, 1024, 1600)
+# (formato, extensión, mime, opciones de Pillow)
+FORMATS = (
+    ('AVIF', 'avif', 'image/avif', {'quality': 55}),
+    ('WEBP', 'webp', 'image/webp', {'quality': 78, 'method': 6}),
+)
+
+DEFAULT_SIZES = '(max-width: 576px) 100vw, (max-width: 992px) 50vw, 33vw'
+
+
+# BUILD
+def _variant_name(rel_path, width, digest, extension):
+    stem = os.path.splitext(rel_path)[0]
+    return os.path.join(BUILD_SUBDIR, f"{stem}.{width}.{digest}.{extension}").replace(os.sep, '/')
+
+
+def build(source_dir=os.path.join(STATIC_DIR, 'images'), widths=WIDTHS, force=False):
+    """Generar las variantes que falten y reescribir el manifest"""
+    from PIL import Image, features
+
+    formats = [f for f in FORMATS if features.check(f[1])]
+    skipped = [f[0] for f in FORMATS if f not in formats]
+    if skipped:
+        logger.warning(f"Pillow sin soporte para {', '.join(skipped)}: se omiten esas variantes")
+
+    manifest = {}
+    generated = 0
+    for root, _, files in os.walk(source_dir):
+        for filename in sorted(files):
+            if not filename.lower().endswith(SOURCE_EXTENSIONS):
+                continue
+            source = os.path.join(root, filename)
+            rel_path = os.path.relpath(source, STATIC_DIR).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()[:10]
+
+            with Image.open(source) as image:
+                image.load()
+                width, height = image.size
+                if image.mode not in ('RGB', 'RGBA'):
+                    has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+                    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+                targets = sorted({w for w in widths if w < width} | {min(width, max(widths))})
+                entry = {'width': width, 'height': height, 'variants': {}}
+                for pil_format, extension, mime, options in formats:
+                    srcset = []
+                    for target in targets:
+                        name = _variant_name(rel_path, target, digest, extension)
+                        output = os.path.join(STATIC_DIR, name)
+                        if force or not os.path.exists(output):
+                            os.makedirs(os.path.dirname(output), exist_ok=True)
+                            resized = image if target == width else \
+                                image.resize((target, round(height * target / width)), Image.LANCZOS)
+                            resized.save(output, pil_format, **options)
+                            generated += 1
+                        srcset.append([target, name])
+                    entry['variants'][mime] = srcset
+            manifest[rel_path] = entry
+
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    tmp_path = MANIFEST_PATH + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+    logger.info(f"{len(manifest)} imágenes en el manifest, {generated} variantes nuevas")
+    return manifest
+
+
+# TIEMPO DE EJECUCIÓN
+# Manifest de variantes (revisión del archivo cada 10 s)
+image_manifest = JsonManifest(MANIFEST_PATH)
+
+
+def _attributes(attrs):
+    return ''.join(f' {name}="{escape(value)}"' for name, value in attrs.items() if value is not None)
+
+
+def responsive_img(path, alt='', sizes=DEFAULT_SIZES, eager=False, **attrs):
+    """Helper de Jinja: <picture> con srcset WebP/AVIF, o <img> simple sin variantes"""
+    from flask import url_for
+
+    img_attrs = {'src': url_for('static', filename=path), 'alt': alt}
+    entry = image_manifest.get(path)
+    if entry:
+        img_attrs['width'] = entry['width']
+        img_attrs['height'] = entry['height']
+    img_attrs['loading'] = 'eager' if eager else 'lazy'
+    img_attrs['decoding'] = 'async'
+    if eager:
+        img_attrs['fetchpriority'] = 'high'
+    img_attrs.update(attrs)
+    img = f"<img{_attributes(img_attrs)}>"
+
+    if not entry:
+        return Markup(img)
+
+    sources = []
+    for mime, srcset in entry['variants'].items():
+        candidates = ', '.join(f"{url_for('static', filename=name)} {width}w" for width, name in srcset)
+        sources.append(f'<source type="{mime}" srcset="{escape(candidates)}" sizes="{escape(sizes)}">')
+    return Markup(f"<picture>{''.join(sources)}{img}</picture>")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generar variantes responsive de static/images")
+    parser.add_argument('command', choices=('build',))
+    parser.add_argument('--force', action='store_true', help="regenerar aunque la variante exista")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    build(force=args.force)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+# smtp_pool.py - Pool de sesiones SMTP persistentes por worker
+#
+# Cada sesión paga una sola vez connect + STARTTLS + login y luego se reutiliza
+# para muchos mensajes. Antes de reutilizar una sesión ociosa se valida con
+# NOOP, y las sesiones demasiado viejas se cierran para no chocar con los
+# límites de Gmail.
+import logging
+import os
+import smtplib
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Errores tras los cuales la sesión ya no es utilizable y conviene reconectar
+# (smtplib.SMTPException hereda de OSError, por eso los rechazos se atrapan antes)
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, OSError)
+
+
+class _PooledSMTP:
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class SMTPConnectionPool:
+    """Pool acotado de conexiones SMTP autenticadas con keep-alive"""
+
+    def __init__(self, host, port, user, password, max_size=4, max_age=300.0,
+                 noop_after=30.0, timeout=30.0, starttls=True):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.max_size = max_size
+        self.max_age = max_age
+        self.noop_after = noop_after
+        self.timeout = timeout
+        self.starttls = starttls
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._counters = {'handshakes': 0, 'reused': 0, 'noop_failures': 0, 'expired': 0, 'reconnects': 0}
+
+    def _check_fork(self):
+        # Las sesiones heredadas de otro proceso comparten el socket: no se usan
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+    # CICLO DE VIDA DE LAS CONEXIONES
+    def _open(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            smtp.login(self.user, self.password)
+        except Exception:
+            self._discard(_PooledSMTP(smtp))
+            raise
+        with self._lock:
+            self._counters['handshakes'] += 1
+        return _PooledSMTP(smtp)
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.smtp.quit()
+        except Exception:
+            try:
+                conn.smtp.close()
+            except Exception:
+                pass
+
+    def _is_usable(self, conn):
+        now = time.monotonic()
+        if now - conn.created_at > self.max_age:
+            with self._lock:
+                self._counters['expired'] += 1
+            return False
+        if now - conn.last_used > self.noop_after:
+            try:
+                code, _ = conn.smtp.noop()
+            except Exception:
+                code = None
+            if code != 250:
+                with self._lock:
+                    self._counters['noop_failures'] += 1
+                return False
+        return True
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    return self._open()
+                if self._is_usable(conn):
+                    with self._lock:
+                        self._counters['reused'] += 1
+                    return conn
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, healthy=True):
+        try:
+            if healthy:
+                conn.last_used = time.monotonic()
+                with self._lock:
+                    self._idle.append(conn)
+            else:
+                self._discard(conn)
+        finally:
+            self._slots.release()
+
+    # API PÚBLICA
+    def send(self, from_addr, to_addrs, raw_message):
+        """Enviar un mensaje ya serializado reutilizando una sesión del pool"""
+        self._check_fork()
+        conn = self._acquire()
+        try:
+            conn.smtp.sendmail(from_addr, to_addrs, raw_message)
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # Rechazo del servidor (destinatario, tamaño...): la sesión sigue viva
+            self._release(conn)
+            raise
+        except RECONNECT_ERRORS as e:
+            # La sesión murió entre el NOOP y el envío: reconectar una vez
+            logger.warning(f"Sesión SMTP inválida, reconectando: {e}")
+            self._discard(conn)
+            with self._lock:
+                self._counters['reconnects'] += 1
+            try:
+                conn = self._open()
+            except Exception:
+                self._slots.release()
+                raise
+            try:
+                conn.smtp.sendmail(from_addr, to_addrs, raw_message)
+            except Exception:
+                self._release(conn, healthy=False)
+                raise
+        except Exception:
+            self._release(conn, healthy=False)
+            raise
+        self._release(conn)
+
+    def close_all(self):
+        """Cerrar las sesiones ociosas (p. ej. al terminar el worker)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, idle=len(self._idle), max_size=self.max_size)
@@ -0,0 +1,7 @@
+-- Índices para la paginación por keyset del panel de administración
+-- (DatabaseManager.get_page ordena por created_at desc, id desc).
+-- Ejecutar en el SQL Editor de Supabase.
+
+create index if not exists leads_created_at_id_idx on public.leads (created_at desc, id desc);
+create index if not exists appointments_created_at_id_idx on public.appointments (created_at desc, id desc);
+create index if not exists sales_candidates_created_at_id_idx on public.sales_candidates (created_at desc, id desc);
@@ -0,0 +1,16 @@
+-- Inscripción atómica: descuenta un cupo solo si quedan disponibles.
+-- El UPDATE bloquea la fila, así que inscripciones concurrentes desde varios
+-- workers nunca sobrevenden el curso. Devuelve la fila actualizada o nada.
+-- Ejecutar en el SQL Editor de Supabase.
+
+create or replace function public.enroll_in_course(p_course_id bigint)
+returns setof public.courses
+language sql
+volatile
+as $$
+    update public.courses
+       set available_spots = available_spots - 1
+     where id = p_course_id
+       and available_spots > 0
+    returning *;
+$$;
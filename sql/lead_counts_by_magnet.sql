@@ -0,0 +1,16 @@
+-- Conteo de leads agrupado por magnet_type, calculado en Postgres.
+-- DatabaseManager.get_leads_stats lo invoca vía RPC y así el panel admin
+-- recibe una fila por tipo de magnet en lugar de toda la tabla leads.
+-- Ejecutar en el SQL Editor de Supabase.
+
+create index if not exists leads_magnet_type_idx on public.leads (magnet_type);
+
+create or replace function public.lead_counts_by_magnet()
+returns table (magnet_type text, total bigint)
+language sql
+stable
+as $$
+    select coalesce(magnet_type, 'sin_tipo') as magnet_type, count(*) as total
+    from public.leads
+    group by 1;
+$$;
@@ -0,0 +1,10 @@
+-- Claves de idempotencia de los formularios de captación (lead_spool.py).
+-- El spool reenvía cada fila con su clave y un upsert que ignora las ya
+-- existentes: un reintento tras una caída no duplica leads.
+-- Ejecutar en el SQL Editor de Supabase antes de activar LEAD_SPOOL_ENABLED.
+
+alter table public.leads add column if not exists idempotency_key text;
+alter table public.sales_candidates add column if not exists idempotency_key text;
+
+create unique index if not exists leads_idempotency_key_idx on public.leads (idempotency_key);
+create unique index if not exists sales_candidates_idempotency_key_idx on public.sales_candidates (idempotency_key);
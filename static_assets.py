@@ -0,0 +1,173 @@
+# static_assets.py - Assets estáticos con huella (fingerprint), caché inmutable y precompresión
+#
+# Paso de build (después de `python responsive_images.py build`):
+#     python static_assets.py build
+# crea en static/dist/ una copia (hard link, sin duplicar disco) de cada archivo
+# de static/ con el hash del contenido en el nombre, variantes .gz/.br de los
+# assets de texto y un manifest.json. En tiempo de ejecución init_app() hace que
+# url_for('static', filename=...) resuelva al nombre con huella, y esos archivos
+# se sirven con Cache-Control immutable (un año) y la variante precomprimida
+# que acepte el navegador.
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import shutil
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se generan variantes .gz
+    brotli = None
+
+from manifest_loader import JsonManifest
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_SUBDIR = 'dist'
+MANIFEST_PATH = os.path.join(STATIC_DIR, DIST_SUBDIR, 'manifest.json')
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.mjs', '.svg', '.json', '.txt', '.xml', '.html', '.map')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Codificaciones precomprimidas en orden de preferencia: (token, extensión)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+# BUILD
+def _fingerprinted_name(rel_path, digest):
+    stem, extension = os.path.splitext(rel_path)
+    return f"{DIST_SUBDIR}/{stem}.{digest}{extension}"
+
+
+def _link_or_copy(source, target):
+    if os.path.exists(target):
+        return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+    return True
+
+
+def _precompress(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not os.path.exists(path + '.gz'):
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None and not os.path.exists(path + '.br'):
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build():
+    """Generar los archivos con huella que falten y reescribir el manifest"""
+    if brotli is None:
+        logger.warning("Módulo brotli no instalado: solo se generan variantes .gz")
+
+    manifest = {}
+    created = 0
+    for root, dirs, files in os.walk(STATIC_DIR):
+        rel_root = os.path.relpath(root, STATIC_DIR)
+        if rel_root == DIST_SUBDIR or rel_root.startswith(DIST_SUBDIR + os.sep):
+            dirs[:] = []
+            continue
+        for filename in sorted(files):
+            if filename == 'manifest.json' or filename.endswith(('.gz', '.br', '.tmp')):
+                continue
+            source = os.path.join(root, filename)
+            rel_path = os.path.relpath(source, STATIC_DIR).replace(os.sep, '/')
+
+            digest = hashlib.sha256()
+            with open(source, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+
+            fingerprinted = _fingerprinted_name(rel_path, digest.hexdigest()[:12])
+            target = os.path.join(STATIC_DIR, fingerprinted)
+            created += _link_or_copy(source, target)
+            if filename.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                _precompress(target)
+            manifest[rel_path] = fingerprinted
+
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    tmp_path = MANIFEST_PATH + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+    logger.info(f"{len(manifest)} assets en el manifest, {created} archivos nuevos")
+    return manifest
+
+
+# TIEMPO DE EJECUCIÓN
+# Manifest ruta lógica -> ruta con huella
+asset_manifest = JsonManifest(MANIFEST_PATH)
+
+
+def accepted_encodings(request):
+    """Tokens de Accept-Encoding aceptados (se descartan los de q=0)"""
+    header = request.headers.get('Accept-Encoding', '')
+    accepted = set()
+    for part in header.split(','):
+        token, _, params = part.strip().partition(';')
+        quality = params.strip().replace(' ', '')
+        if quality.startswith('q=') and quality[2:].rstrip('0').rstrip('.') in ('0', ''):
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def init_app(app):
+    """Resolver url_for('static') vía manifest y servir /static/dist/ como inmutable"""
+    from flask import request, send_from_directory
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            fingerprinted = asset_manifest.get(values['filename'])
+            if fingerprinted:
+                values['filename'] = fingerprinted
+
+    default_static_view = app.view_functions['static']
+
+    def static_view(filename):
+        if not filename.startswith(DIST_SUBDIR + '/'):
+            return default_static_view(filename=filename)
+
+        path = filename
+        encoding = None
+        accepted = accepted_encodings(request)
+        for token, extension in ENCODINGS:
+            if token in accepted and os.path.exists(os.path.join(STATIC_DIR, filename + extension)):
+                path, encoding = filename + extension, token
+                break
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(STATIC_DIR, path, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+        response.cache_control.immutable = True
+        response.cache_control.public = True
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if filename.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            response.vary.add('Accept-Encoding')
+        return response
+
+    app.view_functions['static'] = static_view
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generar assets con huella en static/dist")
+    parser.add_argument('command', choices=('build',))
+    parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    build()
+
+
+if __name__ == '__main__':
+    main()
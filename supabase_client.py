@@ -0,0 +1,87 @@
+# supabase_client.py - Cliente Supabase con un pool HTTP propio, seguro entre hilos/greenlets
+#
+# create_client() sin opciones deja que postgrest-py cree su httpx.Client la
+# primera vez que se usa .table(); con workers gthread o gevent varios hilos
+# llegan a la vez a esa inicialización perezosa. Aquí el httpx.Client se crea
+# explícitamente (límite de conexiones, keep-alive y timeouts configurables) y
+# el cliente PostgREST se inicializa antes de atender peticiones. httpx.Client
+# es seguro para uso concurrente, así que todos los hilos del worker comparten
+# las mismas conexiones keep-alive hacia Supabase.
+#
+# La app solo usa la API REST (.table() y .rpc()), así que se construye
+# directamente el cliente PostgREST que supabase.Client usa por dentro. Importar
+# el paquete `supabase` carga además auth, realtime (websockets), storage y
+# functions: ~140 ms y ~14 MB de RSS por worker que nunca se usan. Si alguna vez
+# hace falta auth o storage, importar `supabase` en la función que lo use.
+import httpx
+from postgrest import SyncPostgrestClient
+
+
+class _ObservedTransport(httpx.HTTPTransport):
+    """Transporte httpx que informa de respuestas >= 400 y de errores de red"""
+
+    def __init__(self, on_error, **kwargs):
+        super().__init__(**kwargs)
+        self._on_error = on_error
+
+    def handle_request(self, request):
+        try:
+            response = super().handle_request(request)
+        except Exception as e:
+            self._on_error(type(e).__name__)
+            raise
+        if response.status_code >= 400:
+            self._on_error(str(response.status_code))
+        return response
+
+
+def create_supabase_client(url, key, max_connections=20, max_keepalive=10, keepalive_expiry=30.0, timeout=10.0,
+                           on_error=None):
+    """Crear el cliente REST de Supabase del proceso con un pool httpx acotado
+
+    on_error(kind) recibe el código HTTP o el tipo de excepción de cada petición
+    fallida (métricas), antes de que postgrest la convierta en excepción.
+    """
+    limits = httpx.Limits(max_connections=max_connections,
+                          max_keepalive_connections=max_keepalive,
+                          keepalive_expiry=keepalive_expiry)
+    transport = _ObservedTransport(on_error, limits=limits) if on_error else httpx.HTTPTransport(limits=limits)
+    http_client = httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(timeout),
+        follow_redirects=True,
+    )
+    # Mismas cabeceras que pone supabase.Client (apikey + Bearer con la misma clave)
+    headers = {'apiKey': key, 'Authorization': f'Bearer {key}'}
+    return SyncPostgrestClient(f"{url.rstrip('/')}/rest/v1", headers=headers, http_client=http_client)
+
+
+# CLASIFICACIÓN DE ERRORES
+# postgrest lanza APIError con el SQLSTATE de Postgres o el código PGRSTxxx en
+# .code (o el estado HTTP si la respuesta no era JSON); httpx lanza sus propias
+# excepciones para timeouts y errores de red.
+ROW_REJECTION_CLASSES = ('22', '23')  # data_exception, integrity_constraint_violation
+ROW_REJECTION_CODES = ('PGRST102',)  # cuerpo JSON inválido
+MISSING_COLUMN_CODES = ('42703', 'PGRST204')
+
+
+def error_code(exc):
+    """Código PostgREST/SQLSTATE de la excepción, o None si no viene de PostgREST"""
+    code = getattr(exc, 'code', None)
+    return str(code) if code is not None else None
+
+
+def is_row_rejection(exc):
+    """True si Supabase rechazó las filas por su contenido (reintentar no sirve)
+
+    Timeouts, errores de red, 5xx, permisos o esquema (p. ej. una columna que
+    falta hasta aplicar una migración) no cuentan: se resuelven sin tocar la fila.
+    """
+    code = error_code(exc)
+    if code is None:
+        return False
+    return code in ROW_REJECTION_CODES or (len(code) == 5 and code[:2] in ROW_REJECTION_CLASSES)
+
+
+def is_missing_column(exc):
+    return error_code(exc) in MISSING_COLUMN_CODES
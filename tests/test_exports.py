@@ -0,0 +1,65 @@
+import csv
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+from exports import save_xlsx, stream_csv, stream_xlsx
+
+COLUMNS = ['nombre', 'mensaje', 'telefono', 'intereses']
+ROWS = [
+    {'nombre': '=HYPERLINK("http://evil.example","clic")', 'mensaje': '+1+1',
+     'telefono': '-0999', 'intereses': ['@SUM(A1)', 'rx']},
+    {'nombre': '\tTab', 'mensaje': '\rCR', 'telefono': 987, 'intereses': None},
+    {'nombre': 'Ana', 'mensaje': 'hola = mundo', 'telefono': '+593 99 123 4567', 'intereses': []},
+]
+
+
+def test_csv_neutralizes_formulas():
+    body = ''.join(stream_csv(ROWS, COLUMNS)).lstrip('﻿')
+    rows = list(csv.reader(io.StringIO(body, newline='')))
+    assert rows[0] == COLUMNS
+    assert rows[1:] == [
+        ['\'=HYPERLINK("http://evil.example","clic")', "'+1+1", "'-0999", "'@SUM(A1), rx"],
+        ["'\tTab", "'\rCR", '987', ''],
+        ['Ana', 'hola = mundo', "'+593 99 123 4567", ''],
+    ]
+
+
+@pytest.mark.parametrize('writer', ['save', 'stream'])
+def test_xlsx_keeps_values_as_text(tmp_path, writer):
+    path = tmp_path / 'export.xlsx'
+    if writer == 'save':
+        save_xlsx(ROWS, COLUMNS, path)
+    else:
+        path.write_bytes(b''.join(stream_xlsx(ROWS, COLUMNS)))
+    sheet = load_workbook(path).active
+    assert [cell.value for cell in next(sheet.iter_rows())] == COLUMNS
+    assert all(cell.data_type != 'f' for row in sheet.iter_rows() for cell in row)
+    # XLSX guarda los saltos de línea como \n
+    values = [[cell.value.replace('\n', '\r') if isinstance(cell.value, str) else cell.value for cell in row]
+              for row in sheet.iter_rows(min_row=2)]
+    assert values == [
+        ['=HYPERLINK("http://evil.example","clic")', '+1+1', '-0999', '@SUM(A1), rx'],
+        ['\tTab', '\rCR', 987, None],
+        ['Ana', 'hola = mundo', '+593 99 123 4567', None],
+    ]
+
+
+def test_xlsx_streams_before_all_rows_are_read():
+    consumed = []
+
+    def rows():
+        for i in range(20000):
+            consumed.append(i)
+            yield {'nombre': f'Lead {i}', 'mensaje': 'x' * 40, 'telefono': i, 'intereses': ['rx', str(i)]}
+
+    chunks = stream_xlsx(rows(), COLUMNS, chunk_size=16 * 1024)
+    first = next(chunks)
+    assert first.startswith(b'PK') and len(consumed) < 20000
+
+    body = first + b''.join(chunks)
+    sheet = load_workbook(io.BytesIO(body), read_only=True).active
+    values = list(sheet.iter_rows(min_row=2, values_only=True))
+    assert len(values) == 20000
+    assert values[-1] == ('Lead 19999', 'x' * 40, 19999, 'rx, 19999')
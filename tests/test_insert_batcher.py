@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from insert_batcher import InsertBatcher
+
+
+class RowRejected(Exception):
+    code = '23502'
+
+
+class FakeTable:
+    def __init__(self):
+        self.calls = []
+
+    def insert_many(self, table, rows):
+        self.calls.append(len(rows))
+        if any(row['email'] is None for row in rows):
+            raise RowRejected('null value in column "email"')
+        return [dict(row, id=row['nombre']) for row in rows]
+
+
+def submit_all(batcher, rows):
+    results = [None] * len(rows)
+
+    def submit(index):
+        try:
+            results[index] = batcher.submit('leads', rows[index])
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(rows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_row_rejection_only_fails_the_offending_submission():
+    table = FakeTable()
+    batcher = InsertBatcher(table.insert_many, max_rows=5, max_wait=5,
+                            is_permanent=lambda e: isinstance(e, RowRejected))
+    rows = [{'nombre': f'n{i}', 'email': None if i == 2 else f'n{i}@e.com'} for i in range(5)]
+
+    results = submit_all(batcher, rows)
+
+    assert isinstance(results[2], RowRejected)
+    assert [r['id'] for i, r in enumerate(results) if i != 2] == ['n0', 'n1', 'n3', 'n4']
+    assert table.calls == [5, 1, 1, 1, 1, 1]
+    stats = batcher.stats()
+    assert stats['split_batches'] == 1 and stats['failed_rows'] == 1 and stats['failed_batches'] == 0
+
+
+def test_transient_error_fails_the_whole_batch():
+    def insert_many(table, rows):
+        raise ConnectionError('supabase caído')
+
+    batcher = InsertBatcher(insert_many, max_rows=3, max_wait=5, is_permanent=lambda e: False)
+    results = submit_all(batcher, [{'nombre': f'n{i}', 'email': 'x'} for i in range(3)])
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert batcher.stats()['failed_batches'] == 1
+
+
+def test_single_row_rejection_is_raised():
+    table = FakeTable()
+    batcher = InsertBatcher(table.insert_many, max_rows=1, is_permanent=lambda e: True)
+    with pytest.raises(RowRejected):
+        batcher.submit('leads', {'nombre': 'n', 'email': None})
+    assert table.calls == [1]
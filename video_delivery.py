@@ -0,0 +1,119 @@
+# video_delivery.py - Entrega de videos con peticiones por rango y sendfile
+#
+# Los <video> del sitio piden "Range: bytes=N-". Cada respuesta 206 se limita a
+# un tramo (VIDEO_CHUNK_BYTES) para que un worker sync quede ocupado solo lo
+# que tarda en enviar ese tramo y no la descarga completa; el navegador pide el
+# siguiente tramo por su cuenta. El cuerpo se entrega con wsgi.file_wrapper y
+# el archivo posicionado en el inicio del rango, así gunicorn usa os.sendfile
+# (copia cero). Si hay un proxy delante (nginx / Apache) se puede delegar toda
+# la entrega con X-Accel-Redirect o X-Sendfile, p. ej. en nginx:
+#     location /_videos/ { internal; alias /ruta/al/proyecto/static/videos/; }
+# con VIDEO_OFFLOAD=x-accel; así el worker responde solo los encabezados.
+import mimetypes
+import os
+from urllib.parse import quote
+
+from flask import Response, abort, request
+from werkzeug.http import http_date, quote_etag
+from werkzeug.security import safe_join
+from werkzeug.wsgi import FileWrapper
+
+OFFLOAD_MODES = ('', 'x-accel', 'x-sendfile')
+FILE_WRAPPER_BLOCK_SIZE = 64 * 1024
+
+
+def _etag(stat):
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def _headers(path, stat, etag, max_age):
+    return {
+        'Content-Type': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+        'Accept-Ranges': 'bytes',
+        'ETag': quote_etag(etag),
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': f'public, max-age={max_age}',
+    }
+
+
+def _offload_response(mode, filename, path, headers, accel_prefix):
+    response = Response(status=200, headers=headers)
+    if mode == 'x-accel':
+        # nginx atiende el rango y el envío desde una location "internal"
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{quote(filename)}"
+        response.headers['X-Accel-Buffering'] = 'no'
+    else:
+        response.headers['X-Sendfile'] = os.path.abspath(path)
+    return response
+
+
+def send_video(directory, filename, chunk_bytes=1024 * 1024, max_age=86400, offload='', accel_prefix='/_videos'):
+    """Responder un video de `directory` con soporte de Range, 304 y offload opcional"""
+    path = safe_join(directory, filename)
+    if path is None:
+        abort(404)
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        abort(404)
+    if not os.path.isfile(path):
+        abort(404)
+
+    etag = _etag(stat)
+    headers = _headers(path, stat, etag, max_age)
+
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+
+    if offload:
+        return _offload_response(offload, filename, path, headers, accel_prefix)
+
+    size = stat.st_size
+    start, end = 0, size
+    status = 200
+    byte_range = request.range
+    if_range = request.if_range
+    if if_range.etag is not None:
+        range_valid = if_range.etag == etag
+    elif if_range.date is not None:
+        range_valid = if_range.date.timestamp() >= int(stat.st_mtime)
+    else:
+        range_valid = True
+    range_valid = range_valid and byte_range is not None
+    if range_valid:
+        bounds = byte_range.range_for_length(size)
+        if bounds is None:
+            headers['Content-Range'] = f"bytes */{size}"
+            return Response(status=416, headers=headers)
+        start, end = bounds
+        end = min(end, start + chunk_bytes)
+        status = 206
+        headers['Content-Range'] = f"bytes {start}-{end - 1}/{size}"
+
+    headers['Content-Length'] = str(end - start)
+    if request.method == 'HEAD':
+        return Response(status=status, headers=headers)
+
+    f = open(path, 'rb')
+    f.seek(start)
+    file_wrapper = request.environ.get('wsgi.file_wrapper', FileWrapper)
+    # gunicorn hace sendfile desde la posición actual del archivo y corta en
+    # Content-Length; otros servidores leerían hasta el final del archivo
+    if status == 200 or request.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+        body = file_wrapper(f, FILE_WRAPPER_BLOCK_SIZE)
+    else:
+        body = _read_range(f, end - start)
+    return Response(body, status=status, headers=headers, direct_passthrough=True)
+
+
+def _read_range(f, length):
+    """Leer exactamente `length` bytes cuando no se puede usar sendfile"""
+    try:
+        while length > 0:
+            chunk = f.read(min(FILE_WRAPPER_BLOCK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()